@@ -0,0 +1,163 @@
+import argparse
+import functools
+import itertools
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import fastf1
+import numpy as np
+import pandas as pd
+
+import f1_telemetry_analysis as analysis
+import synthetic_session
+
+# Cache directory of the benchmark run, so derived data of synthetic sessions never mixes with real caches
+analysis.CACHE_DIR = tempfile.mkdtemp(prefix='f1_benchmark_cache_')
+analysis.USE_TELEMETRY_STORE = False
+
+
+# Function to get a loaded synthetic session, the car and position data are sampled to the wanted samples per lap
+@functools.lru_cache(maxsize=4)
+def synthetic(ses, drivers, laps, samples, seed):
+    session = synthetic_session.get_session(2024, 'Benchmark', ses, seed=seed, drivers=drivers, laps=laps)
+    session.car_rate = session.pos_rate = samples / session.flying_lap_time
+    session.load()
+    return session
+
+
+# Function to prepare the positions gained benchmark
+def bench_positions_gained(drivers, laps, samples, seed):
+    session = synthetic('R', drivers, laps, samples, seed)
+    return lambda: analysis.compute_positions_gained(session)
+
+
+# Function to prepare the launch timing benchmark
+def bench_launch_times(drivers, laps, samples, seed):
+    session = synthetic('R', drivers, laps, samples, seed)
+    telemetry_by_driver = {lap['DriverNumber']: lap.get_car_data()[['Time', 'Speed']]
+                           for _, lap in session.laps.pick_laps(1).iterlaps()}
+    return lambda: analysis.launch_times_from_telemetry(telemetry_by_driver, (100, 150, 200))
+
+
+# Function to prepare the minisector benchmark, the fastest lap of every driver in qualifying on the cached geometry
+def bench_minisectors(drivers, laps, samples, seed):
+    session = synthetic('Q', drivers, laps, samples, seed)
+    geometry = analysis.get_circuit_geometry(session)
+    fastest_laps = [session.laps.pick_driver(driver).pick_fastest() for driver in session.drivers]
+    telemetry_list = [lap.get_car_data().add_distance() for lap in fastest_laps]
+    labels = [lap['Driver'] for lap in fastest_laps]
+    return lambda: analysis.minisector_dominance_from_telemetry(telemetry_list, labels, geometry=geometry)
+
+
+# Function to prepare the tyre stint benchmark
+def bench_tyre_stints(drivers, laps, samples, seed):
+    session = synthetic('R', drivers, laps, samples, seed)
+    return lambda: analysis.compute_tyre_stints(session.laps)
+
+
+# Function to prepare the qualifying summary benchmark
+def bench_quali_delta(drivers, laps, samples, seed):
+    session = synthetic('Q', drivers, laps, samples, seed)
+    return lambda: analysis.compute_quali_summary(session.laps)
+
+
+# Function to prepare the team pace benchmark
+def bench_team_pace(drivers, laps, samples, seed):
+    session = synthetic('R', drivers, laps, samples, seed)
+    return lambda: analysis.compute_team_pace(session.laps)
+
+
+# Function to prepare the race-long lift and coast benchmark over the streamed car data of every lap
+def bench_lift_and_coast(drivers, laps, samples, seed):
+    session = synthetic('R', drivers, laps, samples, seed)
+    return lambda: analysis.lift_and_coast(session)
+
+
+# Benchmarks by name, each prepares its input outside of the measurement and returns the function to measure
+BENCHMARKS = {
+    'positions_gained': bench_positions_gained,
+    'launch_times': bench_launch_times,
+    'minisectors': bench_minisectors,
+    'tyre_stints': bench_tyre_stints,
+    'quali_delta': bench_quali_delta,
+    'team_pace': bench_team_pace,
+    'lift_and_coast': bench_lift_and_coast,
+}
+
+
+# Function to measure the run time of a function over several repeats and its peak memory in a separate run,
+# so the tracing overhead of tracemalloc does not end up in the timings
+def measure(function, repeat):
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'min_s': min(timings), 'median_s': statistics.median(timings), 'peak_mb': peak / 2 ** 20}
+
+
+# Function to run the chosen benchmarks for every combination of the scale knobs
+def run_benchmarks(names, drivers, laps, samples, repeat=5, seed=0):
+    results = {}
+    for name, num_drivers, num_laps, num_samples in itertools.product(names, drivers, laps, samples):
+        key = f'{name}[drivers={num_drivers},laps={num_laps},samples={num_samples}]'
+        function = BENCHMARKS[name](num_drivers, num_laps, num_samples, seed)
+        results[key] = measure(function, repeat)
+        print(f"{key:70} {results[key]['median_s'] * 1000:10.2f} ms {results[key]['peak_mb']:9.2f} MB")
+    return results
+
+
+# Function to compare a run with an earlier one, returns the keys that got slower by more than the tolerance
+def compare_results(previous, current, tolerance=0.2):
+    regressions = []
+    for key, result in current.items():
+        if key not in previous:
+            continue
+        # The fastest repeat is the least affected by other load on the machine
+        ratio = result['min_s'] / previous[key]['min_s']
+        memory_ratio = result['peak_mb'] / previous[key]['peak_mb'] if previous[key]['peak_mb'] else 1.0
+        flag = ''
+        if ratio > 1 + tolerance or memory_ratio > 1 + tolerance:
+            regressions.append(key)
+            flag = '  REGRESSION'
+        print(f"{key:70} time x{ratio:5.2f} memory x{memory_ratio:5.2f}{flag}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the compute cores of the analyses on synthetic sessions')
+    parser.add_argument('--benchmarks', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--drivers', nargs='+', type=int, default=[20])
+    parser.add_argument('--laps', nargs='+', type=int, default=[57])
+    parser.add_argument('--samples', nargs='+', type=int, default=[400], help='telemetry samples per lap')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='earlier results file to compare this run with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown before a regression')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.benchmarks, args.drivers, args.laps, args.samples, args.repeat, args.seed)
+    with open(args.output, 'w') as file:
+        json.dump({'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                                   'pandas': pd.__version__, 'fastf1': fastf1.__version__},
+                   'results': results}, file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)['results']
+        if compare_results(previous, results, args.tolerance):
+            sys.exit(1)
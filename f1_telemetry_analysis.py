@@ -7,26 +7,749 @@ import seaborn as sns
 import mplcyberpunk
 from matplotlib import pyplot as plt
 from matplotlib.collections import LineCollection
-import operator
+from matplotlib.backends.backend_pdf import PdfPages
 import pandas as pd
-from fastf1.core import Laps
-from fastf1 import utils
 from timple.timedelta import strftimedelta
-from matplotlib import cm
-from matplotlib.colors import to_rgba
+from matplotlib.colors import BoundaryNorm, ListedColormap
 from fastf1.ergast import Ergast
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import json
+import os
+import functools
+import contextlib
+import inspect
+import threading
+import time
+import tracemalloc
+import weakref
+
+try:
+    import fcntl
+except ImportError:
+    # No file locks on Windows, writers of the telemetry store are only serialized within a process there
+    fcntl = None
+
+# Maximum number of loaded sessions kept in memory by the session registry
+SESSION_REGISTRY_SIZE = 4
+
+# Process-wide registry of loaded sessions, keyed by (year, event, session, load flags)
+_session_registry = OrderedDict()
+_session_registry_lock = threading.Lock()
+
+# Same defaults as Session.load()
+_LOAD_DEFAULTS = {'laps': True, 'telemetry': True, 'weather': True, 'messages': True}
+
+# Function creating the unloaded sessions of the registry, FastF1 unless replaced with set_session_backend()
+_session_backend = fastf1.get_session
+
+# When True, every analysis and its phases (session load, lap selection, telemetry, compute, rendering) are timed
+INSTRUMENT = os.environ.get('F1_ANALYSIS_INSTRUMENT', '') not in ('', '0')
+
+# When True, the instrumented phases also record the memory they allocate, tracemalloc slows everything down a lot
+INSTRUMENT_MEMORY = False
+
+# Records of the finished phases, one dict per call
+_timings = []
+_timings_lock = threading.Lock()
+
+# Phases currently running in each thread, innermost last
+_phase_stack = threading.local()
+
+
+# A running phase, its record is stored when the phase ends
+class _Phase:
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.children = 0.0
+        self.peak = 0
+
+    def __enter__(self):
+        stack = _phase_stack.__dict__.setdefault('phases', [])
+        self.path = '/'.join([phase.name for phase in stack] + [self.name])
+        stack.append(self)
+        if INSTRUMENT_MEMORY and tracemalloc.is_tracing():
+            self.memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        else:
+            self.memory = None
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        stack = _phase_stack.phases
+        stack.pop()
+        allocated = None
+        if self.memory is not None:
+            # Nested phases reset the peak, so the highest peak seen by them counts as well
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            allocated = max(self.peak - self.memory, 0)
+        if stack:
+            stack[-1].children += duration
+            stack[-1].peak = max(stack[-1].peak, self.peak)
+        record = {'phase': self.name, 'path': self.path, 'start': self.wall, 'duration_s': duration,
+                  'self_s': duration - self.children, 'rows': self.rows, 'bytes': allocated,
+                  'pid': os.getpid(), 'thread': threading.current_thread().name}
+        with _timings_lock:
+            _timings.append(record)
+        return False
+
+
+# Stand-in for a phase while instrumentation is disabled, rows set on it are dropped
+class _NoPhase:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+# Function to time a block as a named phase, rows processed can be passed or set on the returned phase.
+# While instrumentation is disabled this returns a shared do-nothing context manager
+def phase(name, rows=None):
+    if not INSTRUMENT:
+        return _NO_PHASE
+    return _Phase(name, rows)
+
+
+# Decorator to time every call of a function as a phase named after it, the rows of a table passed first are counted
+def timed(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not INSTRUMENT:
+            return func(*args, **kwargs)
+        with _Phase(func.__name__, len(args[0]) if args and isinstance(args[0], pd.DataFrame) else None):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# Function to switch the instrumentation on or off, memory tracing starts tracemalloc if it is not running yet
+def set_instrumentation(enabled=True, memory=False):
+    global INSTRUMENT, INSTRUMENT_MEMORY
+    INSTRUMENT = enabled
+    INSTRUMENT_MEMORY = enabled and memory
+    if INSTRUMENT_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+# Function to get the recorded phases, drained from the record list when clear is set
+def get_timings(clear=False):
+    global _timings
+    with _timings_lock:
+        records = list(_timings)
+        if clear:
+            _timings = []
+    return records
+
+
+# Function to drop all recorded phases
+def clear_timings():
+    get_timings(clear=True)
+
+
+# Function to dump the recorded phases as JSON, to a file when a path is given
+def dump_timings(path=None, clear=False):
+    records = get_timings(clear)
+    if path is None:
+        return json.dumps(records, indent=2)
+    with open(path, 'w') as file:
+        json.dump(records, file, indent=2)
+    return path
+
+
+# Function to aggregate phase records into one row per phase: calls, total, own (without nested phases), mean and
+# max time in seconds, rows and allocated bytes, the most expensive phases first
+def timing_summary(records=None):
+    if records is None:
+        records = get_timings()
+    table = pd.DataFrame(records, columns=['phase', 'duration_s', 'self_s', 'rows', 'bytes'])
+    table[['rows', 'bytes']] = table[['rows', 'bytes']].astype(float)
+    # Phases that never counted rows or bytes keep NaN instead of a sum of 0
+    counted = functools.partial(pd.Series.sum, min_count=1)
+    summary = table.groupby('phase').agg(calls=('duration_s', 'size'), total_s=('duration_s', 'sum'),
+                                         self_s=('self_s', 'sum'), mean_s=('duration_s', 'mean'),
+                                         max_s=('duration_s', 'max'), rows=('rows', counted),
+                                         bytes=('bytes', counted))
+    return summary.sort_values('self_s', ascending=False)
+
+
+# Function to run a function and hand back its result together with the phases it recorded, used by worker
+# processes so their records can be collected by the parent
+def _run_with_timings(function, *args, **kwargs):
+    result = function(*args, **kwargs)
+    return result, get_timings(clear=True)
+
+
+# Function to add phase records collected in another process
+def _merge_timings(records):
+    with _timings_lock:
+        _timings.extend(records)
+
+
+# Data slices an analysis can depend on
+LAPS = 'laps'
+RESULTS = 'results'
+CAR_DATA = 'car_data'
+POS_DATA = 'pos_data'
+WEATHER = 'weather'
+MESSAGES = 'messages'
+CIRCUIT_INFO = 'circuit_info'
+ALL_DATA = frozenset((LAPS, RESULTS, CAR_DATA, POS_DATA, WEATHER, MESSAGES, CIRCUIT_INFO))
+
+
+# Decorator to declare the data slices an analysis needs and, for analyses of one kind of session only, the session
+# it always loads. Every call of the analysis is timed as a phase
+def requires(*slices, session=None):
+    def decorator(func):
+        wrapper = timed(func)
+        wrapper.data_requirements = frozenset(slices)
+        wrapper.session_name = session
+        return wrapper
+    return decorator
+
+
+# Function to translate a set of data slices into the minimal Session.load() flags
+def load_flags(requirements):
+    requirements = set(requirements)
+    if CIRCUIT_INFO in requirements:
+        # Corner distances are computed from the position data of the fastest lap
+        requirements |= {LAPS, POS_DATA}
+    # Results are always part of a loaded session, telemetry can only be sliced per lap when laps are loaded
+    # and FastF1 loads car and position data together
+    return {'laps': bool(requirements & {LAPS, CAR_DATA, POS_DATA}),
+            'telemetry': bool(requirements & {CAR_DATA, POS_DATA}),
+            'weather': WEATHER in requirements,
+            'messages': MESSAGES in requirements}
+
+
+# Function to check whether a session loaded with the given flags contains all the requested data
+def _flags_cover(loaded, requested):
+    loaded = dict(loaded)
+    return all(loaded[flag] or not wanted for flag, wanted in requested.items())
+
+
+# Function to get a loaded session from the registry, the session is only loaded on first use
+def get_session(year, event_name, ses, **load_kwargs):
+    flags = dict(_LOAD_DEFAULTS, **load_kwargs)
+    base = (year, str(event_name), str(ses))
+    with _session_registry_lock:
+        # Any registered session that already holds the requested data can be reused
+        for key in reversed(_session_registry):
+            if key[:3] == base and _flags_cover(key[3], flags):
+                _session_registry.move_to_end(key)
+                return _session_registry[key]
+        # Otherwise load the union of the requested and already loaded data, so the new session replaces the old ones
+        superseded = [key for key in _session_registry if key[:3] == base]
+        for key in superseded:
+            flags = {flag: wanted or dict(key[3])[flag] for flag, wanted in flags.items()}
+    with phase('session.load') as timing:
+        session = _session_backend(year, event_name, ses)
+        load_kwargs = dict(flags)
+        # When the telemetry store holds laps of the session, car and position data are only loaded on a store miss
+        if flags['telemetry'] and _store_has_session(session):
+            load_kwargs['telemetry'] = False
+            _deferred_telemetry[session] = load_kwargs
+        session.load(**load_kwargs)
+        if flags['laps']:
+            timing.rows = len(session.laps)
+    key = base + (tuple(sorted(flags.items())),)
+    with _session_registry_lock:
+        for old_key in superseded:
+            _session_registry.pop(old_key, None)
+        _session_registry[key] = session
+        _session_registry.move_to_end(key)
+        while len(_session_registry) > SESSION_REGISTRY_SIZE:
+            _session_registry.popitem(last=False)
+    return session
+
+
+# Function to load a session with the union of the data requirements of one or more analyses
+def load_session_for(analyses, year, event_name, ses):
+    if callable(analyses):
+        analyses = [analyses]
+    requirements = set()
+    for analysis in analyses:
+        requirements |= getattr(analysis, 'data_requirements', ALL_DATA)
+    return get_session(year, event_name, ses, **load_flags(requirements))
+
+
+# Function to evict sessions from the registry, without arguments the whole registry is cleared
+def evict_session(year=None, event_name=None, ses=None):
+    with _session_registry_lock:
+        for key in list(_session_registry):
+            if ((year is None or key[0] == year)
+                    and (event_name is None or key[1] == str(event_name))
+                    and (ses is None or key[2] == str(ses))):
+                del _session_registry[key]
+
+
+# Function to change where sessions come from, any callable taking (year, event name, session) and returning an
+# unloaded session works, e.g. synthetic_session.session_backend(). Its sessions only use the telemetry store when
+# it has a cache_key attribute naming their store directory. Without a backend FastF1 is used again
+def set_session_backend(backend=None):
+    global _session_backend, _store_namespace
+    _session_backend = fastf1.get_session if backend is None else backend
+    # Sessions of other backends share year, event and session names, their telemetry is stored apart
+    _store_namespace = '' if backend is None else getattr(backend, 'cache_key', None)
+    # Sessions of the previous backend must not be handed out anymore
+    evict_session()
+
+
+# Function to change the number of sessions kept in the registry
+def set_session_registry_size(size):
+    global SESSION_REGISTRY_SIZE
+    SESSION_REGISTRY_SIZE = size
+    with _session_registry_lock:
+        while len(_session_registry) > SESSION_REGISTRY_SIZE:
+            _session_registry.popitem(last=False)
+
+
+# When True, figures are rendered with the Agg backend and never shown
+HEADLESS = False
+
+
+# Function to switch between interactive and headless rendering
+def set_headless(headless=True):
+    global HEADLESS
+    HEADLESS = headless
+    if headless:
+        plt.switch_backend('Agg')
+
+
+# Function to finish a figure: write it to the requested file (PNG, SVG, PDF, ...), show it when interactive and
+# release it. In headless mode a figure without output is returned open and the caller has to close it
+def finish_figure(fig, output=None, dpi=None, image_format=None):
+    with phase('render'):
+        if output is not None:
+            fig.savefig(output, dpi=dpi, format=image_format)
+        elif HEADLESS:
+            return fig
+        if not HEADLESS:
+            plt.show()
+        plt.close(fig)
+    return output
+
+
+# Function to prepare a rendering worker process: headless backend, a shared FastF1 cache, the instrumentation
+# settings of the parent process and optionally another session backend
+def _init_render_worker(cache_dir=None, instrument=False, instrument_memory=False, backend=None):
+    set_headless(True)
+    set_instrumentation(instrument, instrument_memory)
+    if backend is not None:
+        set_session_backend(backend)
+    if cache_dir is not None:
+        fastf1.Cache.enable_cache(cache_dir)
+
+
+# Function to render one chart inside a rendering worker process
+def _render_job(function_name, kwargs):
+    return globals()[function_name](**kwargs)
+
+
+# Function to render many charts to files in parallel worker processes.
+# Each job is a (function name, keyword arguments) pair, the keyword arguments include the output path
+def render_charts(jobs, max_workers=None, cache_dir=None, backend=None):
+    outputs = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), initializer=_init_render_worker,
+                             initargs=(cache_dir, INSTRUMENT, INSTRUMENT_MEMORY, backend)) as executor:
+        futures = {executor.submit(_run_with_timings, _render_job, function_name, kwargs): index
+                   for index, (function_name, kwargs) in enumerate(jobs)}
+        for future in as_completed(futures):
+            function_name, kwargs = jobs[futures[future]]
+            try:
+                outputs[futures[future]], records = future.result()
+                _merge_timings(records)
+            except Exception as error:
+                print(f"{function_name} could not be rendered to {kwargs.get('output')}: {error}")
+    return outputs
+
+# Directory of the on-disk caches of this module
+CACHE_DIR = os.environ.get('F1_ANALYSIS_CACHE', 'f1_analysis_cache')
+
+# Track outline of a circuit: segments ready for a LineCollection, the lap distance at the start of each segment,
+# the (x min, x max, y min, y max) bounds, the rotation of the official track map and the corners
+CircuitGeometry = namedtuple('CircuitGeometry', ['segments', 'distance', 'bounds', 'rotation', 'corners'])
+
+# Circuit geometries already loaded in this process, keyed by circuit
+_circuit_geometries = {}
+
+# Corners, marshal lights and marshal sectors (X, Y, Number, Letter, Angle, Distance) of a circuit and the rotation
+# of its official track map
+CircuitMetadata = namedtuple('CircuitMetadata', ['corners', 'marshal_lights', 'marshal_sectors', 'rotation'])
+
+# Circuit metadata already loaded in this process, keyed by circuit
+_circuit_metadata = {}
+
+
+# Function to get the key that identifies the circuit of a session across sessions and years
+def circuit_key(session):
+    circuit = session.session_info['Meeting']['Circuit']
+    return f"{circuit['Key']}_{circuit['ShortName']}".replace(' ', '_')
+
+
+# Function to get the corner, marshal and rotation metadata of the circuit of a session. FastF1 fetches it from
+# the web for every session, here it is fetched once per circuit and reused by later sessions, processes and years
+@timed
+def get_circuit_metadata(session):
+    key = circuit_key(session)
+    if key in _circuit_metadata:
+        return _circuit_metadata[key]
+
+    directory = os.path.join(CACHE_DIR, 'circuits')
+    path = os.path.join(directory, f'{key}_circuit_info.json')
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        # The marker distances come from the position data of the fastest lap, which a session loaded without
+        # telemetry (because the store held its laps) doesn't have yet
+        _load_deferred_telemetry(session)
+        circuit_info = session.get_circuit_info()
+        info = {name: getattr(circuit_info, name)[['X', 'Y', 'Number', 'Letter', 'Angle', 'Distance']]
+                .to_dict(orient='list') for name in ('corners', 'marshal_lights', 'marshal_sectors')}
+        info['rotation'] = float(circuit_info.rotation)
+        # Written to a temporary file first so concurrent renderers never read a partial file
+        with open(f'{path}.{os.getpid()}.tmp', 'w') as file:
+            json.dump(info, file)
+        os.replace(f'{path}.{os.getpid()}.tmp', path)
+    with open(path) as file:
+        info = json.load(file)
+    metadata = CircuitMetadata(pd.DataFrame(info['corners']), pd.DataFrame(info['marshal_lights']),
+                               pd.DataFrame(info['marshal_sectors']), info['rotation'])
+    _circuit_metadata[key] = metadata
+    return metadata
+
+
+# Function to draw the corners of a circuit on a distance axis as one line collection and one row of labels.
+# The lines span the full height of the axis whatever its data limits, the labels sit on a secondary top axis
+def annotate_corners(ax, corners):
+    distance = corners['Distance'].to_numpy(dtype=float)
+    segments = np.stack([np.column_stack([distance, np.zeros_like(distance)]),
+                         np.column_stack([distance, np.ones_like(distance)])], axis=1)
+    ax.add_collection(LineCollection(segments, transform=ax.get_xaxis_transform(), linestyles='dotted',
+                                     colors='grey'), autolim=False)
+    labels = ax.secondary_xaxis('top')
+    labels.set_xticks(distance, [f"{number}{letter}" for number, letter in zip(corners['Number'], corners['Letter'])],
+                      size='small')
+    labels.tick_params(length=0)
+    return labels
+
+
+# Function to build the geometry of a circuit from the fastest lap of a session and write it to disk
+def _build_circuit_geometry(session, directory, key):
+    telemetry = lap_telemetry(session.laps.pick_fastest(), ('X', 'Y', 'Distance'))
+    x = telemetry['X'].to_numpy(dtype=np.float32)
+    y = telemetry['Y'].to_numpy(dtype=np.float32)
+    points = np.column_stack([x, y]).reshape(-1, 1, 2)
+    arrays = {'segments': np.concatenate([points[:-1], points[1:]], axis=1),
+              'distance': telemetry['Distance'].to_numpy(dtype=np.float32)[:-1]}
+    # Every file is written to a temporary file of this process first and then replaced, so a worker that builds
+    # the same geometry concurrently never rewrites a file another one already has memory-mapped
+    for name, array in arrays.items():
+        tmp_path = os.path.join(directory, f'{key}_{name}.{os.getpid()}.tmp.npy')
+        np.save(tmp_path, array)
+        os.replace(tmp_path, os.path.join(directory, f'{key}_{name}.npy'))
+
+    meta = {'bounds': [float(x.min()), float(x.max()), float(y.min()), float(y.max())]}
+    # The meta file is written last, a geometry only counts as cached once it exists
+    meta_path = os.path.join(directory, f'{key}_meta.json')
+    with open(f'{meta_path}.{os.getpid()}.tmp', 'w') as file:
+        json.dump(meta, file)
+    os.replace(f'{meta_path}.{os.getpid()}.tmp', meta_path)
+
+
+# Function to get the track geometry of the circuit of a session. The geometry is built once per circuit,
+# persisted to disk and read back as memory-mapped arrays by later sessions, processes and years
+@timed
+def get_circuit_geometry(session):
+    key = circuit_key(session)
+    if key in _circuit_geometries:
+        return _circuit_geometries[key]
+
+    directory = os.path.join(CACHE_DIR, 'circuits')
+    meta_path = os.path.join(directory, f'{key}_meta.json')
+    if not os.path.exists(meta_path):
+        os.makedirs(directory, exist_ok=True)
+        _build_circuit_geometry(session, directory, key)
+    with open(meta_path) as file:
+        meta = json.load(file)
+    metadata = get_circuit_metadata(session)
+    geometry = CircuitGeometry(np.load(os.path.join(directory, f'{key}_segments.npy'), mmap_mode='r'),
+                               np.load(os.path.join(directory, f'{key}_distance.npy'), mmap_mode='r'),
+                               tuple(meta['bounds']), metadata.rotation, metadata.corners)
+    _circuit_geometries[key] = geometry
+    return geometry
+
+
+# When True, per-lap telemetry is read from and written through to the telemetry store
+USE_TELEMETRY_STORE = True
+
+# Kinds of per-lap telemetry in the store: car data with distance, and the merged car and position telemetry
+STORE_KINDS = ('car', 'telemetry')
+
+# Directory of the sessions of the current backend in the telemetry store, '' for FastF1. None for backends without
+# a cache_key: their sessions can't be told apart from others on disk and bypass the store
+_store_namespace = ''
+
+# Parsed index files of the telemetry store with the version of the file they were read from, keyed by directory
+_store_indexes = {}
+
+# Lock of the store writers of this process
+_store_write_lock = threading.Lock()
+
+# Sessions loaded without car and position data because the store held their laps, with their load flags
+_deferred_telemetry = weakref.WeakKeyDictionary()
+_deferred_telemetry_lock = threading.Lock()
+
+
+# Function to check whether the telemetry store is used for the sessions of the current backend
+def _store_enabled():
+    return USE_TELEMETRY_STORE and _store_namespace is not None
+
+
+# Function to get the directory of a session in the telemetry store, partitioned by backend/season/event/session
+def _store_directory(year, event_name, session_name):
+    if _store_namespace is None:
+        raise ValueError("The session backend has no cache_key, its sessions can't be kept in the telemetry store")
+    return os.path.join(CACHE_DIR, 'telemetry', _store_namespace, str(year), str(event_name).replace(' ', '_'),
+                        str(session_name).replace(' ', '_'))
+
+
+# Function to get the directory of a loaded session in the telemetry store
+def store_directory(session):
+    return _store_directory(session.event.year, session.event['EventName'], session.name)
+
+
+# Function to read the index of a session in the telemetry store. The parsed index is kept until another writer
+# replaces the file, every replacement gets a new inode
+def _read_store_index(directory):
+    index_path = os.path.join(directory, 'index.json')
+    try:
+        stat = os.stat(index_path)
+    except FileNotFoundError:
+        return {'channels': {}, 'segments': {}, 'laps': {}}
+    version = (stat.st_ino, stat.st_mtime_ns)
+    cached = _store_indexes.get(directory)
+    if cached is None or cached[0] != version:
+        with open(index_path) as file:
+            cached = _store_indexes[directory] = (version, json.load(file))
+    return cached[1]
+
+
+# Function to hold the write lock of a session in the telemetry store: a lock for the threads of this process and
+# a file lock in the session directory for other processes (where the platform has flock)
+@contextlib.contextmanager
+def _store_lock(directory):
+    os.makedirs(directory, exist_ok=True)
+    with _store_write_lock, open(os.path.join(directory, 'index.lock'), 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # Closing the lock file releases the file lock
+        yield
+
+
+# Function to check whether the telemetry store holds laps of a session, the session doesn't have to be loaded
+def _store_has_session(session):
+    return _store_enabled() and bool(_read_store_index(store_directory(session))['laps'])
+
+
+# Function to load the car and position data of a session that get_session() loaded without them because the
+# store held its laps. Runs once per session, on the first lap the store doesn't have
+def _load_deferred_telemetry(session):
+    with _deferred_telemetry_lock:
+        flags = _deferred_telemetry.pop(session, None)
+        if flags is not None:
+            with phase('session.load_telemetry'):
+                session.load(**dict(flags, telemetry=True))
+
+
+# Function to fetch the telemetry of a lap from FastF1
+def _fetch_lap_telemetry(lap, kind):
+    _load_deferred_telemetry(lap.session)
+    with phase(f'telemetry.{kind}') as timing:
+        if kind == 'car':
+            telemetry = lap.get_car_data().add_distance()
+        else:
+            telemetry = lap.get_telemetry()
+        timing.rows = len(telemetry)
+    return telemetry
+
+
+# Function to append the telemetry of several laps of one driver to the store as one new segment.
+# Every channel of a segment is a separate .npy file, the index maps each lap to its rows in the segment
+def _append_to_store(directory, driver, kind, telemetry_by_lap):
+    with _store_lock(directory):
+        # The index is read again under the lock, other threads and processes may have appended in the meantime.
+        # Laps another writer already stored are not written twice
+        index = {'channels': {}, 'segments': {}, 'laps': {}}
+        if os.path.exists(os.path.join(directory, 'index.json')):
+            with open(os.path.join(directory, 'index.json')) as file:
+                index = json.load(file)
+        stored = index['laps'].get(driver, {}).get(kind, {})
+        telemetry_by_lap = {lap_number: telemetry for lap_number, telemetry in telemetry_by_lap.items()
+                            if str(lap_number) not in stored}
+        if not telemetry_by_lap:
+            return
+        segment = index['segments'].get(driver, {}).get(kind, 0)
+        segment_directory = os.path.join(directory, driver, kind)
+        os.makedirs(segment_directory, exist_ok=True)
+
+        frame = pd.concat(list(telemetry_by_lap.values()), ignore_index=True)
+        # Text columns like 'Source' or 'DriverAhead' are left out, everything else is stored as is
+        channels = {column: str(frame[column].dtype) for column in frame.columns
+                    if frame[column].dtype.kind in 'biufmM'}
+        for column in channels:
+            np.save(os.path.join(segment_directory, f'{segment}_{column}.npy'), frame[column].to_numpy())
+
+        start = 0
+        laps = index['laps'].setdefault(driver, {}).setdefault(kind, {})
+        for lap_number, telemetry in telemetry_by_lap.items():
+            laps[str(lap_number)] = [segment, start, start + len(telemetry)]
+            start += len(telemetry)
+        index['channels'].setdefault(kind, {}).update(channels)
+        index['segments'].setdefault(driver, {})[kind] = segment + 1
+
+        # The index is replaced atomically through a temporary file of this writer, readers see the old or the new one
+        tmp_path = os.path.join(directory, f'index.json.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'w') as file:
+            json.dump(index, file)
+        os.replace(tmp_path, os.path.join(directory, 'index.json'))
+
+
+# Function to write the telemetry of all laps (or the fastest lap) of a session's drivers to the store
+def write_session_to_store(session, drivers=None, kinds=STORE_KINDS, fastest_only=False):
+    directory = store_directory(session)
+    for driver in drivers if drivers is not None else session.drivers:
+        driver_laps = session.laps.pick_driver(driver)
+        if fastest_only:
+            laps = [driver_laps.pick_fastest()]
+        else:
+            laps = [lap for _, lap in driver_laps.iterlaps()]
+        laps = [lap for lap in laps if lap is not None and not lap.empty]
+        if not laps:
+            continue
+        for kind in kinds:
+            telemetry_by_lap = {}
+            for lap in laps:
+                telemetry = _fetch_lap_telemetry(lap, kind)
+                if len(telemetry):
+                    telemetry_by_lap[int(lap['LapNumber'])] = telemetry
+            if telemetry_by_lap:
+                _append_to_store(directory, str(laps[0]['DriverNumber']), kind, telemetry_by_lap)
+
+
+# Function to read the telemetry of one lap from the store, only the requested channels are read (memory-mapped).
+# event_name and session_name are the EventName and session name of the loaded session, e.g. 'Qualifying'
+def read_lap_from_store(year, event_name, session_name, driver_number, lap_number, kind='car', channels=None):
+    directory = _store_directory(year, event_name, session_name)
+    index = _read_store_index(directory)
+    location = index['laps'].get(str(driver_number), {}).get(kind, {}).get(str(int(lap_number)))
+    if location is None:
+        return None
+    segment, start, stop = location
+    if channels is None:
+        channels = index['channels'][kind]
+    segment_directory = os.path.join(directory, str(driver_number), kind)
+    with phase('telemetry.store', rows=stop - start):
+        return pd.DataFrame({channel: np.load(os.path.join(segment_directory, f'{segment}_{channel}.npy'),
+                                              mmap_mode='r')[start:stop]
+                             for channel in channels})
+
+
+# Function to get the telemetry of a lap ('car' data with distance or the merged 'telemetry'). The lap is read
+# from the telemetry store when it holds it, otherwise it is fetched from FastF1 and written through to the store
+def get_lap_telemetry(lap, kind='car'):
+    if not _store_enabled():
+        return _fetch_lap_telemetry(lap, kind)
+    session = lap.session
+    driver_number = str(lap['DriverNumber'])
+    lap_number = int(lap['LapNumber'])
+    telemetry = read_lap_from_store(session.event.year, session.event['EventName'], session.name,
+                                    driver_number, lap_number, kind)
+    if telemetry is None:
+        telemetry = _fetch_lap_telemetry(lap, kind)
+        if len(telemetry):
+            _append_to_store(store_directory(session), driver_number, kind, {lap_number: telemetry})
+    return telemetry
+
+
+# Channels that are part of the car data, requests for these alone don't need the car/position merge
+CAR_DATA_CHANNELS = frozenset(('Date', 'SessionTime', 'Time', 'RPM', 'Speed', 'nGear', 'Throttle', 'Brake', 'DRS',
+                               'Source', 'Distance'))
+
+# Memoized lap telemetry per session, the entries of a session disappear together with the session
+_telemetry_memo = weakref.WeakKeyDictionary()
+_telemetry_memo_lock = threading.Lock()
+# Locks of the laps being fetched, per session and memo key
+_telemetry_fetch_locks = weakref.WeakKeyDictionary()
+_telemetry_memo_stats = {'hits': 0, 'misses': 0}
+
+
+# Function to get the telemetry of a lap that holds the requested channels, memoized per lap.
+# The car data is used when it has all requested channels, otherwise the merged telemetry
+def lap_telemetry(lap, channels=None):
+    kind = 'car' if channels is not None and set(channels) <= CAR_DATA_CHANNELS else 'telemetry'
+    key = (str(lap['DriverNumber']), int(lap['LapNumber']), kind)
+    with _telemetry_memo_lock:
+        memo = _telemetry_memo.setdefault(lap.session, {})
+        telemetry = memo.get(key)
+        _telemetry_memo_stats['misses' if telemetry is None else 'hits'] += 1
+        if telemetry is None:
+            fetch_lock = _telemetry_fetch_locks.setdefault(lap.session, {}).setdefault(key, threading.Lock())
+    if telemetry is None:
+        # Threads that miss the same lap at once (e.g. the panels of a dashboard) wait for the first one's fetch
+        with fetch_lock:
+            with _telemetry_memo_lock:
+                telemetry = memo.get(key)
+            if telemetry is None:
+                # FastF1 telemetry refers back to its session, which would keep the weak key of the memo alive
+                # forever. A plain DataFrame (like the laps read from the store) lets evicted sessions go
+                telemetry = pd.DataFrame(get_lap_telemetry(lap, kind))
+                with _telemetry_memo_lock:
+                    memo[key] = telemetry
+    return telemetry
+
+
+# Function to report the hits and misses of the telemetry memo and how many laps it holds
+def telemetry_cache_info():
+    with _telemetry_memo_lock:
+        return dict(_telemetry_memo_stats, sessions=len(_telemetry_memo),
+                    laps=sum(len(memo) for memo in _telemetry_memo.values()))
+
+
+# Function to empty the telemetry memo and reset its statistics
+def clear_telemetry_cache():
+    with _telemetry_memo_lock:
+        _telemetry_memo.clear()
+        _telemetry_fetch_locks.clear()
+        _telemetry_memo_stats.update(hits=0, misses=0)
+
+
+# Function to pick the fastest lap of a driver in a session
+def pick_fastest_lap(session, driver):
+    with phase('pick_fastest'):
+        return session.laps.pick_driver(driver).pick_fastest()
+
 
 # Function to get the speed telemetry of a driver on their fastest lap
-def get_speed_telemetry(year, event_name, driver, ses):
+@requires(LAPS, CAR_DATA, POS_DATA, CIRCUIT_INFO)
+def get_speed_telemetry(year, event_name, driver, ses, session=None, output=None):
     colormap = mpl.cm.plasma
-    session = ff1.get_session(year, event_name, ses)
-    session.load()
-    lap = session.laps.pick_driver(driver).pick_fastest()
+    if session is None:
+        session = load_session_for(get_speed_telemetry, year, event_name, ses)
+    lap = pick_fastest_lap(session, driver)
 
     # Get telemetry data
-    x = lap.telemetry['X']              # values for x-axis
-    y = lap.telemetry['Y']              # values for y-axis
-    color = lap.telemetry['Speed']      # value to base color gradient on
+    telemetry = lap_telemetry(lap, ('X', 'Y', 'Speed'))
+    x = telemetry['X']              # values for x-axis
+    y = telemetry['Y']              # values for y-axis
+    color = telemetry['Speed']      # value to base color gradient on
     points = np.array([x, y]).T.reshape(-1, 1, 2)
     segments = np.concatenate([points[:-1], points[1:]], axis=1)
     fig, ax = plt.subplots(sharex=True, sharey=True, figsize=(12, 6.75))
@@ -36,259 +759,313 @@ def get_speed_telemetry(year, event_name, driver, ses):
     plt.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.12)
     ax.axis('off')
 
-    ax.plot(lap.telemetry['X'], lap.telemetry['Y'], color='black', linestyle='-', linewidth=16, zorder=0)
+    # The track outline is the same for every driver, it comes from the circuit geometry cache
+    geometry = get_circuit_geometry(session)
+    ax.plot(geometry.segments[:, 0, 0], geometry.segments[:, 0, 1], color='black', linestyle='-', linewidth=16,
+            zorder=0)
     norm = plt.Normalize(color.min(), color.max())
     lc = LineCollection(segments, cmap=colormap, norm=norm, linestyle='-', linewidth=5)
     lc.set_array(color)
+    ax.add_collection(lc)
 
     # Add colorbar
     cbaxes = fig.add_axes([0.25, 0.05, 0.5, 0.05])
     normlegend = mpl.colors.Normalize(vmin=color.min(), vmax=color.max())
     legend = mpl.colorbar.ColorbarBase(cbaxes, norm=normlegend, cmap=colormap, orientation="horizontal")
-    plt.show()
+    return finish_figure(fig, output)
 
 
 # Function to get the speed telemetry with corner annotations
-def get_speed_traces_with_corner_annotations(year, event_name, driver, ses):
+@requires(LAPS, CAR_DATA, CIRCUIT_INFO)
+def get_speed_traces_with_corner_annotations(year, event_name, driver, ses, session=None, output=None):
     fastf1.plotting.setup_mpl(misc_mpl_mods=False)
 
-    session = fastf1.get_session(year, event_name, ses)
-    session.load()
-    fastest_lap = session.laps.pick_driver(driver).pick_fastest()
+    if session is None:
+        session = load_session_for(get_speed_traces_with_corner_annotations, year, event_name, ses)
+    fastest_lap = pick_fastest_lap(session, driver)
 
-    car_data = fastest_lap.get_car_data().add_distance()
-    circuit_info = session.get_circuit_info()
+    car_data = lap_telemetry(fastest_lap, ('Distance', 'Speed'))
     team_color = fastf1.plotting.team_color(fastest_lap['Team'])
     fig, ax = plt.subplots()
-    ax.plot(car_data['Distance'], car_data['Speed'],
-            color=team_color, label=fastest_lap['Driver'])
-
-    v_min = car_data['Speed'].min()
-    v_max = car_data['Speed'].max()
-    ax.vlines(x=circuit_info.corners['Distance'], ymin=v_min - 20, ymax=v_max + 20,
-              linestyles='dotted', colors='grey')
-    for _, corner in circuit_info.corners.iterrows():
-        txt = f"{corner['Number']}{corner['Letter']}"
-        ax.text(corner['Distance'], v_min - 30, txt,
-                va='center_baseline', ha='center', size='small')
+    plot_trace(ax, car_data['Distance'], car_data['Speed'],
+               color=team_color, label=fastest_lap['Driver'])
+
+    annotate_corners(ax, get_circuit_metadata(session).corners)
 
     ax.set_xlabel('Distance in m')
     ax.set_ylabel('Speed in km/h')
     ax.legend()
     plt.suptitle(f"{session.event['EventName']} {year} speed traces with corners annotations")
-    ax.set_ylim([v_min - 40, v_max + 20])
 
-    plt.show()
+    return finish_figure(fig, output)
 
 
-# Function to compare the speeds of two drivers on their fastest laps
-def overlaying_speed_traces_of_two_drivers(year, event_name, driver1, driver2, ses):
+# Channels that hold discrete states, they are resampled by holding the last sample instead of interpolating
+STEP_CHANNELS = ('nGear', 'Brake', 'DRS')
+
+# Channels put on the distance grid by default, 'Time' is stored in seconds so deltas can be taken directly
+GRID_CHANNELS = ('Time', 'Speed', 'RPM', 'nGear', 'Throttle', 'Brake', 'DRS')
+
+# Laps resampled onto one shared distance grid, data has the shape (laps, channels, samples)
+DistanceGrid = namedtuple('DistanceGrid', ['distance', 'data', 'channels', 'labels'])
+
+
+# Function to resample the telemetry of several laps onto one shared distance grid
+@timed
+def resample_to_distance_grid(telemetry_list, channels=GRID_CHANNELS, resolution=1.0, labels=None):
+    # The grid only covers the distance that every lap has data for
+    end = min(telemetry['Distance'].max() for telemetry in telemetry_list)
+    distance = np.arange(0, end, resolution)
+    data = np.empty((len(telemetry_list), len(channels), len(distance)), dtype=np.float32)
+
+    for i, telemetry in enumerate(telemetry_list):
+        lap_distance = telemetry['Distance'].to_numpy(dtype=float)
+        # Index of the last sample at or before each grid point, used by the step channels
+        previous = np.clip(np.searchsorted(lap_distance, distance, side='right') - 1, 0, len(lap_distance) - 1)
+        for j, channel in enumerate(channels):
+            if channel == 'Time':
+                values = telemetry['Time'].dt.total_seconds().to_numpy()
+            else:
+                values = telemetry[channel].to_numpy(dtype=float)
+            if channel in STEP_CHANNELS:
+                data[i, j] = values[previous]
+            else:
+                data[i, j] = np.interp(distance, lap_distance, values)
+    if labels is None:
+        labels = list(range(len(telemetry_list)))
+    return DistanceGrid(distance.astype(np.float32), data, tuple(channels), list(labels))
+
+
+# Function to resample the car data of several laps onto one shared distance grid
+def resample_laps_to_distance_grid(laps, channels=GRID_CHANNELS, resolution=1.0, labels=None):
+    laps = list(laps)
+    if labels is None:
+        labels = [lap['Driver'] for lap in laps]
+    telemetry_list = [lap_telemetry(lap, ('Distance',) + tuple(channels)) for lap in laps]
+    return resample_to_distance_grid(telemetry_list, channels, resolution, labels)
+
+
+# Function to get one channel of every lap from a distance grid, shape (laps, samples)
+def grid_channel(grid, channel):
+    return grid.data[:, grid.channels.index(channel)]
+
+
+# Function to get the time gap of every lap to a reference lap along the distance grid
+def grid_delta_time(grid, reference=0):
+    time = grid_channel(grid, 'Time')
+    return time - time[reference]
+
+
+# When True, traces are decimated to the pixel width of their axis before plotting, False plots every sample
+DECIMATE_TRACES = True
+
+# Resolution in dots per inch the decimated traces are drawn for, the highest dpi charts are saved at
+DECIMATION_DPI = 300
+
+
+# Function to switch the decimation of traces on or off and optionally change the resolution it is exact for
+def set_trace_decimation(enabled=True, dpi=None):
+    global DECIMATE_TRACES, DECIMATION_DPI
+    DECIMATE_TRACES = enabled
+    if dpi is not None:
+        DECIMATION_DPI = dpi
+
+
+# Function to pick the samples of a trace that draw the same line at the given number of pixel columns (M4): the
+# first, last, lowest and highest sample of every column, so the line only differs by sub-pixel placement. Minima
+# like the apex speed and maxima are kept exactly. For step channels every change of value and the sample before it
+# are kept as well, so braking points and gear changes stay at their exact distance. Returns the indices of the kept
+# samples, x has to be increasing
+def decimate_trace(x, y, columns, step=False):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) <= 4 * columns or not np.all(np.diff(x) >= 0) or x[-1] == x[0]:
+        return np.arange(len(x))
+    column = np.minimum(((x - x[0]) / (x[-1] - x[0]) * columns).astype(int), columns - 1)
+    starts = np.flatnonzero(np.diff(column, prepend=-1))
+    ends = np.append(starts[1:], len(x)) - 1
+    # Sorted by column and value, the first and last sample of a column are its minimum and maximum
+    order = np.lexsort((y, column))
+    keep = [starts, ends, order[starts], order[ends], np.flatnonzero(np.isnan(y))]
+    if step:
+        changes = np.flatnonzero(y[1:] != y[:-1])
+        keep += [changes, changes + 1]
+    return np.unique(np.concatenate(keep))
+
+
+# Function to plot a trace over distance on an axis, decimated to the width of the axis unless switched off
+def plot_trace(ax, x, y, step=False, **kwargs):
+    if DECIMATE_TRACES:
+        columns = max(int(np.ceil(ax.get_position().width * ax.figure.get_figwidth() * DECIMATION_DPI)), 1)
+        keep = decimate_trace(x, y, columns, step)
+        x = np.asarray(x)[keep]
+        y = np.asarray(y)[keep]
+    return ax.plot(x, y, **kwargs)
+
+
+# Axis label of each comparison channel
+COMPARISON_CHANNELS = {
+    'Speed': 'Speed in km/h',
+    'RPM': 'RPM',
+    'Throttle': 'Throttle pressure in %',
+    'Brake': 'Brake in True/False',
+    'nGear': 'Gear',
+    'DRS': 'DRS',
+}
+
+# A lap taking part in a comparison together with its car data and plot color
+ComparisonLap = namedtuple('ComparisonLap', ['label', 'lap', 'telemetry', 'color'])
+
+
+# Function to fetch the car data of every compared lap exactly once, by default the fastest lap of each driver
+def fetch_comparison_laps(session, drivers=None, laps=None, labels=None, channels=tuple(COMPARISON_CHANNELS)):
+    if laps is None:
+        laps = [pick_fastest_lap(session, driver) for driver in drivers]
+        if labels is None:
+            labels = list(drivers)
+    laps = list(laps)
+    if labels is None:
+        labels = [lap['Driver'] for lap in laps]
+    channels = ('Distance',) + tuple(channels)
+    return [ComparisonLap(label, lap, lap_telemetry(lap, channels), fastf1.plotting.team_color(lap['Team']))
+            for label, lap in zip(labels, laps)]
+
+
+# Function to plot any subset of channels for already fetched comparison laps, one axis per channel
+def plot_comparison_channels(session, comparison, channels, axes=None):
+    if axes is None:
+        fig, axes = plt.subplots(len(channels), figsize=(16, 9 if len(channels) == 1 else 4.5 * len(channels)),
+                                 dpi=100, sharex=True, squeeze=False)
+        axes = axes[:, 0]
+    corners = get_circuit_metadata(session).corners
+    for ax, channel in zip(axes, channels):
+        for entry in comparison:
+            plot_trace(ax, entry.telemetry['Distance'], entry.telemetry[channel], step=channel in STEP_CHANNELS,
+                       color=entry.color, label=entry.label)
+        annotate_corners(ax, corners)
+        ax.set_xlabel('Distance in m')
+        ax.set_ylabel(COMPARISON_CHANNELS[channel])
+        ax.legend()
+    return axes
+
+
+# Function to compare several channels for any number of drivers (or explicit laps) with one telemetry fetch per lap
+@requires(LAPS, CAR_DATA, CIRCUIT_INFO)
+def compare_drivers(year, event_name, drivers, ses, channels=('Speed', 'RPM', 'Throttle', 'Brake', 'nGear'),
+                    laps=None, session=None, output=None):
     plt.style.use("cyberpunk")
-    session = fastf1.get_session(year, event_name, ses)
-    session.load()
-    driver1_lap = session.laps.pick_driver(driver1).pick_fastest()
-    driver2_lap = session.laps.pick_driver(driver2).pick_fastest()
-    driver1_tel = driver1_lap.get_car_data().add_distance()
-    driver2_tel = driver2_lap.get_car_data().add_distance()
-    driver1_color = fastf1.plotting.team_color(driver1_lap['Team'])
-    driver2_color = fastf1.plotting.team_color(driver2_lap['Team'])
-    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
+    if session is None:
+        session = load_session_for(compare_drivers, year, event_name, ses)
+    comparison = fetch_comparison_laps(session, drivers, laps)
+    axes = plot_comparison_channels(session, comparison, channels)
+    axes[0].set_title(f"Comparison of {', '.join(entry.label for entry in comparison)}\n "
+                      f"{session.event['EventName']} {session.event.year} {session.name}")
+    return finish_figure(axes[0].figure, output)
 
-    ax.plot(driver1_tel['Distance'], driver1_tel['Speed'], color=driver1_color, label=driver1)
-    ax.plot(driver2_tel['Distance'], driver2_tel['Speed'], color=driver2_color, label=driver2)
 
-    circuit_info = session.get_circuit_info()
-    ax.vlines(x=circuit_info.corners['Distance'], ymin=40, ymax=370,
-              linestyles='dotted', colors='grey')
-    for _, corner in circuit_info.corners.iterrows():
-        txt = f"{corner['Number']}{corner['Letter']}"
-        ax.text(corner['Distance'], 50, txt,
-                va='center_baseline', ha='center', size='small')
-    ax.set_xlabel('Distance in m')
-    ax.set_ylabel('Speed in km/h')
-    ax.legend()
+# Function to compare the speeds of two drivers on their fastest laps
+@requires(LAPS, CAR_DATA, CIRCUIT_INFO)
+def overlaying_speed_traces_of_two_drivers(year, event_name, driver1, driver2, ses, session=None, output=None):
+    plt.style.use("cyberpunk")
+    if session is None:
+        session = load_session_for(overlaying_speed_traces_of_two_drivers, year, event_name, ses)
+    comparison = fetch_comparison_laps(session, [driver1, driver2])
+    axes = plot_comparison_channels(session, comparison, ['Speed'])
     plt.title(f"Fastest Lap Comparison {driver1} and {driver2}\n "
               f"{session.event['EventName']} {session.event.year} {session.name}\n"
-              f"{driver1}: {strftimedelta(session.laps.pick_driver(driver1).pick_fastest()['LapTime'], '%m:%s.%ms')}\n"
-              f"{driver2}: {strftimedelta(session.laps.pick_driver(driver2).pick_fastest()['LapTime'], '%m:%s.%ms')}\n")
+              f"{driver1}: {strftimedelta(comparison[0].lap['LapTime'], '%m:%s.%ms')}\n"
+              f"{driver2}: {strftimedelta(comparison[1].lap['LapTime'], '%m:%s.%ms')}\n")
 
-    plt.show()
+    return finish_figure(axes[0].figure, output)
 
 
 # Function to compare the RPM traces of two drivers
-def overlaying_rpm_traces_of_two_drivers(year, event_name, driver1, driver2, ses):
+@requires(LAPS, CAR_DATA, CIRCUIT_INFO)
+def overlaying_rpm_traces_of_two_drivers(year, event_name, driver1, driver2, ses, session=None, output=None):
     fastf1.plotting.setup_mpl(misc_mpl_mods=False)
-    session = fastf1.get_session(year, event_name, ses)
-    session.load()
-    driver1_lap = session.laps.pick_driver(driver1).pick_fastest()
-    driver2_lap = session.laps.pick_driver(driver2).pick_fastest()
-    driver1_tel = driver1_lap.get_car_data().add_distance()
-    driver2_tel = driver2_lap.get_car_data().add_distance()
-    driver1_color = fastf1.plotting.team_color(driver1_lap['Team'])
-    driver2_color = fastf1.plotting.team_color(driver2_lap['Team'])
-    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
-
-    ax.plot(driver1_tel['Distance'], driver1_tel['RPM'], color=driver1_color, label=driver1)
-    ax.plot(driver2_tel['Distance'], driver2_tel['RPM'], color=driver2_color, label=driver2)
-
-    circuit_info = session.get_circuit_info()
-    ax.vlines(x=circuit_info.corners['Distance'], ymin=70, ymax=12000,
-              linestyles='dotted', colors='grey')
-    for _, corner in circuit_info.corners.iterrows():
-        txt = f"{corner['Number']}{corner['Letter']}"
-        ax.text(corner['Distance'], 70, txt,
-                va='center_baseline', ha='center', size='small')
-    ax.set_xlabel('Distance in m')
-    ax.set_ylabel('RPM')
-    ax.legend()
+    if session is None:
+        session = load_session_for(overlaying_rpm_traces_of_two_drivers, year, event_name, ses)
+    comparison = fetch_comparison_laps(session, [driver1, driver2])
+    axes = plot_comparison_channels(session, comparison, ['RPM'])
     plt.title(f"RPM comparison {driver1} and {driver2}\n "
               f"{session.event['EventName']} {session.event.year} {session.name}")
-    plt.show()
+    return finish_figure(axes[0].figure, output)
 
 
 # Function to compare the throttle pressure of two drivers
-def comparison_of_throttle_pressure_for_two_drivers(year, event_name, driver1, driver2, ses):
+@requires(LAPS, CAR_DATA, CIRCUIT_INFO)
+def comparison_of_throttle_pressure_for_two_drivers(year, event_name, driver1, driver2, ses, session=None, output=None):
     plt.style.use("cyberpunk")
     # Load a session and its telemetry data
-    session = fastf1.get_session(year, event_name, ses)
-    session.load()
-    driver1_lap = session.laps.pick_driver(driver1).pick_fastest()
-    driver2_lap = session.laps.pick_driver(driver2).pick_fastest()
-    driver1_tel = driver1_lap.get_car_data().add_distance()
-    driver2_tel = driver2_lap.get_car_data().add_distance()
-    driver1_color = fastf1.plotting.team_color(driver1_lap['Team'])
-    driver2_color = fastf1.plotting.team_color(driver2_lap['Team'])
-    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
-
-    ax.plot(driver1_tel['Distance'], driver1_tel['Throttle'], color=driver1_color, label=driver1)
-    ax.plot(driver2_tel['Distance'], driver2_tel['Throttle'], color=driver2_color, label=driver2)
-
-    circuit_info = session.get_circuit_info()
-    ax.vlines(x=circuit_info.corners['Distance'], ymin=0, ymax=100,
-              linestyles='dotted', colors='grey')
-    for _, corner in circuit_info.corners.iterrows():
-        txt = f"{corner['Number']}{corner['Letter']}"
-        ax.text(corner['Distance'], 0, txt,
-                va='center_baseline', ha='center', size='small')
-    ax.set_xlabel('Distance in m')
-    ax.set_ylabel('Throttle pressure in %')
-    ax.legend()
+    if session is None:
+        session = load_session_for(comparison_of_throttle_pressure_for_two_drivers, year, event_name, ses)
+    comparison = fetch_comparison_laps(session, [driver1, driver2])
+    axes = plot_comparison_channels(session, comparison, ['Throttle'])
     plt.title(f"Comparison of throttle pressure for {driver1} and {driver2}\n "
               f"{session.event['EventName']} {session.event.year} {session.name}")
-    plt.show()
+    return finish_figure(axes[0].figure, output)
 
 
 # Function to compare the gear usage of two drivers
-def comparison_of_gear_number_for_two_drivers(year, event_name, drivers, ses):
+@requires(LAPS, CAR_DATA, CIRCUIT_INFO)
+def comparison_of_gear_number_for_two_drivers(year, event_name, drivers, ses, session=None, output=None):
     # Load a session and its telemetry data
-    session = fastf1.get_session(year, event_name, ses)
-    session.load()
+    if session is None:
+        session = load_session_for(comparison_of_gear_number_for_two_drivers, year, event_name, ses)
     plt.style.use("cyberpunk")
 
-    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
-
-    for driver in drivers:
-        driver1_lap = session.laps.pick_driver(driver).pick_fastest()
-        driver1_tel = driver1_lap.get_car_data().add_distance()
-        driver1_color = fastf1.plotting.team_color(driver1_lap['Team'])
-        ax.plot(driver1_tel['Distance'], driver1_tel['nGear'], color=driver1_color, label=driver)
-
-    circuit_info = session.get_circuit_info()
-    ax.vlines(x=circuit_info.corners['Distance'], ymin=0, ymax=8,
-              linestyles='dotted', colors='grey')
-    for _, corner in circuit_info.corners.iterrows():
-        txt = f"{corner['Number']}{corner['Letter']}"
-        ax.text(corner['Distance'], 0, txt,
-                va='center_baseline', ha='center', size='small')
-    ax.set_xlabel('Distance in m')
-    ax.set_ylabel('Gear')
-    ax.legend()
+    comparison = fetch_comparison_laps(session, drivers)
+    axes = plot_comparison_channels(session, comparison, ['nGear'])
 
     plt.title(f"Comparison of gear usage for {drivers}\n "
               f"{session.event['EventName']} {session.event.year} {session.name}")
 
-    plt.show()
+    return finish_figure(axes[0].figure, output)
 
 
 # Function to compare the brake pressure of two drivers
-def comparison_of_brake_pressure_for_two_drivers(year, event_name, driver1, driver2, ses):
+@requires(LAPS, CAR_DATA, CIRCUIT_INFO)
+def comparison_of_brake_pressure_for_two_drivers(year, event_name, driver1, driver2, ses, session=None, output=None):
     fastf1.plotting.setup_mpl(misc_mpl_mods=False)
 
     # Load a session and its telemetry data
-    session = fastf1.get_session(year, event_name, ses)
-    session.load()
-    driver1_lap = session.laps.pick_driver(driver1).pick_fastest()
-    driver2_lap = session.laps.pick_driver(driver2).pick_fastest()
-    driver1_tel = driver1_lap.get_car_data().add_distance()
-    driver2_tel = driver2_lap.get_car_data().add_distance()
-    driver1_color = fastf1.plotting.team_color(driver1_lap['Team'])
-    driver2_color = fastf1.plotting.team_color(driver2_lap['Team'])
-    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
-
-    ax.plot(driver1_tel['Distance'], driver1_tel['Brake'], color=driver1_color, label=driver1)
-    ax.plot(driver2_tel['Distance'], driver2_tel['Brake'], color=driver2_color, label=driver2)
-
-    circuit_info = session.get_circuit_info()
-    ax.vlines(x=circuit_info.corners['Distance'], ymin=0, ymax=1,
-              linestyles='dotted', colors='grey')
-    for _, corner in circuit_info.corners.iterrows():
-        txt = f"{corner['Number']}{corner['Letter']}"
-        ax.text(corner['Distance'], 0, txt,
-                va='center_baseline', ha='center', size='small')
-    ax.set_xlabel('Distance in m')
-    ax.set_ylabel('Brake in True/False')
-    ax.legend()
+    if session is None:
+        session = load_session_for(comparison_of_brake_pressure_for_two_drivers, year, event_name, ses)
+    comparison = fetch_comparison_laps(session, [driver1, driver2])
+    axes = plot_comparison_channels(session, comparison, ['Brake'])
     plt.title(f"Comparison of brake pressure for {driver1} and {driver2}\n "
               f"{session.event['EventName']} {session.event.year} {session.name}")
-    plt.show()
-
-
-# Function to get the positions gained on the first lap of a race
-def get_gained_positions_on_first_lap(year, event_name):
-    gained_positions = {}
-    gaining_position_sum = {}
-    fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=False)
-
-    session = fastf1.get_session(year, event_name, 'R')
-    session.load(telemetry=True)
-    for driver in session.drivers:
-        results = session.results
-        first_lap = session.laps.pick_driver(driver).pick_laps(1)
-        grid_position = results[results['DriverNumber'] == driver]['GridPosition']
-        if int(grid_position) != 0:
-            position_after_first_lap = first_lap['Position']
-            if not grid_position.empty and not position_after_first_lap.empty:
-                gained_positions1 = int(grid_position.iloc[0]) - int(position_after_first_lap.iloc[0])
-            else:
-                # Handle the case when one or both DataFrames are empty
-                print("Error: DataFrames are empty.")
-            gained_positions[driver] = gained_positions1
-            if driver not in gaining_position_sum:
-                gaining_position_sum[driver] = [0, 0]
-            gaining_position_sum[driver][0] += gained_positions[driver]
-            gaining_position_sum[driver][1] += 1
-        else:
-            print(f"{event_name} driver with number {driver} starts from the pit lane")
-    sorted_driver_times = dict(sorted(gained_positions.items(), key=operator.itemgetter(1)))
-
-    sorted_driver_times_names = list()
-
-    team_colors = list()
-    for index in sorted_driver_times:
-        try:
-            sorted_driver_times_names.append(results[results['DriverNumber'] == index]['Abbreviation'][0])
-            color = fastf1.plotting.team_color(results[results['DriverNumber'] == index]['TeamName'].values[0])
-            team_colors.append(color)
-        except:
-            "empty"
-    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
-    data = {'driver': list(map(str, sorted_driver_times.keys())),
-            'positions': list(sorted_driver_times.values())}
-    df = pd.DataFrame(data)
-    ax.barh(df.index, df['positions'],
-            color=team_colors, edgecolor='grey')
-    ax.set_yticks(df.index)
-    ax.set_yticklabels(sorted_driver_times_names)
+    return finish_figure(axes[0].figure, output)
+
+
+# Function to compute grid, first lap and finishing positions plus positions gained for the whole field
+@timed
+def compute_positions_gained(session, first_lap=True):
+    table = session.results[['DriverNumber', 'Abbreviation', 'TeamName', 'GridPosition', 'Position']]
+    table = table.reset_index(drop=True)
+    if first_lap:
+        first_laps = session.laps.loc[session.laps['LapNumber'] == 1, ['DriverNumber', 'Position']]
+        first_laps = first_laps.rename(columns={'Position': 'FirstLapPosition'})
+        table = table.merge(first_laps, on='DriverNumber', how='left')
+
+    # A grid position of 0 means that the driver started from the pit lane
+    table['PitLaneStart'] = table['GridPosition'] == 0
+    grid_position = table['GridPosition'].where(~table['PitLaneStart'])
+    if first_lap:
+        table['GainedFirstLap'] = grid_position - table['FirstLapPosition']
+    table['GainedRace'] = grid_position - table['Position']
+    return table
+
+
+# Function to draw the positions gained from compute_positions_gained() on an axis
+def _plot_positions_gained(table, column, ax):
+    # Pit lane starters and drivers without a position have no value and are left out
+    table = table.dropna(subset=[column]).sort_values(column, kind='stable').reset_index(drop=True)
+    team_colors = {team: fastf1.plotting.team_color(team) for team in table['TeamName'].unique()}
+    ax.barh(table.index, table[column],
+            color=table['TeamName'].map(team_colors).tolist(), edgecolor='grey')
+    ax.set_yticks(table.index)
+    ax.set_yticklabels(table['Abbreviation'])
 
     # Show fastest at the top
     ax.invert_yaxis()
@@ -296,62 +1073,31 @@ def get_gained_positions_on_first_lap(year, event_name):
     # Draw vertical lines behind the bars
     ax.set_axisbelow(True)
     ax.xaxis.grid(True, which='major', linestyle='--', color='black', zorder=-1000)
+    return ax
+
+
+# Function to get the positions gained on the first lap of a race
+@requires(LAPS, RESULTS, session='R')
+def get_gained_positions_on_first_lap(year, event_name, session=None, output=None):
+    fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=False)
+
+    if session is None:
+        session = load_session_for(get_gained_positions_on_first_lap, year, event_name, 'R')
+    table = compute_positions_gained(session)
 
+    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
+    _plot_positions_gained(table, 'GainedFirstLap', ax)
     plt.xlabel('Positions gained')
     plt.ylabel('Drivers')
     plt.title(f"Positions gained in {session.session_info['Meeting']['Name']} {year}")
-    plt.show()
+    return finish_figure(fig, output)
 
 
 # Function to get the positions gained on the first lap and display it on an existing axis
+@requires(LAPS, RESULTS)
 def get_gained_positions_on_first_lap_wall(session, ax=None):
-    gained_positions = {}
-    gaining_position_sum = {}
-    for driver in session.drivers:
-        results = session.results
-        first_lap = session.laps.pick_driver(driver).pick_laps(1)
-        grid_position = results[results['DriverNumber'] == driver]['GridPosition']
-        if int(grid_position) != 0:
-            position_after_first_lap = first_lap['Position']
-            if not grid_position.empty and not position_after_first_lap.empty:
-                gained_positions1 = int(grid_position.iloc[0]) - int(position_after_first_lap.iloc[0])
-            else:
-                # Handle the case when one or both DataFrames are empty
-                print("Error: DataFrames are empty.")
-            gained_positions[driver] = gained_positions1
-            if driver not in gaining_position_sum:
-                gaining_position_sum[driver] = [0, 0]
-            gaining_position_sum[driver][0] += gained_positions[driver]
-            gaining_position_sum[driver][1] += 1
-        else:
-            print(f"{session.session_info['Meeting']['Name']} driver with number {driver} starts from the pit lane")
-    sorted_driver_times = dict(sorted(gained_positions.items(), key=operator.itemgetter(1)))
-
-    sorted_driver_times_names = list()
-
-    team_colors = list()
-    for index in sorted_driver_times:
-        try:
-            sorted_driver_times_names.append(results[results['DriverNumber'] == index]['Abbreviation'][0])
-            color = fastf1.plotting.team_color(results[results['DriverNumber'] == index]['TeamName'].values[0])
-            team_colors.append(color)
-        except:
-            "empty"
-    data = {'driver': list(map(str, sorted_driver_times.keys())),
-            'positions': list(sorted_driver_times.values())}
-    df = pd.DataFrame(data)
-    ax.barh(df.index, df['positions'],
-            color=team_colors, edgecolor='grey')
-    ax.set_yticks(df.index)
-    ax.set_yticklabels(sorted_driver_times_names)
-
-    # Show fastest at the top
-    ax.invert_yaxis()
-
-    # Draw vertical lines behind the bars
-    ax.set_axisbelow(True)
-    ax.xaxis.grid(True, which='major', linestyle='--', color='black', zorder=-1000)
-
+    table = compute_positions_gained(session)
+    _plot_positions_gained(table, 'GainedFirstLap', ax)
     ax.set_xlabel('Positions gained')
     ax.set_ylabel('Drivers')
     ax.set_title(f"Positions gained on first lap in {session.session_info['Meeting']['Name']} {session.event.year}")
@@ -359,151 +1105,79 @@ def get_gained_positions_on_first_lap_wall(session, ax=None):
 
 
 # Function to get the positions gained in a full race
-def get_gained_positions_in_full_race(year, event_name):
-    gained_positions = {}
-    gaining_position_sum = {}
+@requires(RESULTS, session='R')
+def get_gained_positions_in_full_race(year, event_name, session=None, output=None):
     fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=False)
-    session = fastf1.get_session(year, event_name, 'R')
-    session.load(telemetry=True)
-    for driver in session.drivers:
-        results = session.results
-        grid_position = results[results['DriverNumber'] == driver]['GridPosition']
-        if int(grid_position) != 0:
-            finish_position = results[results['DriverNumber'] == driver]['Position']
-            if not grid_position.empty and not finish_position.empty:
-                gained_positions1 = int(grid_position.iloc[0]) - int(finish_position.iloc[0])
-            else:
-                print("Error: DataFrames are empty.")
-            gained_positions[driver] = gained_positions1
-            if driver not in gaining_position_sum:
-                gaining_position_sum[driver] = [0, 0]
-            gaining_position_sum[driver][0] += gained_positions[driver]
-            gaining_position_sum[driver][1] += 1
-        else:
-            print(f"{event_name} driver with number {driver} starts from the pit lane")
-    sorted_driver_times = dict(sorted(gained_positions.items(), key=operator.itemgetter(1)))
-    results = session.results
-    team_colors = list()
-    sorted_driver_times_names = list()
-    for index in sorted_driver_times:
-        try:
-            sorted_driver_times_names.append(results[results['DriverNumber'] == index]['Abbreviation'][0])
-            color = fastf1.plotting.team_color(results[results['DriverNumber'] == index]['TeamName'].values[0])
-            team_colors.append(color)
-        except:
-            "empty"
+    if session is None:
+        session = load_session_for(get_gained_positions_in_full_race, year, event_name, 'R')
+    table = compute_positions_gained(session, first_lap=False)
 
     fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
-    data = {'driver': list(map(str, sorted_driver_times.keys())),
-            'positions': list(sorted_driver_times.values())}
-    df = pd.DataFrame(data)
-    ax.barh(df.index, df['positions'],
-            color=team_colors, edgecolor='grey')
-    ax.set_yticks(df.index)
-    ax.set_yticklabels(sorted_driver_times_names)
-
-    # Show fastest at the top
-    ax.invert_yaxis()
-
-    # Draw vertical lines behind the bars
-    ax.set_axisbelow(True)
-    ax.xaxis.grid(True, which='major', linestyle='--', color='black', zorder=-1000)
+    _plot_positions_gained(table, 'GainedRace', ax)
     plt.xlabel('Positions gained')
     plt.ylabel('Drivers')
     plt.title(f'Positions gained in {session.session_info["Meeting"]["Name"]} {year}')
-    plt.show()
+    return finish_figure(fig, output)
 
 
 # Function to get the positions gained in a full race and display it on an existing axis
+@requires(RESULTS)
 def get_gained_positions_in_full_race_wall(session, ax=None):
-    gained_positions = {}
-    gaining_position_sum = {}
     fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=False)
-    for driver in session.drivers:
-        results = session.results
-        grid_position = results[results['DriverNumber'] == driver]['GridPosition']
-        if int(grid_position) != 0:
-            finish_position = results[results['DriverNumber'] == driver]['Position']
-            if not grid_position.empty and not finish_position.empty:
-                gained_positions1 = int(grid_position.iloc[0]) - int(finish_position.iloc[0])
-            else:
-                print("Error: DataFrames are empty.")
-            gained_positions[driver] = gained_positions1
-            if driver not in gaining_position_sum:
-                gaining_position_sum[driver] = [0, 0]
-            gaining_position_sum[driver][0] += gained_positions[driver]
-            gaining_position_sum[driver][1] += 1
-        else:
-            print(f"{session.session_info['Meeting']['Name']} driver with number {driver} starts from the pit lane")
-    sorted_driver_times = dict(sorted(gained_positions.items(), key=operator.itemgetter(1)))
-    results = session.results
-    team_colors = list()
-    sorted_driver_times_names = list()
-    for index in sorted_driver_times:
-        try:
-            sorted_driver_times_names.append(results[results['DriverNumber'] == index]['Abbreviation'][0])
-            color = fastf1.plotting.team_color(results[results['DriverNumber'] == index]['TeamName'].values[0])
-            team_colors.append(color)
-        except:
-            "empty"
-
-    data = {'driver': list(map(str, sorted_driver_times.keys())),
-            'positions': list(sorted_driver_times.values())}
-    df = pd.DataFrame(data)
-    ax.barh(df.index, df['positions'],
-            color=team_colors, edgecolor='grey')
-    ax.set_yticks(df.index)
-    ax.set_yticklabels(sorted_driver_times_names)
-
-    # Show fastest at the top
-    ax.invert_yaxis()
-
-    # Draw vertical lines behind the bars
-    ax.set_axisbelow(True)
-    ax.xaxis.grid(True, which='major', linestyle='--', color='black', zorder=-1000)
-
+    table = compute_positions_gained(session, first_lap=False)
+    _plot_positions_gained(table, 'GainedRace', ax)
     ax.set_xlabel('Positions gained')
     ax.set_ylabel('Drivers')
     ax.set_title(f'Position gained in {session.session_info["Meeting"]["Name"]} {session.event.year}')
     return ax
 
 
+# Function to get the colour of a driver, falling back to the team colour for drivers FastF1 has no colour for
+def driver_color(session, abbreviation):
+    try:
+        return fastf1.plotting.driver_color(abbreviation)
+    except KeyError:
+        return fastf1.plotting.team_color(session.get_driver(abbreviation)['TeamName'])
+
+
 # Function to visualize the position changes during the race
-def visualization_of_position_changes_during_the_race(year, event_name):
+@requires(LAPS, RESULTS, session='R')
+def visualization_of_position_changes_during_the_race(year, event_name, session=None, output=None):
     fastf1.plotting.setup_mpl(misc_mpl_mods=False)
-    session = fastf1.get_session(year, event_name, 'R')
-    session.load(telemetry=False, weather=False)
+    if session is None:
+        session = load_session_for(visualization_of_position_changes_during_the_race, year, event_name, 'R')
 
     fig, ax = plt.subplots(figsize=(8.0, 4.9))
     for drv in session.drivers:
         drv_laps = session.laps.pick_driver(drv)
 
         abb = drv_laps['Driver'].iloc[0]
-        color = fastf1.plotting.driver_color(abb)
+        color = driver_color(session, abb)
 
         ax.plot(drv_laps['LapNumber'], drv_laps['Position'],
                 label=abb, color=color)
-    ax.set_ylim([20.5, 0.5])
+    ax.set_ylim([len(session.drivers) + 0.5, 0.5])
     ax.set_yticks([1, 5, 10, 15, 20])
     ax.set_xlabel('Lap')
     ax.set_ylabel('Position')
     ax.legend(bbox_to_anchor=(1.0, 1.0))
     plt.tight_layout()
     plt.suptitle(f'Position changes during the race {session.session_info["Meeting"]["Name"]} {year}')
-    plt.show()
+    return finish_figure(fig, output)
 
 
 # Function to visualize the position changes during the race and display it on an existing axis
+@requires(LAPS, RESULTS)
 def visualization_of_position_changes_during_the_race_wall(session, ax=None):
     for drv in session.drivers:
         drv_laps = session.laps.pick_driver(drv)
 
         abb = drv_laps['Driver'].iloc[0]
-        color = fastf1.plotting.driver_color(abb)
+        color = driver_color(session, abb)
 
         ax.plot(drv_laps['LapNumber'], drv_laps['Position'],
                 label=abb, color=color)
-    ax.set_ylim([20.5, 0.5])
+    ax.set_ylim([len(session.drivers) + 0.5, 0.5])
     ax.set_yticks([1, 5, 10, 15, 20])
     ax.set_xlabel('Lap')
     ax.set_ylabel('Position')
@@ -512,50 +1186,67 @@ def visualization_of_position_changes_during_the_race_wall(session, ax=None):
     return ax
 
 
-# Function to get the times for a 0 to X speed test
-def get_0_x_times(year, event_name, speed):
-    fastf1.plotting.setup_mpl(mpl_timedelta_support=False, misc_mpl_mods=False)
-    session = fastf1.get_session(year, event_name, 'R')
-    session.load()
-    times_0_200 = {}
-    for driver in session.drivers:
-        # Get the first lap for each driver
-        first_lap = session.laps.pick_driver(driver).pick_laps(1).get_telemetry()
-        # Filter data for 0-200 km/h start
-        filtered_lap = first_lap[
-            (first_lap['Time'] <= first_lap[first_lap['Speed'] >= speed]['Time'].iloc[0]) & (first_lap['Speed'] >= 0)][
-            ['Speed', 'Time']]
-        filtered_lap.to_csv(f'{driver}_first_lap.csv', index=False)
-        speed_value_under_200 = filtered_lap['Speed'].iloc[-2]
-        driver_0_200_test = first_lap[(first_lap['Speed'] >= speed)][['Speed', 'Time']].iloc[0]
-        time_and_speed_before_200 = first_lap[(first_lap['Speed'] < speed)][['Speed', 'Time']].iloc[-1]
-        speed_difference = filtered_lap['Speed'].iloc[-1] - filtered_lap['Speed'].iloc[-2]
-        time_difference = filtered_lap['Time'].iloc[-1] - filtered_lap['Time'].iloc[-2]
-        result = time_difference / speed_difference * (speed - filtered_lap['Speed'].iloc[-2]) + \
-                 filtered_lap['Time'].iloc[-2]
-        times_0_200[driver] = result.total_seconds()
-    sorted_driver_times = dict(sorted(times_0_200.items(), key=operator.itemgetter(1)))
-
-    results = session.results
-    team_colors = list()
-    sorted_driver_times_names = list()
-    for index in sorted_driver_times:
-        sorted_driver_times_names.append(results[results['DriverNumber'] == index]['Abbreviation'][0])
-        color = fastf1.plotting.team_color(results[results['DriverNumber'] == index]['TeamName'].values[0])
-        team_colors.append(color)
-
-    best_time = round(list(sorted_driver_times.values())[0], 3)
-    for key, value in sorted_driver_times.items():
-        sorted_driver_times[key] = round(sorted_driver_times[key] - best_time, 3)
-    data = {'driver': list(map(str, sorted_driver_times.keys())),
-            'time': list(sorted_driver_times.values())}
-
-    df = pd.DataFrame(data)
-    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
-    ax.barh(df.index, df['time'],
-            color=team_colors, edgecolor='grey')
-    ax.set_yticks(df.index)
-    ax.set_yticklabels(sorted_driver_times_names)
+# Function to interpolate the times at which a speed trace first reaches each of the thresholds
+def _crossing_times(time, speed, thresholds):
+    thresholds = np.asarray(thresholds, dtype=float)
+    # The running maximum is monotonic, so the first sample at or above each threshold is found by searchsorted
+    running_max = np.maximum.accumulate(speed)
+    after = np.searchsorted(running_max, thresholds, side='left')
+    reached = after < len(speed)
+    after = np.clip(after, 1, len(speed) - 1)
+    before = after - 1
+    # Linear interpolation between the last sample below and the first sample at or above the threshold,
+    # thresholds that are never reached can divide by zero and are masked below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing = time[before] + (time[after] - time[before]) * \
+            (thresholds - speed[before]) / (speed[after] - speed[before])
+    crossing = np.where(speed[0] >= thresholds, time[0], crossing)
+    return np.where(reached, crossing, np.nan)
+
+
+# Function to compute launch times (in seconds) for several speeds from the lap 1 car data of each driver
+@timed
+def launch_times_from_telemetry(telemetry_by_driver, thresholds):
+    rows = {}
+    for driver, telemetry in telemetry_by_driver.items():
+        time = telemetry['Time'].dt.total_seconds().to_numpy()
+        speed = telemetry['Speed'].to_numpy(dtype=float)
+        rows[driver] = _crossing_times(time, speed, thresholds)
+    table = pd.DataFrame.from_dict(rows, orient='index', columns=list(thresholds))
+    table.index.name = 'DriverNumber'
+    return table
+
+
+# Function to compute the 0 to X km/h times of every driver for several speeds at once
+@timed
+def compute_launch_times(session, thresholds=(100, 150, 200), csv_dir=None):
+    telemetry_by_driver = {}
+    for _, lap in session.laps.pick_laps(1).iterlaps():
+        # Speed is part of the car data, the car/position merge of get_telemetry() is not needed
+        telemetry_by_driver[lap['DriverNumber']] = lap_telemetry(lap, ('Time', 'Speed'))[['Time', 'Speed']]
+    table = launch_times_from_telemetry(telemetry_by_driver, thresholds)
+
+    if csv_dir is not None:
+        os.makedirs(csv_dir, exist_ok=True)
+        last_crossing = table.max(axis=1)
+        for driver, telemetry in telemetry_by_driver.items():
+            launch = telemetry[telemetry['Time'].dt.total_seconds() <= last_crossing[driver]]
+            launch.to_csv(os.path.join(csv_dir, f'{driver}_first_lap.csv'), index=False)
+    return table
+
+
+# Function to draw the gaps of a launch time column from compute_launch_times() on an axis
+def _plot_launch_times(session, launch_times, ax):
+    launch_times = launch_times.dropna().sort_values()
+    results = session.results.loc[launch_times.index]
+    team_colors = {team: fastf1.plotting.team_color(team) for team in results['TeamName'].unique()}
+
+    best_time = round(launch_times.iloc[0], 3)
+    gaps = (launch_times - best_time).round(3).reset_index(drop=True)
+    ax.barh(gaps.index, gaps,
+            color=results['TeamName'].map(team_colors).tolist(), edgecolor='grey')
+    ax.set_yticks(gaps.index)
+    ax.set_yticklabels(results['Abbreviation'])
 
     # Show fastest at the top
     ax.invert_yaxis()
@@ -563,72 +1254,187 @@ def get_0_x_times(year, event_name, speed):
     # Draw vertical lines behind the bars
     ax.set_axisbelow(True)
     ax.xaxis.grid(True, which='major', linestyle='--', color='black', zorder=-1000)
-    plt.title(f"{session.session_info['Meeting']['Name']} {year} Qualifying\n"
-              f"Best time from 0 to {speed}: {sorted_driver_times_names[0]} {best_time}s")
-    plt.show()
+    return results['Abbreviation'].iloc[0], best_time
 
 
-# Function to get the times for a 0 to X speed test and display it on an existing axis
-def get_0_x_times_wall(session, speed, ax=None):
-    times_0_200 = {}
-    for driver in session.drivers:
-        # Get the first lap for each driver
-        first_lap = session.laps.pick_driver(driver).pick_laps(1).get_telemetry()
-        # Filter data for 0-200 km/h start
-        filtered_lap = first_lap[
-            (first_lap['Time'] <= first_lap[first_lap['Speed'] >= speed]['Time'].iloc[0]) & (first_lap['Speed'] >= 0)][
-            ['Speed', 'Time']]
-        filtered_lap.to_csv(f'{driver}_first_lap.csv', index=False)
-        speed_value_under_200 = filtered_lap['Speed'].iloc[-2]
-        driver_0_200_test = first_lap[(first_lap['Speed'] >= speed)][['Speed', 'Time']].iloc[0]
-        time_and_speed_before_200 = first_lap[(first_lap['Speed'] < speed)][['Speed', 'Time']].iloc[-1]
-        speed_difference = filtered_lap['Speed'].iloc[-1] - filtered_lap['Speed'].iloc[-2]
-        time_difference = filtered_lap['Time'].iloc[-1] - filtered_lap['Time'].iloc[-2]
-        result = time_difference / speed_difference * (speed - filtered_lap['Speed'].iloc[-2]) + \
-                 filtered_lap['Time'].iloc[-2]
-        times_0_200[driver] = result.total_seconds()
-    sorted_driver_times = dict(sorted(times_0_200.items(), key=operator.itemgetter(1)))
-
-    results = session.results
-    team_colors = list()
-    sorted_driver_times_names = list()
-    for index in sorted_driver_times:
-        sorted_driver_times_names.append(results[results['DriverNumber'] == index]['Abbreviation'][0])
-        color = fastf1.plotting.team_color(results[results['DriverNumber'] == index]['TeamName'].values[0])
-        team_colors.append(color)
-
-    best_time = round(list(sorted_driver_times.values())[0], 3)
-    for key, value in sorted_driver_times.items():
-        sorted_driver_times[key] = round(sorted_driver_times[key] - best_time, 3)
-    data = {'driver': list(map(str, sorted_driver_times.keys())),
-            'time': list(sorted_driver_times.values())}
-
-    df = pd.DataFrame(data)
-    ax.barh(df.index, df['time'],
-            color=team_colors, edgecolor='grey')
-    ax.set_yticks(df.index)
-    ax.set_yticklabels(sorted_driver_times_names)
+# Function to get the times for a 0 to X speed test
+@requires(LAPS, RESULTS, CAR_DATA, session='R')
+def get_0_x_times(year, event_name, speed, session=None, csv_dir=None, output=None):
+    fastf1.plotting.setup_mpl(mpl_timedelta_support=False, misc_mpl_mods=False)
+    if session is None:
+        session = load_session_for(get_0_x_times, year, event_name, 'R')
+    launch_times = compute_launch_times(session, [speed], csv_dir=csv_dir)[speed]
 
-    # Show fastest at the top
-    ax.invert_yaxis()
+    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
+    best_driver, best_time = _plot_launch_times(session, launch_times, ax)
+    plt.title(f"{session.session_info['Meeting']['Name']} {year} Qualifying\n"
+              f"Best time from 0 to {speed}: {best_driver} {best_time}s")
+    return finish_figure(fig, output)
 
-    # Draw vertical lines behind the bars
-    ax.set_axisbelow(True)
-    ax.xaxis.grid(True, which='major', linestyle='--', color='black', zorder=-1000)
+
+# Function to get the times for a 0 to X speed test and display it on an existing axis
+@requires(LAPS, RESULTS, CAR_DATA)
+def get_0_x_times_wall(session, speed, ax=None, csv_dir=None):
+    launch_times = compute_launch_times(session, [speed], csv_dir=csv_dir)[speed]
+    best_driver, best_time = _plot_launch_times(session, launch_times, ax)
     ax.set_xlabel('Gap')
     ax.set_ylabel('Drivers')
     ax.set_title(f"{session.session_info['Meeting']['Name']} {session.event.year} Qualifying\n"
-                 f"Best time from 0 to {speed}: {sorted_driver_times_names[0]} {best_time}s")
+                 f"Best time from 0 to {speed}: {best_driver} {best_time}s")
     return ax
 
 
-# Function for team pace comparison
-def team_pace_comparison(year, event_name):
-    session = fastf1.get_session(year, event_name, 'R')
+# Memory ceiling of one streamed telemetry chunk in MB, a chunk always holds at least one whole lap
+STREAM_MEMORY_MB = 32
+
+# Throttle in % at or above which the throttle counts as fully open
+FULL_THROTTLE = 99
+
+# Throttle in % at or below which, with the brake released and above the minimum speed in km/h, a car is coasting
+LIFT_THROTTLE = 1
+LIFT_MIN_SPEED = 100
+
+
+# Function to stream the telemetry of every lap of every driver of a session as (driver number, chunk) pairs.
+# Each chunk holds whole consecutive laps of one driver, stays below max_memory_mb where a single lap allows it
+# and carries a LapNumber column, so what race-long analyses derive is bounded by one chunk at a time. The chunks
+# are sliced from the car (and position) data of the session, which FastF1 loads as a whole: that raw data stays
+# in memory for the entire session
+def stream_session_telemetry(session, drivers=None, kind='car', max_memory_mb=STREAM_MEMORY_MB):
+    _load_deferred_telemetry(session)
+    if drivers is None:
+        drivers = session.drivers
+    for driver in drivers:
+        car_data = session.car_data[driver]
+        laps = session.laps.pick_driver(driver)
+        laps = laps.loc[laps['LapStartTime'].notna() & laps['Time'].notna()].sort_values('LapStartTime')
+        if laps.empty or car_data.empty:
+            continue
+        lap_numbers = laps['LapNumber'].to_numpy(dtype=int)
+        lap_starts = laps['LapStartTime'].to_numpy()
+        session_time = car_data['SessionTime'].to_numpy()
+        starts = np.searchsorted(session_time, lap_starts)
+        ends = np.searchsorted(session_time, laps['Time'].to_numpy())
+
+        # The merge with the position data roughly doubles the size of a row
+        row_bytes = car_data.memory_usage(index=False).sum() / len(car_data) * (2 if kind == 'telemetry' else 1)
+        max_rows = max(int(max_memory_mb * 2 ** 20 / row_bytes), 1)
+
+        first = 0
+        while first < len(laps):
+            last = first + 1
+            while last < len(laps) and ends[last] - starts[first] <= max_rows:
+                last += 1
+            chunk = car_data.iloc[starts[first]:ends[last - 1]]
+            if kind == 'telemetry':
+                pos_data = session.pos_data[driver]
+                pos_time = pos_data['SessionTime'].to_numpy()
+                chunk = chunk.merge_channels(pos_data.iloc[np.searchsorted(pos_time, session_time[starts[first]]):
+                                                           np.searchsorted(pos_time, session_time[ends[last - 1] - 1],
+                                                                           side='right')])
+            else:
+                chunk = chunk.copy()
+            if len(chunk):
+                lap_index = np.searchsorted(lap_starts[first:last], chunk['SessionTime'].to_numpy(), side='right') - 1
+                chunk['LapNumber'] = lap_numbers[first:last][np.clip(lap_index, 0, None)]
+                yield driver, chunk
+            first = last
+
+
+# Function to get the seconds every sample of a streamed chunk lasts, the last sample of a lap lasts until the next lap
+def _sample_seconds(chunk):
+    seconds = chunk['SessionTime'].dt.total_seconds().to_numpy()
+    return np.append(np.diff(seconds), 0)
+
+
+# Function to sum values per lap of a streamed chunk into a table with one row per lap
+def _per_lap_sums(driver, chunk, **values):
+    lap_codes, lap_numbers = pd.factorize(chunk['LapNumber'])
+    table = pd.DataFrame({name: np.bincount(lap_codes, weights=value, minlength=len(lap_numbers))
+                          for name, value in values.items()})
+    table.insert(0, 'LapNumber', lap_numbers)
+    table.insert(0, 'DriverNumber', driver)
+    return table
+
+
+# Function to join per-chunk tables and add the abbreviation of every driver
+def _join_lap_tables(session, tables):
+    table = pd.concat(tables, ignore_index=True)
+    abbreviations = session.results.set_index('DriverNumber')['Abbreviation']
+    table.insert(1, 'Abbreviation', table['DriverNumber'].map(abbreviations))
+    return table
+
+
+# Function to get the top speed of every lap of every driver over a whole session, streamed lap chunk by lap chunk
+@timed
+def speed_trap_distribution(session, drivers=None, max_memory_mb=STREAM_MEMORY_MB):
+    tables = []
+    for driver, chunk in stream_session_telemetry(session, drivers, 'car', max_memory_mb):
+        top_speed = chunk.groupby('LapNumber', sort=False)['Speed'].max()
+        tables.append(pd.DataFrame({'DriverNumber': driver, 'LapNumber': top_speed.index,
+                                    'TopSpeed': top_speed.to_numpy()}))
+    return _join_lap_tables(session, tables)
+
+
+# Function to get how the throttle is used on every lap of every driver: the time at full throttle, its share
+# of the lap, the time-weighted mean throttle and how often the throttle is fully opened
+@timed
+def throttle_application_stats(session, drivers=None, max_memory_mb=STREAM_MEMORY_MB):
+    tables = []
+    for driver, chunk in stream_session_telemetry(session, drivers, 'car', max_memory_mb):
+        seconds = _sample_seconds(chunk)
+        throttle = chunk['Throttle'].to_numpy(dtype=float)
+        full = throttle >= FULL_THROTTLE
+        tables.append(_per_lap_sums(driver, chunk, Duration=seconds, FullThrottleTime=seconds * full,
+                                    ThrottleTime=seconds * throttle,
+                                    Applications=np.append(False, full[1:] & ~full[:-1])))
+    table = _join_lap_tables(session, tables)
+    table['FullThrottleShare'] = table['FullThrottleTime'] / table['Duration']
+    table['MeanThrottle'] = table.pop('ThrottleTime') / table['Duration']
+    table['Applications'] = table['Applications'].astype(int)
+    return table
+
+
+# Function to detect lift and coast on every lap of every driver: the time spent off the throttle and the brake
+# at speed, and how many separate lifts there are
+@timed
+def lift_and_coast(session, drivers=None, max_memory_mb=STREAM_MEMORY_MB):
+    tables = []
+    for driver, chunk in stream_session_telemetry(session, drivers, 'car', max_memory_mb):
+        coasting = ((chunk['Throttle'].to_numpy(dtype=float) <= LIFT_THROTTLE)
+                    & ~chunk['Brake'].to_numpy(dtype=bool)
+                    & (chunk['Speed'].to_numpy(dtype=float) >= LIFT_MIN_SPEED))
+        tables.append(_per_lap_sums(driver, chunk, CoastTime=_sample_seconds(chunk) * coasting,
+                                    Lifts=np.append(coasting[:1], coasting[1:] & ~coasting[:-1])))
+    table = _join_lap_tables(session, tables)
+    table['Lifts'] = table['Lifts'].astype(int)
+    return table
+
+
+# Function to show the distribution of the top speed of every lap of a race per driver
+@requires(LAPS, RESULTS, CAR_DATA, session='R')
+def race_speed_trap_distribution(year, event_name, session=None, output=None):
     fastf1.plotting.setup_mpl(mpl_timedelta_support=False, misc_mpl_mods=False)
-    session.load()
-    laps = session.laps.pick_quicklaps()
+    if session is None:
+        session = load_session_for(race_speed_trap_distribution, year, event_name, 'R')
+    table = speed_trap_distribution(session)
+    order = table.groupby('Abbreviation')['TopSpeed'].median().sort_values(ascending=False).index
+    palette = {driver: driver_color(session, driver) for driver in order}
+
+    fig, ax = plt.subplots(figsize=(15, 10))
+    sns.boxplot(data=table, x='Abbreviation', y='TopSpeed', order=order, palette=palette, ax=ax,
+                whiskerprops=dict(color="white"), boxprops=dict(edgecolor="white"),
+                medianprops=dict(color="grey"), capprops=dict(color="white"))
+    ax.set(xlabel=None, ylabel='Top speed per lap in km/h')
+    plt.title(f"Speed trap distribution of {session.session_info['Meeting']['Name']} {year}")
+    plt.tight_layout()
+    return finish_figure(fig, output)
+
 
+# Function to get the quick laps with their lap time in seconds and the teams ordered by their pace
+@timed
+def compute_team_pace(laps):
+    laps = laps.pick_quicklaps()
     transformed_laps = laps.copy()
     transformed_laps.loc[:, "LapTime (s)"] = laps["LapTime"].dt.total_seconds()
 
@@ -640,47 +1446,30 @@ def team_pace_comparison(year, event_name):
         .sort_values()
         .index
     )
+    return transformed_laps, team_order
 
-    # Make a color palette associating team names to hex codes
-    team_palette = {team: fastf1.plotting.team_color(team) for team in team_order}
+
+# Function for team pace comparison
+@requires(LAPS, session='R')
+def team_pace_comparison(year, event_name, session=None, output="team_pace_comparison.png"):
+    fastf1.plotting.setup_mpl(mpl_timedelta_support=False, misc_mpl_mods=False)
+    if session is None:
+        session = load_session_for(team_pace_comparison, year, event_name, 'R')
+    transformed_laps, team_order = compute_team_pace(session.laps)
 
     fig, ax = plt.subplots(figsize=(15, 10))
-    sns.boxplot(
-        data=transformed_laps,
-        x="Team",
-        y="LapTime (s)",
-        order=team_order,
-        palette=team_palette,
-        whiskerprops=dict(color="white"),
-        boxprops=dict(edgecolor="white"),
-        medianprops=dict(color="grey"),
-        capprops=dict(color="white"),
-    )
+    _plot_team_pace(transformed_laps, team_order, ax)
     plt.title(f"Team pace comparison of {session.session_info['Meeting']['Name']} {year}")
     plt.grid(visible=False)
 
     # x-label is redundant
     ax.set(xlabel=None)
     plt.tight_layout()
-    plt.savefig("team_pace_comparison.png")
-    plt.show()
-
+    return finish_figure(fig, output)
 
-# Function for team pace comparison and display it on an existing axis
-def team_pace_comparison_wall(session, ax=None):
-    laps = session.laps.pick_quicklaps()
-    transformed_laps = laps.copy()
-    transformed_laps.loc[:, "LapTime (s)"] = laps["LapTime"].dt.total_seconds()
-
-    # Order the team from the fastest (lowest median lap time) to slower
-    team_order = (
-        transformed_laps[["Team", "LapTime (s)"]]
-        .groupby("Team")
-        .median()["LapTime (s)"]
-        .sort_values()
-        .index
-    )
 
+# Function to draw the team pace from compute_team_pace() on an axis
+def _plot_team_pace(transformed_laps, team_order, ax):
     # Make a color palette associating team names to hex codes
     team_palette = {team: fastf1.plotting.team_color(team) for team in team_order}
 
@@ -694,7 +1483,16 @@ def team_pace_comparison_wall(session, ax=None):
         boxprops=dict(edgecolor="white"),
         medianprops=dict(color="grey"),
         capprops=dict(color="white"),
+        ax=ax,
     )
+    return ax
+
+
+# Function for team pace comparison and display it on an existing axis
+@requires(LAPS)
+def team_pace_comparison_wall(session, ax=None):
+    transformed_laps, team_order = compute_team_pace(session.laps)
+    _plot_team_pace(transformed_laps, team_order, ax)
     ax.set_title(f"Team pace comparison of {session.session_info['Meeting']['Name']} {session.event.year}")
     ax.grid(visible=False)
     # x-label is redundant
@@ -703,65 +1501,39 @@ def team_pace_comparison_wall(session, ax=None):
 
 
 # Visualization of lap times for the top 10 drivers in a session
-def driver_laptimes_visualization_concrete(year, event_name):
-    race = fastf1.get_session(year, event_name, 'R')
+@requires(LAPS, RESULTS, session='R')
+def driver_laptimes_visualization_concrete(year, event_name, session=None, output="driver_laptimes_visualization.png"):
     fastf1.plotting.setup_mpl(mpl_timedelta_support=False, misc_mpl_mods=False)
-    race.load()
-    point_finishers = race.drivers[:10]
-    driver_laps = race.laps.pick_drivers(point_finishers).pick_quicklaps()
-    driver_laps = driver_laps.reset_index()
-    finishing_order = [race.get_driver(i)["Abbreviation"] for i in point_finishers]
-    driver_colors = {abv: fastf1.plotting.DRIVER_COLORS[driver] for abv,
-    driver in fastf1.plotting.DRIVER_TRANSLATE.items()}
+    race = session
+    if race is None:
+        race = load_session_for(driver_laptimes_visualization_concrete, year, event_name, 'R')
+    driver_laps, finishing_order = compute_lap_time_distribution(race)
 
     # Create the figure
     fig, ax = plt.subplots(figsize=(10, 5))
-
-    driver_laps["LapTime(s)"] = driver_laps["LapTime"].dt.total_seconds()
-
-    sns.violinplot(data=driver_laps,
-                   x="Driver",
-                   y="LapTime(s)",
-                   inner=None,
-                   density_norm="area",
-                   order=finishing_order,
-                   palette=driver_colors
-                   )
-
-    sns.swarmplot(data=driver_laps,
-                  x="Driver",
-                  y="LapTime(s)",
-                  order=finishing_order,
-                  hue="Compound",
-                  palette=fastf1.plotting.COMPOUND_COLORS,
-                  hue_order=["SOFT", "MEDIUM", "HARD"],
-                  linewidth=0,
-                  size=5,
-                  )
-    ax.set_xlabel("Driver")
-    ax.set_ylabel("Lap Time (s)")
+    _plot_lap_time_distribution(driver_laps, finishing_order, ax)
     plt.suptitle(f"{race.event['EventName']} {year} Lap Time Distributions")
-    sns.despine(left=True, bottom=True)
 
     plt.tight_layout()
-    plt.savefig("driver_laptimes_visualization.png")
-    plt.show()
+    return finish_figure(fig, output)
 
 
-# Visualization of lap times for the top 10 drivers in a session and display it on an existing axis
-def driver_laptimes_visualization_wall(year, event_name, ax=None):
-    race = fastf1.get_session(year, event_name, 'R')
-    fastf1.plotting.setup_mpl(mpl_timedelta_support=False, misc_mpl_mods=False)
-    race.load()
+# Function to get the quick laps of the top 10 finishers with their lap time in seconds and the finishing order
+@timed
+def compute_lap_time_distribution(race):
     point_finishers = race.drivers[:10]
     driver_laps = race.laps.pick_drivers(point_finishers).pick_quicklaps()
     driver_laps = driver_laps.reset_index()
     finishing_order = [race.get_driver(i)["Abbreviation"] for i in point_finishers]
+    driver_laps["LapTime(s)"] = driver_laps["LapTime"].dt.total_seconds()
+    return driver_laps, finishing_order
+
+
+# Function to draw the lap time distributions from compute_lap_time_distribution() on an axis
+def _plot_lap_time_distribution(driver_laps, finishing_order, ax):
     driver_colors = {abv: fastf1.plotting.DRIVER_COLORS[driver] for abv,
     driver in fastf1.plotting.DRIVER_TRANSLATE.items()}
 
-    driver_laps["LapTime(s)"] = driver_laps["LapTime"].dt.total_seconds()
-
     sns.violinplot(data=driver_laps,
                    x="Driver",
                    y="LapTime(s)",
@@ -769,6 +1541,7 @@ def driver_laptimes_visualization_wall(year, event_name, ax=None):
                    density_norm="area",
                    order=finishing_order,
                    palette=driver_colors,
+                   ax=ax,
                    )
 
     sns.swarmplot(data=driver_laps,
@@ -780,47 +1553,69 @@ def driver_laptimes_visualization_wall(year, event_name, ax=None):
                   hue_order=["SOFT", "MEDIUM", "HARD"],
                   linewidth=0,
                   size=5,
+                  ax=ax,
                   )
-
     ax.set_xlabel("Driver")
     ax.set_ylabel("Lap Time (s)")
-    ax.set_title(f"{race.event['EventName']} {year} Lap Time Distributions")
-    sns.despine(left=True, bottom=True)
+    sns.despine(ax=ax, left=True, bottom=True)
+    return ax
+
+
+# Visualization of lap times for the top 10 drivers in a session and display it on an existing axis
+@requires(LAPS, RESULTS, session='R')
+def driver_laptimes_visualization_wall(year, event_name, ax=None, session=None):
+    fastf1.plotting.setup_mpl(mpl_timedelta_support=False, misc_mpl_mods=False)
+    race = session
+    if race is None:
+        race = load_session_for(driver_laptimes_visualization_wall, year, event_name, 'R')
+    driver_laps, finishing_order = compute_lap_time_distribution(race)
+    _plot_lap_time_distribution(driver_laps, finishing_order, ax)
+    ax.set_title(f"{race.event['EventName']} {race.event.year} Lap Time Distributions")
+    return ax
+
+
+# Function to get the stint table of a session in one pass: driver, stint, compound, first and last lap, number of
+# laps and the tyre age in laps at the start and the end of every stint
+@timed
+def compute_tyre_stints(laps):
+    laps = laps[["Driver", "Stint", "Compound", "LapNumber", "TyreLife"]]
+    stints = laps.groupby(["Driver", "Stint", "Compound"], sort=False).agg(
+        StartLap=("LapNumber", "min"), EndLap=("LapNumber", "max"), StintLength=("LapNumber", "count"),
+        TyreLifeStart=("TyreLife", "min"), TyreLifeEnd=("TyreLife", "max"))
+    stints = stints.reset_index().sort_values(["Driver", "Stint"], kind="stable", ignore_index=True)
+    stints[["Stint", "StartLap", "EndLap"]] = stints[["Stint", "StartLap", "EndLap"]].astype(int)
+    # TyreLife counts the laps driven on a set including the current one, a new set starts the stint at age 0
+    stints["TyreAgeStart"] = stints.pop("TyreLifeStart") - 1
+    stints["TyreAgeEnd"] = stints.pop("TyreLifeEnd")
+    return stints
+
+
+# Function to draw the stints from compute_tyre_stints() on an axis, one row per driver in the given order
+def _plot_tyre_stints(stints, drivers, ax):
+    drivers = [driver for driver in drivers if driver in set(stints["Driver"])]
+    rows = stints["Driver"].map({driver: row for row, driver in enumerate(drivers)})
+    stints = stints[rows.notna()]
+    colors = stints["Compound"].map(fastf1.plotting.COMPOUND_COLORS).fillna(fastf1.plotting.COMPOUND_COLORS["UNKNOWN"])
+    # All stints are one bar container, a stint covers its laps from the end of the previous lap to its last lap
+    ax.barh(y=rows[rows.notna()].to_numpy(), width=(stints["EndLap"] - stints["StartLap"] + 1).to_numpy(),
+            left=(stints["StartLap"] - 1).to_numpy(), color=colors.tolist(), edgecolor="black", fill=True)
+    ax.set_yticks(range(len(drivers)))
+    ax.set_yticklabels(drivers)
     return ax
 
 
 # Visualization of tyre strategies
-def tyre_strategies(year, event_name):
+@requires(LAPS, RESULTS, session='R')
+def tyre_strategies(year, event_name, session=None, output=None):
     fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=False)
 
-    session = fastf1.get_session(year, event_name, 'R')
-    session.load()
-    laps = session.laps
+    if session is None:
+        session = load_session_for(tyre_strategies, year, event_name, 'R')
     drivers = session.drivers
     drivers = [session.get_driver(driver)["Abbreviation"] for driver in drivers]
-    stints = laps[["Driver", "Stint", "Compound", "LapNumber"]]
-    stints = stints.groupby(["Driver", "Stint", "Compound"])
-    stints = stints.count().reset_index()
-    stints = stints.rename(columns={"LapNumber": "StintLength"})
+    stints = compute_tyre_stints(session.laps)
     fig, ax = plt.subplots(figsize=(5, 10))
-
-    for driver in drivers:
-        driver_stints = stints.loc[stints["Driver"] == driver]
-
-        previous_stint_end = 0
-        for idx, row in driver_stints.iterrows():
-            # Each row contains the compound name and stint length
-            # We can use this information to draw horizontal bars
-            plt.barh(
-                y=driver,
-                width=row["StintLength"],
-                left=previous_stint_end,
-                color=fastf1.plotting.COMPOUND_COLORS[row["Compound"]],
-                edgecolor="black",
-                fill=True
-            )
-
-            previous_stint_end += row["StintLength"]
+    _plot_tyre_stints(stints, drivers, ax)
     plt.suptitle(f"{session.event['EventName']} {year} tyre strategies")
 
     plt.xlabel("Lap Number")
@@ -832,37 +1627,17 @@ def tyre_strategies(year, event_name):
     ax.spines['left'].set_visible(False)
     plt.tight_layout()
 
-    plt.show()
+    return finish_figure(fig, output)
 
 
 # Visualization of tyre strategies and display it on an existing axis
+@requires(LAPS, RESULTS)
 def tyre_strategies_wall(session, ax=None):
     fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=False)
-    laps = session.laps
     drivers = session.drivers
     drivers = [session.get_driver(driver)["Abbreviation"] for driver in drivers]
-    stints = laps[["Driver", "Stint", "Compound", "LapNumber"]]
-    stints = stints.groupby(["Driver", "Stint", "Compound"])
-    stints = stints.count().reset_index()
-    stints = stints.rename(columns={"LapNumber": "StintLength"})
-
-    for driver in drivers:
-        driver_stints = stints.loc[stints["Driver"] == driver]
-
-        previous_stint_end = 0
-        for idx, row in driver_stints.iterrows():
-            # Each row contains the compound name and stint length
-            # We can use this information to draw horizontal bars
-            ax.barh(
-                y=driver,
-                width=row["StintLength"],
-                left=previous_stint_end,
-                color=fastf1.plotting.COMPOUND_COLORS[row["Compound"]],
-                edgecolor="black",
-                fill=True
-            )
-
-            previous_stint_end += row["StintLength"]
+    stints = compute_tyre_stints(session.laps)
+    _plot_tyre_stints(stints, drivers, ax)
 
     ax.set_xlabel("Lap")
     ax.set_ylabel("Driver")
@@ -876,11 +1651,18 @@ def tyre_strategies_wall(session, ax=None):
     return ax
 
 
+# Function to get the stint table of every race of a season (or a set of its events) for strategy statistics
+def season_tyre_stints(year, events=None, ses='R'):
+    return _map_season(lambda session: compute_tyre_stints(session.laps), {LAPS}, year, ses, events)
+
+
 # Visualization of lap times for a specific driver in a session
-def driver_lap_times(year, destination, driver, ses):
+@requires(LAPS)
+def driver_lap_times(year, destination, driver, ses, session=None, output=None):
     fastf1.plotting.setup_mpl(misc_mpl_mods=False)
-    race = fastf1.get_session(year, destination, ses)
-    race.load()
+    race = session
+    if race is None:
+        race = load_session_for(driver_lap_times, year, destination, ses)
     driver_laps = race.laps.pick_driver(driver).pick_quicklaps()
     driver_laps = driver_laps.reset_index()
     driver_laps["LapTime"] = driver_laps["LapTime"].dt.total_seconds()
@@ -906,36 +1688,69 @@ def driver_lap_times(year, destination, driver, ses):
     sns.despine(left=True, bottom=True)
 
     plt.tight_layout()
-    plt.show()
-
-
-# Visualization of qualifying results for a specific session and display it on an existing axis
-def quali_results_concrete_wall(year, event, ax=None):
-    session = fastf1.get_session(year, event, 'Q')
-
-    session.load()
-
-    drivers = pd.unique(session.laps['Driver'])
-    list_fastest_laps = list()
-    q1, q2, q3 = session.laps.split_qualifying_sessions()
-    for drv in drivers:
-        drvs_fastest_lap = session.laps.pick_driver(drv).pick_fastest()
-        list_fastest_laps.append(drvs_fastest_lap)
-    fastest_laps = Laps(list_fastest_laps).sort_values(by='LapTime').reset_index(drop=True)
-    pole_lap = fastest_laps.pick_fastest()
-    fastest_laps['LapTimeDelta'] = fastest_laps['LapTime'] - pole_lap['LapTime']
-    team_colors = list()
-    filtered_fastest_laps = fastest_laps.dropna(subset=['Team'])
+    return finish_figure(fig, output)
+
+
+# Qualifying segments, in order
+QUALI_SEGMENTS = ('Q1', 'Q2', 'Q3')
+
+
+# Function to summarize a qualifying in one table, one row per driver sorted by the best lap: the best lap overall
+# (as pick_fastest() picks it) with its lap number, the best lap of every segment, the last segment reached, the
+# classification and the gap to pole. The elimination cutoffs (the best time of the slowest driver to make it
+# into the next segment) are stored in attrs['Cutoffs']
+@timed
+def compute_quali_summary(laps):
+    laps = laps[laps['LapTime'].notna()]
+    columns = ['Driver', 'DriverNumber', 'Team', 'LapTime', 'LapNumber']
+    # pick_fastest() only takes personal bests, the segments take every lap that was not deleted
+    best = laps[laps['IsPersonalBest'] == True]
+    summary = best.loc[best.groupby('Driver')['LapTime'].idxmin(), columns].set_index('Driver')
+
+    try:
+        split = laps.split_qualifying_sessions()
+    except ValueError:
+        # Not a qualifying, or no session status to split it by
+        split = [None] * len(QUALI_SEGMENTS)
+    cutoffs = {}
+    for segment, segment_laps in zip(QUALI_SEGMENTS, split):
+        if segment_laps is not None:
+            segment_laps = segment_laps[segment_laps['Deleted'] != True]
+            summary[segment] = segment_laps.groupby('Driver')['LapTime'].min()
+        else:
+            summary[segment] = pd.Series(pd.NaT, index=summary.index, dtype='timedelta64[ns]')
+    for segment, next_segment in zip(QUALI_SEGMENTS, QUALI_SEGMENTS[1:]):
+        advanced = summary.loc[summary[next_segment].notna(), segment]
+        cutoffs[segment] = advanced.max() if advanced.notna().any() else pd.NaT
+
+    segment_times = summary[list(QUALI_SEGMENTS)]
+    reached = segment_times.notna().to_numpy()
+    summary['Segment'] = np.where(reached.any(axis=1), len(QUALI_SEGMENTS) - reached[:, ::-1].argmax(axis=1), 0)
+    # Classified by the last segment reached, then by the time set in it (the best lap without segments)
+    last_time = segment_times.ffill(axis=1).iloc[:, -1].fillna(summary['LapTime'])
+    classification = pd.DataFrame({'Segment': summary['Segment'], 'Time': last_time}).sort_values(
+        ['Segment', 'Time'], ascending=[False, True], kind='stable')
+    summary['Position'] = pd.Series(np.arange(1, len(summary) + 1), index=classification.index)
+
+    summary = summary.sort_values('LapTime', kind='stable').reset_index()
+    summary['LapTimeDelta'] = summary['LapTime'] - summary['LapTime'].min()
+    summary = summary.astype({'Driver': 'string', 'DriverNumber': 'string', 'Team': 'string', 'LapNumber': 'Int64',
+                              'Segment': 'Int8', 'Position': 'Int64', **{segment: 'timedelta64[ns]'
+                                                                         for segment in QUALI_SEGMENTS}})
+    summary.attrs['Cutoffs'] = cutoffs
+    return summary
+
+
+# Function to draw the gaps to pole from compute_quali_summary() on an axis, drivers within 5 seconds only
+def _plot_quali_gaps(summary, ax):
+    summary = summary.dropna(subset=['Team'])
     # Filter out drivers who lost more than 5 seconds for a cleaner plot
-    filtered_fastest_laps = filtered_fastest_laps[filtered_fastest_laps['LapTimeDelta'] < pd.Timedelta(seconds=5)]
-    for index, lap in filtered_fastest_laps.iterlaps():
-        color = fastf1.plotting.team_color(lap['Team'])
-        team_colors.append(color)
-
-    ax.barh(filtered_fastest_laps.index, filtered_fastest_laps['LapTimeDelta'],
-            color=team_colors, edgecolor='grey')
-    ax.set_yticks(filtered_fastest_laps.index)
-    ax.set_yticklabels(filtered_fastest_laps['Driver'])
+    summary = summary[summary['LapTimeDelta'] < pd.Timedelta(seconds=5)]
+    team_colors = {team: fastf1.plotting.team_color(team) for team in summary['Team'].unique()}
+    ax.barh(summary.index, summary['LapTimeDelta'],
+            color=summary['Team'].map(team_colors).tolist(), edgecolor='grey')
+    ax.set_yticks(summary.index)
+    ax.set_yticklabels(summary['Driver'])
 
     # Show fastest at the top
     ax.invert_yaxis()
@@ -943,6 +1758,18 @@ def quali_results_concrete_wall(year, event, ax=None):
     # Draw vertical lines behind the bars
     ax.set_axisbelow(True)
     ax.xaxis.grid(True, which='major', linestyle='--', color='black', zorder=-1000)
+    return ax
+
+
+# Visualization of qualifying results for a specific session and display it on an existing axis
+@requires(LAPS, RESULTS, MESSAGES, session='Q')
+def quali_results_concrete_wall(year, event, ax=None, session=None):
+    if session is None:
+        session = load_session_for(quali_results_concrete_wall, year, event, 'Q')
+
+    summary = compute_quali_summary(session.laps)
+    pole_lap = summary.iloc[0]
+    _plot_quali_gaps(summary, ax)
 
     lap_time_string = strftimedelta(pole_lap['LapTime'], '%m:%s.%ms')
 
@@ -952,306 +1779,990 @@ def quali_results_concrete_wall(year, event, ax=None):
 
 
 # Visualization of qualifying results for a specific session
-def quali_results_concrete(year, event):
-    session = fastf1.get_session(year, event, 'Q')
+@requires(LAPS, RESULTS, MESSAGES, session='Q')
+def quali_results_concrete(year, event, session=None, output='quali_results.png'):
     plt.style.use("cyberpunk")
-    session.load()
-
-    drivers = pd.unique(session.laps['Driver'])
-    list_fastest_laps = list()
-    q1, q2, q3 = session.laps.split_qualifying_sessions()
-    for drv in drivers:
-        drvs_fastest_lap = session.laps.pick_driver(drv).pick_fastest()
-        list_fastest_laps.append(drvs_fastest_lap)
-    fastest_laps = Laps(list_fastest_laps).sort_values(by='LapTime').reset_index(drop=True)
-    pole_lap = fastest_laps.pick_fastest()
-    fastest_laps['LapTimeDelta'] = fastest_laps['LapTime'] - pole_lap['LapTime']
-    team_colors = list()
-    filtered_fastest_laps = fastest_laps.dropna(subset=['Team'])  # Remove all NaT
-    # Filter out drivers who lost more than 5 seconds for a cleaner plot
-    filtered_fastest_laps = filtered_fastest_laps[filtered_fastest_laps['LapTimeDelta'] < pd.Timedelta(seconds=5)]
-    for index, lap in filtered_fastest_laps.iterlaps():
-        color = fastf1.plotting.team_color(lap['Team'])
-        team_colors.append(color)
-    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
-    ax.barh(filtered_fastest_laps.index, filtered_fastest_laps['LapTimeDelta'],
-            color=team_colors, edgecolor='grey')
-    ax.set_yticks(filtered_fastest_laps.index)
-    ax.set_yticklabels(filtered_fastest_laps['Driver'])
+    if session is None:
+        session = load_session_for(quali_results_concrete, year, event, 'Q')
 
-    # Show fastest at the top
-    ax.invert_yaxis()
-
-    # Draw vertical lines behind the bars
-    ax.set_axisbelow(True)
-    ax.xaxis.grid(True, which='major', linestyle='--', color='black', zorder=-1000)
+    summary = compute_quali_summary(session.laps)
+    pole_lap = summary.iloc[0]
+    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
+    _plot_quali_gaps(summary, ax)
 
     lap_time_string = strftimedelta(pole_lap['LapTime'], '%m:%s.%ms')
 
     plt.suptitle(f"{session.session_info['Meeting']['Name']} {year} Qualifying\n"
                  f"Fastest Lap: {lap_time_string} ({pole_lap['Driver']})")
-    plt.savefig(f'quali_results.png')
-    plt.show()
+    return finish_figure(fig, output)
+
+
+# Function to get the events of a season by round number: the events that already took place according to the
+# schedule, or the given events with the round the session backend (by default the current one) resolves them to,
+# so different names of the same event end up on one round
+def season_rounds(year, events=None, backend=None):
+    if events is None:
+        schedule = fastf1.get_event_schedule(year, include_testing=False)
+        schedule = schedule[schedule['EventDate'] < pd.Timestamp.now()]
+        return dict(zip(schedule['RoundNumber'].astype(int), schedule['EventName']))
+    backend = backend or _session_backend
+    return {int(backend(year, event_name, 'R').event['RoundNumber']): event_name for event_name in events}
+
+
+# Function to get the names of the events of a season that already took place
+def season_event_names(year):
+    return list(season_rounds(year).values())
+
+
+# Function to build one table for a whole season: the function turns every loaded session into a table, the tables
+# are stacked with the round and event name in front. Sessions are loaded with the minimal flags for the
+# requirements and dropped from the registry right after, events without data are reported and skipped
+def _map_season(function, requirements, year, ses, events=None):
+    if events is None:
+        events = season_event_names(year)
+    tables = []
+    for event_name in events:
+        try:
+            session = get_session(year, event_name, ses, **load_flags(requirements))
+            table = function(session)
+        except Exception as error:
+            print(f"{year} {event_name} {ses} is left out: {error}")
+            continue
+        finally:
+            evict_session(year, event_name, ses)
+        table.insert(0, 'EventName', session.event['EventName'])
+        table.insert(0, 'RoundNumber', int(session.event['RoundNumber']))
+        tables.append(table)
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
 
 
 # Function to get qualifying results for all events in a year
-def quali_results():
-    event = fastf1.get_event_schedule(2023)
-    for x in range(1, 23):
-        eventName = event['EventName'][x]
-        session = fastf1.get_session(2023, eventName, 'Q')
+@requires(LAPS, RESULTS, MESSAGES, session='Q')
+def quali_results(year=2023, events=None, output_dir=None, image_format='png'):
+    if events is None:
+        events = season_event_names(year)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    outputs = []
+    for eventName in events:
         fastf1.plotting.setup_mpl(mpl_timedelta_support=True, color_scheme=None, misc_mpl_mods=False)
         print(eventName)
-        session.load()
-
-        drivers = pd.unique(session.laps['Driver'])
-        list_fastest_laps = list()
-        q1, q2, q3 = session.laps.split_qualifying_sessions()
-        for drv in drivers:
-            drvs_fastest_lap = session.laps.pick_driver(drv).pick_fastest()
-            list_fastest_laps.append(drvs_fastest_lap)
-        fastest_laps = Laps(list_fastest_laps).sort_values(by='LapTime').reset_index(drop=True)
-        pole_lap = fastest_laps.pick_fastest()
-        fastest_laps['LapTimeDelta'] = fastest_laps['LapTime'] - pole_lap['LapTime']
-        team_colors = list()
-        filtered_fastest_laps = fastest_laps.dropna(subset=['Team'])
-        # Filter out drivers who lost more than 5 seconds for a cleaner plot
-        filtered_fastest_laps = filtered_fastest_laps[filtered_fastest_laps['LapTimeDelta'] < pd.Timedelta(seconds=5)]
-        for index, lap in filtered_fastest_laps.iterlaps():
-            color = fastf1.plotting.team_color(lap['Team'])
-            team_colors.append(color)
-        fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
-        ax.barh(filtered_fastest_laps.index, filtered_fastest_laps['LapTimeDelta'],
-                color=team_colors, edgecolor='grey')
-        ax.set_yticks(filtered_fastest_laps.index)
-        ax.set_yticklabels(filtered_fastest_laps['Driver'])
-
-        # Show fastest at the top
-        ax.invert_yaxis()
+        session = load_session_for(quali_results, year, eventName, 'Q')
 
-        # Draw vertical lines behind the bars
-        ax.set_axisbelow(True)
-        ax.xaxis.grid(True, which='major', linestyle='--', color='black', zorder=-1000)
+        summary = compute_quali_summary(session.laps)
+        pole_lap = summary.iloc[0]
+        fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
+        _plot_quali_gaps(summary, ax)
 
         lap_time_string = strftimedelta(pole_lap['LapTime'], '%m:%s.%ms')
 
         plt.suptitle(f"{session.event['EventName']} {session.event.year} Quali\n"
                      f"Fastest Lap: {lap_time_string} ({pole_lap['Driver']})")
-        plt.show()
+        output = None
+        if output_dir is not None:
+            output = os.path.join(output_dir, _quali_results_file_name(year, eventName, image_format))
+        # Headless without an output directory there is nothing to show, so the figure is not kept open
+        if finish_figure(fig, output, image_format=image_format) is fig:
+            plt.close(fig)
+        outputs.append(output)
+    return outputs
+
+
+# Function to get the file name of the qualifying results chart of an event
+def _quali_results_file_name(year, event_name, image_format):
+    return f"{year}_{event_name.lower().replace(' ', '_')}_quali.{image_format}"
+
+
+# Function to get the qualifying summary of every event of a season (or a set of its events) in one table
+def season_quali_summary(year, events=None, ses='Q'):
+    return _map_season(lambda session: compute_quali_summary(session.laps), {LAPS, MESSAGES}, year, ses, events)
+
+
+# Function to render the qualifying results of one event into a file, runs inside a worker process
+def _render_quali_results_to_file(year, event_name, output_path):
+    fastf1.plotting.setup_mpl(mpl_timedelta_support=True, color_scheme=None, misc_mpl_mods=False)
+    fig, ax = plt.subplots(figsize=(16, 9), dpi=100)
+    try:
+        quali_results_concrete_wall(year, event_name, ax=ax)
+        # Write to a temporary file first so an interrupted run never leaves a half written chart behind
+        tmp_path = f"{output_path}.tmp"
+        finish_figure(fig, tmp_path, image_format=os.path.splitext(output_path)[1][1:] or None)
+        os.replace(tmp_path, output_path)
+    finally:
+        plt.close(fig)
+        evict_session(year, event_name)
+    return output_path
+
+
+# Function to write the batch manifest atomically
+def _write_batch_manifest(path, manifest):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+# Function to render the qualifying results of a whole season (or a set of its events) in parallel
+def quali_results_batch(year, events=None, output_dir='quali_results', max_workers=None, cache_dir=None,
+                        image_format='png', force=False, backend=None):
+    if events is None:
+        events = season_event_names(year)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # The manifest records every finished event, so a crashed run resumes where it stopped
+    manifest_path = os.path.join(output_dir, f'quali_results_{year}.json')
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+    outputs = {}
+    pending = {}
+    for event_name in events:
+        output_path = os.path.join(output_dir, _quali_results_file_name(year, event_name, image_format))
+        entry = manifest.get(event_name)
+        up_to_date = (entry is not None and os.path.exists(output_path)
+                      and entry['mtime'] == os.path.getmtime(output_path))
+        if up_to_date and not force:
+            outputs[event_name] = output_path
+        else:
+            pending[event_name] = output_path
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), initializer=_init_render_worker,
+                             initargs=(cache_dir, INSTRUMENT, INSTRUMENT_MEMORY, backend)) as executor:
+        futures = {executor.submit(_run_with_timings, _render_quali_results_to_file, year, event_name, output_path):
+                   event_name for event_name, output_path in pending.items()}
+        for future in as_completed(futures):
+            event_name = futures[future]
+            try:
+                output_path, records = future.result()
+                _merge_timings(records)
+            except Exception as error:
+                print(f"{year} {event_name} qualifying could not be rendered: {error}")
+                continue
+            outputs[event_name] = output_path
+            manifest[event_name] = {'output': output_path, 'mtime': os.path.getmtime(output_path)}
+            _write_batch_manifest(manifest_path, manifest)
+    return outputs
+
+
+# Kinds of Ergast history: the Ergast query of each and the key of the per-driver entries of a race in its response.
+# Race results carry the grid as well
+HISTORY_KINDS = {'results': ('get_race_results', 'Results'),
+                 'qualifying': ('get_qualifying_results', 'QualifyingResults')}
+
+# Columns of the history tables of each kind
+HISTORY_COLUMNS = {
+    'results': ['Season', 'Round', 'RaceName', 'CircuitId', 'DriverId', 'Abbreviation', 'ConstructorId', 'TeamName',
+                'GridPosition', 'Position', 'Status', 'Laps', 'Points'],
+    'qualifying': ['Season', 'Round', 'RaceName', 'CircuitId', 'DriverId', 'Abbreviation', 'ConstructorId',
+                   'TeamName', 'Position', 'Q1', 'Q2', 'Q3'],
+}
+
+# Number of entries per Ergast request
+ERGAST_PAGE_LIMIT = 100
+
+# Directory of recorded Ergast responses (<kind>_<season>.json) that are read instead of the API when set
+ERGAST_FIXTURES = os.environ.get('F1_ANALYSIS_ERGAST_FIXTURES')
+
+# Seconds after which the history of a season that may still be running is fetched again
+HISTORY_MAX_AGE = 12 * 3600
+
+# History tables already loaded in this process, keyed by kind and season
+_history_tables = {}
+
+
+# Function to read Ergast responses from recorded fixtures instead of the API, None goes back to the API
+def set_ergast_fixtures(directory=None):
+    global ERGAST_FIXTURES
+    ERGAST_FIXTURES = directory
+    _history_tables.clear()
+
+
+# Function to fetch the races of a season with their entries of a history kind, as the raw Ergast JSON.
+# Ergast pages by entry, a race split over two pages is joined back together
+def _fetch_history_races(season, kind):
+    if ERGAST_FIXTURES is not None:
+        with open(os.path.join(ERGAST_FIXTURES, f'{kind}_{season}.json')) as file:
+            return json.load(file)
+    query, entries = HISTORY_KINDS[kind]
+    ergast = Ergast(result_type='raw', auto_cast=False, limit=ERGAST_PAGE_LIMIT)
+    response = getattr(ergast, query)(season=season)
+    races = {}
+    while True:
+        for race in response:
+            if race['round'] in races:
+                races[race['round']][entries].extend(race[entries])
+            else:
+                races[race['round']] = race
+        try:
+            response = response.get_next_result_page()
+        except ValueError:
+            break
+    return list(races.values())
+
+
+# Function to write the raw Ergast responses of seasons as fixtures, so the history can be rebuilt offline
+def record_ergast_fixtures(seasons, directory, kinds=tuple(HISTORY_KINDS)):
+    os.makedirs(directory, exist_ok=True)
+    for season in seasons:
+        for kind in kinds:
+            with open(os.path.join(directory, f'{kind}_{season}.json'), 'w') as file:
+                json.dump(_fetch_history_races(season, kind), file)
+
+
+# Function to turn the raw Ergast races of a history kind into a table with one row per driver and race
+def _history_table(races, kind):
+    entries = HISTORY_KINDS[kind][1]
+    rows = []
+    for race in races:
+        for entry in race.get(entries, []):
+            row = [int(race['season']), int(race['round']), race['raceName'], race['Circuit']['circuitId'],
+                   entry['Driver']['driverId'], entry['Driver'].get('code', ''), entry['Constructor']['constructorId'],
+                   entry['Constructor']['name']]
+            if kind == 'results':
+                row += [entry.get('grid'), entry.get('position'), entry.get('status', ''), entry.get('laps'),
+                        entry.get('points')]
+            else:
+                row += [entry.get('position'), entry.get('Q1'), entry.get('Q2'), entry.get('Q3')]
+            rows.append(row)
+    table = pd.DataFrame(rows, columns=HISTORY_COLUMNS[kind])
+    table[['Season', 'Round']] = table[['Season', 'Round']].astype('int16')
+    for column in ('RaceName', 'CircuitId', 'DriverId', 'Abbreviation', 'ConstructorId', 'TeamName', 'Status'):
+        if column in table:
+            table[column] = table[column].astype('category')
+    for column in ('GridPosition', 'Position', 'Laps'):
+        if column in table:
+            table[column] = pd.to_numeric(table[column], errors='coerce').astype('Int16')
+    if 'Points' in table:
+        table['Points'] = pd.to_numeric(table['Points'], errors='coerce')
+    for column in ('Q1', 'Q2', 'Q3'):
+        if column in table:
+            # Ergast writes lap times as m:ss.fff
+            table[column] = pd.to_timedelta('0:' + table[column].fillna(''), errors='coerce')
+    return table
+
+
+# Function to read the index of the history cache: the file, rows, rounds and fetch time of every kind and season
+def _read_history_index(directory):
+    index_path = os.path.join(directory, 'index.json')
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path) as file:
+        return json.load(file)
+
+
+# Function to get the Ergast history of a kind for one or more seasons as one table. Whole seasons are fetched in
+# bulk, in parallel, and kept in an indexed on-disk cache, so later queries never touch Ergast or the timing data.
+# Seasons that may still be running are fetched again once they are older than HISTORY_MAX_AGE
+@timed
+def get_history(seasons, kind='results', refresh=False, max_workers=4):
+    seasons = [seasons] if isinstance(seasons, int) else list(seasons)
+    directory = os.path.join(CACHE_DIR, 'history')
+    index = _read_history_index(directory)
+    current_year = pd.Timestamp.now().year
+    stale = []
+    for season in seasons:
+        entry = index.get(f'{kind}_{season}')
+        expired = entry is not None and entry['open'] and time.time() - entry['fetched'] > HISTORY_MAX_AGE
+        if refresh or entry is None or expired:
+            stale.append(season)
+
+    if stale:
+        with phase('history.fetch', rows=len(stale)):
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                races_by_season = dict(zip(stale, executor.map(_fetch_history_races, stale, [kind] * len(stale))))
+        os.makedirs(directory, exist_ok=True)
+        for season, races in races_by_season.items():
+            key = f'{kind}_{season}'
+            table = _history_table(races, kind)
+            table.to_pickle(os.path.join(directory, f'{key}.pkl.tmp'), compression=None)
+            os.replace(os.path.join(directory, f'{key}.pkl.tmp'), os.path.join(directory, f'{key}.pkl'))
+            index[key] = {'file': f'{key}.pkl', 'rows': len(table), 'rounds': int(table['Round'].nunique()),
+                          'fetched': time.time(), 'open': season >= current_year}
+            _history_tables[key] = table
+        # The index is replaced atomically and written last, a season only counts as cached once it is listed
+        with open(os.path.join(directory, 'index.json.tmp'), 'w') as file:
+            json.dump(index, file, indent=2, sort_keys=True)
+        os.replace(os.path.join(directory, 'index.json.tmp'), os.path.join(directory, 'index.json'))
+
+    tables = []
+    for season in seasons:
+        key = f'{kind}_{season}'
+        if key not in _history_tables:
+            _history_tables[key] = pd.read_pickle(os.path.join(directory, index[key]['file']), compression=None)
+        tables.append(_history_tables[key])
+    # Categories of different seasons differ, they are joined as text and categorised again
+    table = pd.concat(tables, ignore_index=True)
+    for column in table.columns[table.dtypes == object]:
+        table[column] = table[column].astype('category')
+    return table
+
+
+# Function to get the average positions gained from the grid to the finish per driver or team over seasons, from
+# the Ergast history alone. Pit lane starters are left out like in compute_positions_gained()
+@timed
+def average_positions_gained(seasons, by='driver', min_races=1):
+    if by not in ('driver', 'team'):
+        raise ValueError(f"by must be 'driver' or 'team', not {by!r}")
+    results = get_history(seasons, 'results')
+    grid_position = results['GridPosition'].where(results['GridPosition'] > 0)
+    results = results.assign(Gained=(grid_position - results['Position']).astype(float))
+    key, name = ('DriverId', 'Abbreviation') if by == 'driver' else ('ConstructorId', 'TeamName')
+    # Teams are grouped by constructor, the name is the latest one the team raced under
+    table = results.groupby(key, observed=True, sort=False).agg(
+        **{name: (name, 'last'), 'Races': ('Gained', 'count'), 'Total': ('Gained', 'sum'), 'Mean': ('Gained', 'mean')})
+    table = table.loc[table['Races'] >= min_races].astype({name: str, 'Races': int})
+    return table.sort_values('Mean', ascending=False).reset_index()
+
+
+# Columns of compute_positions_gained() that are aggregated over a season
+GAINED_COLUMNS = ('GainedFirstLap', 'GainedRace')
+
+# Season aggregate of positions gained: the event name of every race in it by round number, and [sum, count] of
+# every gained column per driver and per team. Sums and counts are integers, so merging is exact in any order
+PositionsGainedAggregate = namedtuple('PositionsGainedAggregate', ['rounds', 'drivers', 'teams'])
+
+
+# Function to get the positions gained aggregate of one loaded race
+@timed
+def positions_gained_of_race(session):
+    table = compute_positions_gained(session)
+    # Round numbers are kept as text, the keys of the persisted JSON are text as well
+    aggregate = PositionsGainedAggregate({str(int(session.event['RoundNumber'])): session.event['EventName']}, {}, {})
+    for key, target in (('Abbreviation', aggregate.drivers), ('TeamName', aggregate.teams)):
+        sums = table.groupby(key)[list(GAINED_COLUMNS)].agg(['sum', 'count'])
+        for name, row in sums.iterrows():
+            target[name] = {column: [int(row[(column, 'sum')]), int(row[(column, 'count')])]
+                            for column in GAINED_COLUMNS}
+    return aggregate
+
+
+# Function to merge positions gained aggregates. The merge is commutative and associative, a round may only be in
+# one of the aggregates so no race is ever counted twice
+def merge_positions_gained(*aggregates):
+    merged = PositionsGainedAggregate({}, {}, {})
+    for aggregate in aggregates:
+        overlap = merged.rounds.keys() & aggregate.rounds.keys()
+        if overlap:
+            raise ValueError(f"round {', '.join(sorted(overlap, key=int))} is in more than one aggregate")
+        merged.rounds.update(aggregate.rounds)
+        for target, source in ((merged.drivers, aggregate.drivers), (merged.teams, aggregate.teams)):
+            for name, sums in source.items():
+                entry = target.setdefault(name, {column: [0, 0] for column in GAINED_COLUMNS})
+                for column, (total, count) in sums.items():
+                    entry[column][0] += total
+                    entry[column][1] += count
+    return merged
+
+
+# Function to get the path of the persisted positions gained aggregate of a season
+def _season_aggregate_path(year):
+    return os.path.join(CACHE_DIR, 'aggregates', f'positions_gained_{year}.json')
+
+
+# Function to read the persisted positions gained aggregate of a season, empty when there is none yet
+def load_season_positions_gained(year):
+    path = _season_aggregate_path(year)
+    if not os.path.exists(path):
+        return PositionsGainedAggregate({}, {}, {})
+    with open(path) as file:
+        return PositionsGainedAggregate(**json.load(file))
+
+
+# Function to persist the positions gained aggregate of a season atomically
+def _save_season_positions_gained(year, aggregate):
+    path = _season_aggregate_path(year)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump(aggregate._asdict(), file, indent=2, sort_keys=True)
+    os.replace(f'{path}.tmp', path)
+
+
+# Function to get the positions gained aggregate of one race, runs inside a worker process
+def _positions_gained_of_event(year, event_name):
+    try:
+        session = get_session(year, event_name, 'R', **load_flags({LAPS, RESULTS}))
+        return positions_gained_of_race(session)
+    finally:
+        evict_session(year, event_name, 'R')
+
+
+# Function to bring the persisted positions gained aggregate of a season up to date. Only rounds that are not in it
+# yet are processed, in parallel worker processes, and merged in as they finish. The aggregate is saved after every
+# race, so an interrupted run resumes where it stopped
+def update_season_positions_gained(year, events=None, max_workers=None, cache_dir=None, backend=None):
+    aggregate = load_season_positions_gained(year)
+    rounds = season_rounds(year, events, backend)
+    pending = [event_name for round_number, event_name in rounds.items() if str(round_number) not in aggregate.rounds]
+    if not pending:
+        return aggregate
+
+    with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count(), len(pending)),
+                             initializer=_init_render_worker,
+                             initargs=(cache_dir, INSTRUMENT, INSTRUMENT_MEMORY, backend)) as executor:
+        futures = {executor.submit(_run_with_timings, _positions_gained_of_event, year, event_name): event_name
+                   for event_name in pending}
+        for future in as_completed(futures):
+            event_name = futures[future]
+            try:
+                race, records = future.result()
+                _merge_timings(records)
+                aggregate = merge_positions_gained(aggregate, race)
+            except Exception as error:
+                print(f"{year} {event_name} is left out of the positions gained: {error}")
+                continue
+            _save_season_positions_gained(year, aggregate)
+    return aggregate
+
+
+# Function to turn a positions gained aggregate into a table per driver or team: the races counted, the total
+# and the average positions gained on the first lap and in the full race
+def positions_gained_table(aggregate, by='driver'):
+    if by not in ('driver', 'team'):
+        raise ValueError(f"by must be 'driver' or 'team', not {by!r}")
+    entries = aggregate.drivers if by == 'driver' else aggregate.teams
+    rows = []
+    for name, sums in entries.items():
+        row = {'Abbreviation' if by == 'driver' else 'TeamName': name}
+        for column, (total, count) in sums.items():
+            row[f'{column}Races'] = count
+            row[f'{column}Total'] = total
+            row[column] = total / count if count else np.nan
+        rows.append(row)
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    return table.sort_values('GainedRace', ascending=False).reset_index(drop=True)
+
+
+# Result of the minisector engine: per lap and minisector averages plus the coloured track segments
+MinisectorDominance = namedtuple('MinisectorDominance', ['labels', 'average_speed', 'minisector_time', 'dominant',
+                                                         'segments', 'segment_owner'])
+
+
+# Function to find the fastest of any number of laps in every minisector from their telemetry.
+# Without a circuit geometry the map is drawn along the first lap, which needs X/Y of the merged telemetry
+@timed
+def minisector_dominance_from_telemetry(telemetry_list, labels, num_minisectors=25, geometry=None):
+    num_laps = len(telemetry_list)
+    lengths = [len(telemetry) for telemetry in telemetry_list]
+    owner = np.repeat(np.arange(num_laps), lengths)
+    speed = np.concatenate([telemetry['Speed'].to_numpy(dtype=float) for telemetry in telemetry_list])
+    # Each lap is split relative to its own length, so laps with slightly different distances line up
+    minisector = np.concatenate([
+        np.minimum(telemetry['Distance'].to_numpy(dtype=float) / telemetry['Distance'].max() * num_minisectors,
+                   num_minisectors - 1).astype(int)
+        for telemetry in telemetry_list])
+    # Time spent on each sample until the next one
+    sample_time = np.concatenate([np.diff(telemetry['Time'].dt.total_seconds().to_numpy(), append=np.nan)
+                                  for telemetry in telemetry_list])
+
+    bins = owner * num_minisectors + minisector
+    size = num_laps * num_minisectors
+    counts = np.bincount(bins, minlength=size)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_speed = (np.bincount(bins, weights=speed, minlength=size) / counts).reshape(num_laps, -1)
+    minisector_time = np.bincount(bins, weights=np.nan_to_num(sample_time), minlength=size).reshape(num_laps, -1)
+    dominant = np.argmax(np.nan_to_num(average_speed, nan=-np.inf), axis=0)
+
+    # Each segment of the track map is coloured by the dominant lap of its minisector
+    if geometry is not None:
+        segments = geometry.segments
+        segment_minisector = np.minimum(geometry.distance / geometry.distance.max() * num_minisectors,
+                                        num_minisectors - 1).astype(int)
+    else:
+        reference = telemetry_list[0]
+        points = np.column_stack([reference['X'].to_numpy(), reference['Y'].to_numpy()]).reshape(-1, 1, 2)
+        segments = np.concatenate([points[:-1], points[1:]], axis=1)
+        segment_minisector = minisector[:lengths[0] - 1]
+    segment_owner = dominant[segment_minisector]
+    return MinisectorDominance(list(labels), average_speed, minisector_time, dominant, segments, segment_owner)
+
+
+# Function to compute the minisector dominance of a list of laps
+@timed
+def compute_minisector_dominance(laps, labels=None, num_minisectors=25, geometry=None):
+    laps = list(laps)
+    if labels is None:
+        labels = [lap['Driver'] for lap in laps]
+    if geometry is not None:
+        # The map comes from the cached geometry, so speed and distance from the car data are enough
+        telemetry_list = [lap_telemetry(lap, ('Distance', 'Speed', 'Time')) for lap in laps]
+    else:
+        # X/Y come from the position data, so the merged telemetry is needed here
+        telemetry_list = [lap_telemetry(lap, ('X', 'Y', 'Distance', 'Speed', 'Time')) for lap in laps]
+    return minisector_dominance_from_telemetry(telemetry_list, labels, num_minisectors, geometry)
+
+
+# Function to compare the laps of any number of drivers on a map, coloured by the fastest driver per minisector
+@requires(LAPS, CAR_DATA, POS_DATA, CIRCUIT_INFO)
+def compare_laps_visualization_on_map(ses, drivers=None, laps=None, identifier='', num_minisectors=25, ax=None,
+                                      output=None):
+    if laps is None:
+        laps = [pick_fastest_lap(ses, driver) for driver in drivers]
+    laps = list(laps)
+    labels = list(drivers) if drivers is not None else [lap['Driver'] for lap in laps]
+    dominance = compute_minisector_dominance(laps, labels, num_minisectors, get_circuit_geometry(ses))
+    fig = None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(18, 10))
+    _plot_minisector_dominance(laps, dominance, ax)
+    ax.set_title(f"{ses.session_info['Meeting']['Name']} {ses.event.year} {identifier}\n"
+                 f"Comparison {' with '.join(labels)}")
+    # Drawn on an axis of the caller, the caller finishes the figure
+    if fig is None:
+        return ax
+    return finish_figure(fig, output)
+
+
+# Function to draw the track coloured by the fastest lap per minisector from compute_minisector_dominance()
+def _plot_minisector_dominance(laps, dominance, ax):
+    # Team colors, teammates get their own driver color so they can be told apart
+    colors = list()
+    for lap in laps:
+        color = fastf1.plotting.team_color(lap['Team'])
+        if color in colors:
+            color = driver_color(lap.session, lap['Driver'])
+        colors.append(color)
+    cmap = ListedColormap(colors)
+    norm = BoundaryNorm(np.arange(len(laps) + 1) - 0.5, cmap.N)
+
+    lc_comp = LineCollection(dominance.segments, norm=norm, cmap=cmap)
+    lc_comp.set_array(dominance.segment_owner)
+    lc_comp.set_linewidth(5)
+
+    ax.add_collection(lc_comp)
+    ax.axis('equal')
+    ax.tick_params(labelleft=False, left=False, labelbottom=False, bottom=False)
+
+    cbar = plt.colorbar(mappable=lc_comp, ax=ax, ticks=np.arange(len(laps)))
+    cbar.set_ticklabels(dominance.labels)
+    return ax
 
 
 # Function to compare the fastest laps of two drivers on a map
-def compare_fastest_lap_visualization_on_map(ses, year, driver1, driver2, identifier, ax=None):
-    laps = ses.laps
-    laps_driver1 = laps.pick_driver(driver1)
-    laps_driver2 = laps.pick_driver(driver2)
+@requires(LAPS, CAR_DATA, POS_DATA, CIRCUIT_INFO)
+def compare_fastest_lap_visualization_on_map(ses, year, driver1, driver2, identifier, ax=None, output=None):
+    return compare_laps_visualization_on_map(ses, drivers=[driver1, driver2], identifier=identifier, ax=ax,
+                                             output=output)
 
-    # Get the telemetry data from their fastest lap
-    fastest_driver1 = laps_driver1.pick_fastest().get_telemetry().add_distance()
-    fastest_driver2 = laps_driver2.pick_fastest().get_telemetry().add_distance()
 
-    # Since the telemetry data does not have a variable that indicates the driver,
-    # create that column
-    fastest_driver1['Driver'] = driver1
-    fastest_driver2['Driver'] = driver2
+# A dashboard panel: the data slices it needs, the shared data it builds on, a function computing its data from the
+# session, the options and the shared data (runs in a worker thread and must not touch matplotlib), a function drawing
+# that data on an axis and the size of its tile in inches
+Panel = namedtuple('Panel', ['requirements', 'depends', 'compute', 'draw', 'size'])
 
-    # Merge both lap telemetries to one DataFrame
-    telemetry = fastest_driver1._append(fastest_driver2)
+# Data shared by several panels by name, as (data slices, function computing it from the session and the options)
+DASHBOARD_DATA = {}
 
-    num_minisectors = 25
+# Registered dashboard panels by name, in the order they are listed
+PANELS = {}
 
-    # Grab the maximum value of distance that is known in the telemetry
-    total_distance = max(telemetry['Distance'])
+# Panels of the classic wall of plots
+WALL_PANELS = ('delta', 'speed', 'throttle', 'brake', 'gear', 'rpm', 'drs')
 
-    # Generate equally sized mini-sectors
-    minisector_length = total_distance / num_minisectors
 
-    # Initiate minisector variable, with 0 (meters) as a starting point.
-    minisectors = [0]
+# Function to register a dashboard panel, see Panel
+def register_panel(name, requirements, compute, draw, depends=(), size=(16, 5)):
+    PANELS[name] = Panel(frozenset(requirements), tuple(depends), compute, draw, size)
 
-    # Add multiples of minisector_length to the minisectors
-    for i in range(0, (num_minisectors - 1)):
-        minisectors.append(minisector_length * (i + 1))
 
-    telemetry['Minisector'] = telemetry['Distance'].apply(
-        lambda dist: (
-            int((dist // minisector_length) + 1)
-        )
-    )
-    # Calculate avg. speed per driver per mini sector
-    average_speed = telemetry.groupby(['Minisector', 'Driver'])['Speed'].mean().reset_index()
-    # Select the driver with the highest average speed
-    fastest_driver = average_speed.loc[average_speed.groupby(['Minisector'])['Speed'].idxmax()]
-    # Get rid of the speed column and rename the driver column
-    fastest_driver = fastest_driver[['Minisector', 'Driver']].rename(columns={'Driver': 'Fastest_driver'})
-    # Join the fastest driver per minisector with the full telemetry
-    telemetry = telemetry.merge(fastest_driver, on=['Minisector'])
-    # Order the data by distance to make matplotlib does not get confused
-    telemetry = telemetry.sort_values(by=['Distance'])
-    # Convert driver name to integer
-    telemetry.loc[telemetry['Fastest_driver'] == driver1, 'Fastest_driver_int'] = 1
-    telemetry.loc[telemetry['Fastest_driver'] == driver2, 'Fastest_driver_int'] = 2
-    x = np.array(telemetry['X'].values)
-    y = np.array(telemetry['Y'].values)
-    points = np.array([x, y]).T.reshape(-1, 1, 2)
-    segments = np.concatenate([points[:-1], points[1:]], axis=1)
-    fastest_driver_array = telemetry['Fastest_driver_int'].to_numpy().astype(float)
-    cmap = cm.get_cmap('winter', 2)
+# Function to get the fastest laps of the compared drivers with their car data, in a qualifying from Q3 when every
+# driver made it there
+def _dashboard_comparison(session, options):
+    laps = session.laps
+    with phase('pick_fastest'):
+        if session.name == 'Qualifying':
+            q3 = laps.split_qualifying_sessions()[2]
+            if q3 is not None and all(driver in set(q3['Driver']) for driver in options['drivers']):
+                laps = q3
+        fastest_laps = [laps.pick_driver(driver).pick_fastest() for driver in options['drivers']]
+    return fetch_comparison_laps(session, laps=fastest_laps, labels=options['drivers'])
 
-    # Get the custom color for a specific team
-    team_color1 = fastf1.plotting.driver_color(driver1)
-    print(team_color1)
-    team_color2 = fastf1.plotting.team_color(ses.laps.pick_driver(driver2).pick_fastest()['Team'])
 
-    # Replace the color for the team in the colormap
-    team_index = 0
-    cmap_colors = cmap(np.arange(cmap.N))
-    cmap_colors[team_index] = to_rgba(team_color1)
-    cmap_colors[1] = to_rgba(team_color2)
+DASHBOARD_DATA['comparison'] = ({LAPS, CAR_DATA, CIRCUIT_INFO}, _dashboard_comparison)
 
-    # Create a new colormap with the modified colors
-    custom_cmap = cm.colors.ListedColormap(cmap_colors, name='custom_winter', N=cmap.N)
 
-    # Create a LineCollection with the custom colormap
-    lc_comp = LineCollection(segments, norm=plt.Normalize(1, custom_cmap.N + 1), cmap=custom_cmap)
+# Function to get the gap of every compared lap to the first one along the lap distance
+def _compute_delta_panel(session, options, comparison):
+    grid = resample_to_distance_grid([entry.telemetry for entry in comparison], channels=('Time',),
+                                     labels=[entry.label for entry in comparison])
+    return comparison, grid.distance, grid_delta_time(grid)
 
-    lc_comp.set_array(fastest_driver_array)
-    lc_comp.set_linewidth(5)
 
-    plt.rcParams['figure.figsize'] = [18, 10]
+# Function to draw the gaps to the first compared lap
+def _draw_delta_panel(session, data, ax):
+    comparison, distance, delta_time = data
+    for entry, delta in list(zip(comparison, delta_time))[1:]:
+        plot_trace(ax, distance, delta, label=entry.label, color=entry.color)
+    ax.axhline(0, color='white')
+    annotate_corners(ax, get_circuit_metadata(session).corners)
+    ax.set(ylabel=f"Gap to {comparison[0].label} (s)", xlabel='Lap distance (meters)')
+    ax.legend(loc="lower right")
+    ax.set_title(f"{session.event.year} {session.event['EventName']} - {session.name} - "
+                 f"{' VS '.join(entry.label for entry in comparison)}")
 
-    ax.add_collection(lc_comp)
-    ax.axis('equal')
-    ax.tick_params(labelleft=False, left=False, labelbottom=False, bottom=False)
 
-    cbar = plt.colorbar(mappable=lc_comp, boundaries=np.arange(1, 4))
-    cbar.set_ticks(np.arange(1.5, 3.5))
-    cbar.set_ticklabels([driver1, driver2])
-    ax.set_title(f"{ses.session_info['Meeting']['Name']} {year} {identifier}\n"
-                 f"Comparison {driver1} with {driver2}")
-    return ax
+# Function to register the panel of one telemetry channel of the compared laps
+def _register_channel_panel(name, channel):
+    def draw(session, comparison, ax):
+        plot_comparison_channels(session, comparison, [channel], axes=[ax])
+        ax.set_title(f"{session.event.year} {session.event['EventName']} - {session.name} - {channel}")
+    register_panel(name, {LAPS, CAR_DATA, CIRCUIT_INFO}, lambda session, options, comparison: comparison, draw,
+                   depends=('comparison',))
 
 
-# Function to create a wall of plots for comparison
-def wall_of_plots(year, event_name, driver_1, driver_2, ses):
-    quali = ff1.get_session(year, event_name, ses)
-    quali.load()
+# Function to get the minisector dominance of the compared laps
+def _compute_minisector_panel(session, options, comparison):
+    laps = [entry.lap for entry in comparison]
+    return laps, compute_minisector_dominance(laps, [entry.label for entry in comparison],
+                                              geometry=get_circuit_geometry(session))
 
-    # Laps can now be accessed through the .laps object coming from the session
-    if quali.name == "Qualifying":
-        q1, q2, q3 = quali.laps.split_qualifying_sessions()
-        laps_driver_1 = q3.pick_driver(driver_1)
-        laps_driver_2 = q3.pick_driver(driver_2)
-    else:
-        laps_driver_1 = quali.laps.pick_driver(driver_1)
-        laps_driver_2 = quali.laps.pick_driver(driver_2)
 
-    # Select the fastest lap
-    fastest_driver_1 = laps_driver_1.pick_fastest()
-    fastest_driver_2 = laps_driver_2.pick_fastest()
+# Function to draw the minisector dominance map
+def _draw_minisector_panel(session, data, ax):
+    laps, dominance = data
+    _plot_minisector_dominance(laps, dominance, ax)
+    ax.set_title(f"{session.session_info['Meeting']['Name']} {session.event.year} {session.name}\n"
+                 f"Comparison {' with '.join(dominance.labels)}")
 
-    # Retrieve the telemetry and add the distance column
-    telemetry_driver_1 = fastest_driver_1.get_telemetry().add_distance()
-    telemetry_driver_2 = fastest_driver_2.get_telemetry().add_distance()
 
-    # Make sure we know the team name for coloring
-    team_driver_1 = fastest_driver_1['Team']
-    team_driver_2 = fastest_driver_2['Team']
-    delta_time, ref_tel, compare_tel = utils.delta_time(fastest_driver_1, fastest_driver_2, )
+# Function to draw the gaps to pole of a qualifying
+def _draw_quali_panel(session, summary, ax):
+    _plot_quali_gaps(summary, ax)
+    ax.set_title(f"{session.session_info['Meeting']['Name']} {session.event.year} Qualifying\n"
+                 f"Fastest Lap: {strftimedelta(summary['LapTime'].iloc[0], '%m:%s.%ms')} ({summary['Driver'].iloc[0]})")
+
+
+# Function to draw the tyre strategies in finishing order
+def _draw_tyre_panel(session, stints, ax):
+    _plot_tyre_stints(stints, list(session.results['Abbreviation']), ax)
+    ax.set(xlabel="Lap", ylabel="Driver")
+    ax.grid(False)
+    ax.invert_yaxis()
+    ax.set_title(f"{session.event['EventName']} {session.event.year} tyre strategies")
+
+
+# Function to draw the team pace
+def _draw_team_pace_panel(session, data, ax):
+    _plot_team_pace(*data, ax)
+    ax.set(xlabel=None)
+    ax.grid(visible=False)
+    ax.set_title(f"Team pace comparison of {session.session_info['Meeting']['Name']} {session.event.year}")
+
+
+# Function to draw the lap time distributions of the top 10 finishers
+def _draw_lap_time_panel(session, data, ax):
+    _plot_lap_time_distribution(*data, ax)
+    ax.set_title(f"{session.event['EventName']} {session.event.year} Lap Time Distributions")
+
+
+# Function to draw the launch times to the speed of the options
+def _draw_launch_panel(session, launch_times, ax):
+    speed = launch_times.columns[0]
+    best_driver, best_time = _plot_launch_times(session, launch_times[speed], ax)
+    ax.set(xlabel='Gap', ylabel='Drivers')
+    ax.set_title(f"{session.session_info['Meeting']['Name']} {session.event.year}\n"
+                 f"Best time from 0 to {speed}: {best_driver} {best_time}s")
+
+
+# Function to register the panel of the positions gained on the first lap or in the full race
+def _register_positions_gained_panel(name, column, title):
+    def draw(session, table, ax):
+        _plot_positions_gained(table, column, ax)
+        ax.set(xlabel='Positions gained', ylabel='Drivers')
+        ax.set_title(f"{title} {session.session_info['Meeting']['Name']} {session.event.year}")
+    register_panel(name, {LAPS, RESULTS} if column == 'GainedFirstLap' else {RESULTS},
+                   lambda session, options: compute_positions_gained(session, column == 'GainedFirstLap'), draw)
+
+
+register_panel('delta', {LAPS, CAR_DATA, CIRCUIT_INFO}, _compute_delta_panel, _draw_delta_panel,
+               depends=('comparison',))
+for _name, _channel in (('speed', 'Speed'), ('throttle', 'Throttle'), ('brake', 'Brake'), ('gear', 'nGear'),
+                        ('rpm', 'RPM'), ('drs', 'DRS')):
+    _register_channel_panel(_name, _channel)
+register_panel('minisectors', {LAPS, CAR_DATA, POS_DATA, CIRCUIT_INFO}, _compute_minisector_panel,
+               _draw_minisector_panel, depends=('comparison',), size=(16, 10))
+register_panel('quali_results', {LAPS, RESULTS, MESSAGES}, lambda session, options: compute_quali_summary(session.laps),
+               _draw_quali_panel, size=(16, 9))
+register_panel('tyre_strategies', {LAPS, RESULTS}, lambda session, options: compute_tyre_stints(session.laps),
+               _draw_tyre_panel, size=(8, 10))
+register_panel('team_pace', {LAPS}, lambda session, options: compute_team_pace(session.laps), _draw_team_pace_panel,
+               size=(15, 10))
+register_panel('lap_time_distribution', {LAPS, RESULTS},
+               lambda session, options: compute_lap_time_distribution(session), _draw_lap_time_panel, size=(10, 5))
+register_panel('launch_times', {LAPS, RESULTS, CAR_DATA},
+               lambda session, options: compute_launch_times(session, [options['speed']]), _draw_launch_panel,
+               size=(16, 9))
+register_panel('position_changes', {LAPS, RESULTS}, lambda session, options: None,
+               lambda session, data, ax: visualization_of_position_changes_during_the_race_wall(session, ax=ax),
+               size=(8, 4.9))
+_register_positions_gained_panel('positions_gained_first_lap', 'GainedFirstLap', 'Positions gained on first lap in')
+_register_positions_gained_panel('positions_gained_race', 'GainedRace', 'Positions gained in')
+
+
+# Function to compute the data of the requested panels in worker threads. Shared data is submitted first, so a panel
+# waiting for it never blocks the computation it waits for. Returns a future per panel
+def _compute_panels(executor, session, panels, options):
+    shared = {}
+    for name in panels:
+        for dependency in PANELS[name].depends:
+            if dependency not in shared:
+                shared[dependency] = executor.submit(_compute_dashboard_data, dependency, session, options)
+
+    def compute(name):
+        with phase(f'panel.{name}'):
+            return PANELS[name].compute(session, options,
+                                        *[shared[dependency].result() for dependency in PANELS[name].depends])
+    return {name: executor.submit(compute, name) for name in panels}
+
+
+# Function to compute one piece of shared dashboard data
+def _compute_dashboard_data(name, session, options):
+    with phase(f'data.{name}'):
+        return DASHBOARD_DATA[name][1](session, options)
+
+
+# Function to compose a dashboard from any of the registered panels (see PANELS) of one session. Only the requested
+# panels are computed, concurrently in threads on the one shared session that is loaded with just the data they need,
+# while the main thread draws them as soon as they are ready. Layouts:
+#   'tiles' - one image per panel in the directory output, named <panel>.<image_format> (png by default)
+#   'pdf'   - one page per panel in the PDF file output
+#   'stack' - all panels below each other in one image, like the classic wall of plots
+# Tiles and pages are saved and released one at a time, so memory and saving time grow with the panels requested
+@timed
+def compose_dashboard(year, event_name, ses, panels, drivers=None, speed=100, session=None, output=None,
+                      layout='tiles', image_format=None, dpi=100, max_workers=None):
+    panels = list(panels)
+    unknown = [name for name in panels if name not in PANELS]
+    if unknown:
+        raise ValueError(f"Unknown panels {unknown}, available are {list(PANELS)}")
+    if layout not in ('tiles', 'pdf', 'stack'):
+        raise ValueError(f"Unknown layout {layout}, use 'tiles', 'pdf' or 'stack'")
+    if session is None:
+        requirements = set()
+        for name in panels:
+            requirements |= PANELS[name].requirements
+            for dependency in PANELS[name].depends:
+                requirements |= DASHBOARD_DATA[dependency][0]
+        session = get_session(year, event_name, ses, **load_flags(requirements))
+    options = {'drivers': list(drivers or []), 'speed': speed}
     plt.style.use("cyberpunk")
-    plot_size = [20, 100]
-    plot_title = f"{quali.event.year} {quali.event.EventName} - {quali.name} - {driver_1} VS {driver_2}"
-    plot_ratios = [3, 3, 3, 3, 3, 3, 3, 5, 4, 4, 4, 4, 4]
-    plot_filename = "cyberpunk_version"
-    # Make plot a bit bigger
-    plt.rcParams['figure.figsize'] = plot_size
-    # Create subplots with different sizes
-    fig, ax = plt.subplots(13, gridspec_kw={'height_ratios': plot_ratios})
-    # corners
-    circuit_info = quali.get_circuit_info()
-    ax[0].vlines(x=circuit_info.corners['Distance'], ymin=-0.3, ymax=max(delta_time),
-                 linestyles='dotted', colors='grey')
-    for _, corner in circuit_info.corners.iterrows():
-        txt = f"{corner['Number']}{corner['Letter']}"
-        ax[0].text(corner['Distance'], -0.3, txt,
-                   va='center_baseline', ha='center', size='small')
-    # Set the plot title
-    ax[0].title.set_text(plot_title)
-    # Delta line
-    # Change plot color to yellow
-    ax[0].plot(ref_tel['Distance'], delta_time, label=driver_1, color=ff1.plotting.team_color(team_driver_1))
-    ax[0].plot(ref_tel['Distance'], delta_time)
-    ax[0].axhline(0, color='white')
-    ax[0].set(ylabel=f"Gap to {driver_1} (s)")
-    ax[0].set(xlabel='Lap distance (meters)')
-    # Speed trace
-    ax[1].plot(telemetry_driver_1['Distance'], telemetry_driver_1['Speed'], label=driver_1,
-               color=ff1.plotting.team_color(team_driver_1))
-    ax[1].plot(telemetry_driver_2['Distance'], telemetry_driver_2['Speed'], label=driver_2,
-               color=ff1.plotting.team_color(team_driver_2))
-    ax[1].set(ylabel='Speed (km/h)')
-    ax[1].legend(loc="lower right")
-    ax[1].set(xlabel='Lap distance (meters)')
-
-    # Throttle trace
-    ax[2].plot(telemetry_driver_1['Distance'], telemetry_driver_1['Throttle'], label=driver_1,
-               color=ff1.plotting.team_color(team_driver_1))
-    ax[2].plot(telemetry_driver_2['Distance'], telemetry_driver_2['Throttle'], label=driver_2,
-               color=ff1.plotting.team_color(team_driver_2))
-    ax[2].set(ylabel='Throttle (%)')
-    ax[2].set(xlabel='Lap distance (meters)')
-
-    # Brake trace
-    ax[3].plot(telemetry_driver_1['Distance'], telemetry_driver_1['Brake'], label=driver_1,
-               color=ff1.plotting.team_color(team_driver_1))
-    ax[3].plot(telemetry_driver_2['Distance'], telemetry_driver_2['Brake'], label=driver_2,
-               color=ff1.plotting.team_color(team_driver_2))
-    ax[3].set(ylabel='Brake')
-    ax[3].set(xlabel='Lap distance (meters)')
-
-    # Gear trace
-    ax[4].plot(telemetry_driver_1['Distance'], telemetry_driver_1['nGear'], label=driver_1,
-               color=ff1.plotting.team_color(team_driver_1))
-    ax[4].plot(telemetry_driver_2['Distance'], telemetry_driver_2['nGear'], label=driver_2,
-               color=ff1.plotting.team_color(team_driver_2))
-    ax[4].set(ylabel='Gear')
-    ax[4].set(xlabel='Lap distance (meters)')
-
-    # RPM trace
-    ax[5].plot(telemetry_driver_1['Distance'], telemetry_driver_1['RPM'], label=driver_1,
-               color=ff1.plotting.team_color(team_driver_1))
-    ax[5].plot(telemetry_driver_2['Distance'], telemetry_driver_2['RPM'], label=driver_2,
-               color=ff1.plotting.team_color(team_driver_2))
-    ax[5].set(ylabel='RPM')
-    ax[5].set(xlabel='Lap distance (meters)')
-
-    # DRS trace
-    ax[6].plot(telemetry_driver_1['Distance'], telemetry_driver_1['DRS'], label=driver_1,
-               color=ff1.plotting.team_color(team_driver_1))
-    ax[6].plot(telemetry_driver_2['Distance'], telemetry_driver_2['DRS'], label=driver_2,
-               color=ff1.plotting.team_color(team_driver_2))
-    ax[6].set(ylabel='DRS')
-    ax[6].set(xlabel='Lap distance (meters)')
-
-    # Space between plots
-    plt.subplots_adjust(hspace=0.3)
-
-    # Placeholder for additional plots
-    # ax[7] = quali_results_concrete_wall(2023, "Bahrain", ax=ax[7])
-    # ax[8] = compare_fastest_lap_visualization_on_map(quali, year, driver_1, driver_2, ses, ax=ax[8])
-    # tyre_strategies_wall(quali, ax=ax[7])
-    # driver_laptimes_visualization_wall(2023, "Bahrain", ax=ax[9])
-    # team_pace_comparison_wall(quali, ax=ax[7])
-    # get_0_x_times_wall(quali, 100, ax=ax[12])
-    # visualization_of_position_changes_during_the_race_wall(quali, ax=ax[9])
-    # get_gained_positions_in_full_race_wall(quali, ax=ax[10])
-    # get_gained_positions_on_first_lap_wall(quali, ax=ax[11])
-
-    # Store figure
-    plt.savefig(plot_filename, dpi=300)
-
-    plt.show()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = _compute_panels(executor, session, panels, options)
+        if layout == 'stack':
+            fig, axes = plt.subplots(len(panels), figsize=(max(PANELS[name].size[0] for name in panels),
+                                                           sum(PANELS[name].size[1] for name in panels)),
+                                     gridspec_kw={'height_ratios': [PANELS[name].size[1] for name in panels]},
+                                     squeeze=False)
+            for name, ax in zip(panels, axes[:, 0]):
+                with phase(f'draw.{name}'):
+                    PANELS[name].draw(session, futures[name].result(), ax)
+            fig.tight_layout()
+            return finish_figure(fig, output, dpi, image_format)
+
+        if output is None:
+            output = f'dashboard_{year}_{event_name}_{ses}'.replace(' ', '_')
+            output += '.pdf' if layout == 'pdf' else ''
+        if layout == 'tiles':
+            os.makedirs(output, exist_ok=True)
+            outputs = []
+        else:
+            pages = PdfPages(output)
+        try:
+            for name in panels:
+                fig, ax = plt.subplots(figsize=PANELS[name].size)
+                with phase(f'draw.{name}'):
+                    PANELS[name].draw(session, futures[name].result(), ax)
+                fig.tight_layout()
+                if layout == 'tiles':
+                    outputs.append(finish_figure(fig, os.path.join(output, f"{name}.{image_format or 'png'}"), dpi,
+                                                 image_format))
+                else:
+                    with phase('render'):
+                        pages.savefig(fig, dpi=dpi)
+                        plt.close(fig)
+        finally:
+            if layout == 'pdf':
+                pages.close()
+        return outputs if layout == 'tiles' else output
+
+
+# Function to create a wall of plots for comparison: the gap between the fastest laps of two drivers and their
+# speed, throttle, brake, gear, RPM and DRS traces below each other in one image
+@requires(LAPS, CAR_DATA, POS_DATA, CIRCUIT_INFO, MESSAGES)
+def wall_of_plots(year, event_name, driver_1, driver_2, ses, session=None, output="cyberpunk_version", dpi=300):
+    return compose_dashboard(year, event_name, ses, WALL_PANELS, drivers=[driver_1, driver_2], session=session,
+                             output=output, layout='stack', dpi=dpi)
+
+
+# Parameter names the analyses use for the event and the session
+EVENT_PARAMETERS = ('event_name', 'event', 'destination')
+SESSION_PARAMETERS = ('ses',)
+
+# Parameter names the analyses use for single drivers, filled from the 'drivers' list of a job in this order
+DRIVER_PARAMETERS = ('driver', 'driver1', 'driver2', 'driver_1', 'driver_2')
+
+
+# Function to read a manifest of chart jobs from a JSON or (with PyYAML installed) YAML file. A manifest is a list of
+# jobs or a mapping with 'jobs' and 'defaults' that are applied to every job, e.g.
+# {"defaults": {"year": 2024, "event": "Monaco"},
+#  "jobs": [{"function": "compare_drivers", "session": "Q", "drivers": ["ALO", "LEC"], "output": "q.png"},
+#           {"function": "tyre_strategies", "output": "tyres.png"}]}
+def load_manifest(path):
+    with open(path) as file:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError(f"{path} is a YAML manifest, reading it needs PyYAML (pip install pyyaml)")
+            manifest = yaml.safe_load(file)
+        else:
+            manifest = json.load(file)
+    if isinstance(manifest, list):
+        manifest = {'jobs': manifest}
+    defaults = manifest.get('defaults', {})
+    return [dict(defaults, **job) for job in manifest['jobs']]
+
+
+# Function to translate the fields of a job into the keyword arguments of its analysis, for an already loaded session
+def _job_arguments(function, job, session):
+    parameters = inspect.signature(function).parameters
+    arguments = {'session': session, 'output': job['output']}
+    if 'year' in parameters:
+        arguments['year'] = job['year']
+    for name in EVENT_PARAMETERS:
+        if name in parameters:
+            arguments[name] = job['event']
+    for name in SESSION_PARAMETERS:
+        if name in parameters:
+            arguments[name] = job['session']
+    drivers = list(job.get('drivers', []))
+    if 'drivers' in parameters:
+        arguments['drivers'] = drivers
+    else:
+        for name in [name for name in DRIVER_PARAMETERS if name in parameters]:
+            if not drivers:
+                raise ValueError(f"{job['function']} needs more drivers than {job.get('drivers')}")
+            arguments[name] = drivers.pop(0)
+    # Every other field is passed through as is, e.g. 'speed' or 'channels'
+    for name, value in job.items():
+        if name not in ('function', 'year', 'event', 'session', 'drivers', 'output'):
+            if name not in parameters:
+                raise ValueError(f"{job['function']} has no parameter {name}")
+            arguments[name] = value
+    return arguments
+
+
+# Function to group the jobs of a manifest by the session they need, checking every job on the way. Sessions are told
+# apart by year, round number and session name, so 'Monaco' and 'Monaco Grand Prix' or 'R' and 'Race' share one
+def group_jobs(jobs, backend=None):
+    backend = backend or _session_backend
+    resolved = {}
+    groups = {}
+    for job in jobs:
+        function = globals().get(job.get('function'))
+        if not hasattr(function, 'data_requirements') or 'output' not in inspect.signature(function).parameters:
+            raise ValueError(f"{job.get('function')} is not an analysis that renders to a file")
+        for field in ('year', 'event', 'output'):
+            if field not in job:
+                raise ValueError(f"Job {job} has no {field}")
+        job = dict(job)
+        # Analyses of one kind of session load it themselves, the session of the job only overrides it
+        job.setdefault('session', function.session_name)
+        if job['session'] is None:
+            raise ValueError(f"Job {job} has no session")
+        _job_arguments(function, job, None)
+        spelling = (job['year'], str(job['event']), str(job['session']))
+        if spelling not in resolved:
+            session = backend(job['year'], job['event'], job['session'])
+            resolved[spelling] = (job['year'], int(session.event['RoundNumber']), session.name)
+        groups.setdefault(resolved[spelling], []).append(job)
+    return groups
+
+
+# Function to run the jobs of one session: the session is loaded once with the union of their data requirements
+# and every chart is rendered from it. Returns an (output, error message) pair per job
+def _run_job_group(year, event_name, ses, jobs):
+    functions = [globals()[job['function']] for job in jobs]
+    results = []
+    try:
+        session = load_session_for(functions, year, event_name, ses)
+        for function, job in zip(functions, jobs):
+            output_directory = os.path.dirname(job['output'])
+            if output_directory:
+                os.makedirs(output_directory, exist_ok=True)
+            try:
+                results.append((function(**_job_arguments(function, job, session)), None))
+            except Exception as error:
+                results.append((None, f"{type(error).__name__}: {error}"))
+    except Exception as error:
+        results = [(None, f"{type(error).__name__}: {error}")] * len(jobs)
+    finally:
+        evict_session(year, event_name, ses)
+    return results
+
+
+# Function to run all jobs of a manifest, one task per session so every session is loaded once, spread over worker
+# processes. Returns the output of every job (None for failed jobs) in manifest order
+def run_manifest(jobs, max_workers=None, cache_dir=None, backend=None):
+    groups = group_jobs(jobs, backend)
+    results = {}
+    # The largest groups are started first, so a big weekend doesn't end up running alone at the end
+    ordered = sorted(groups.items(), key=lambda item: len(item[1]), reverse=True)
+    with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count(), len(groups)) or 1,
+                             initializer=_init_render_worker,
+                             initargs=(cache_dir, INSTRUMENT, INSTRUMENT_MEMORY, backend)) as executor:
+        # Every group is loaded with the event and session as the first of its jobs spells them
+        futures = {executor.submit(_run_with_timings, _run_job_group, key[0], session_jobs[0]['event'],
+                                   session_jobs[0]['session'], session_jobs): key
+                   for key, session_jobs in ordered}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                group_results, records = future.result()
+                _merge_timings(records)
+            except Exception as error:
+                group_results = [(None, f"{type(error).__name__}: {error}")] * len(groups[key])
+            for job, (output, error) in zip(groups[key], group_results):
+                results[job['output']] = output
+                if error is not None:
+                    print(f"{job['function']} {key[0]} round {key[1]} {key[2]} could not be rendered to "
+                          f"{job['output']}: {error}")
+    return [results[job['output']] for job in jobs]
 
 
 if __name__ == '__main__':
-    wall_of_plots(2024, "Monaco", "ALO", "LEC", "R")
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Render the charts listed in a JSON or YAML manifest, every session '
+                                                 'is loaded once. Without a manifest the default wall of plots is made')
+    parser.add_argument('manifest', nargs='?')
+    parser.add_argument('--workers', type=int, help='worker processes, one session is handled per worker at a time')
+    parser.add_argument('--cache-dir', help='FastF1 cache directory shared by the workers')
+    parser.add_argument('--timings', help='write the timing records of all phases to this JSON file')
+    parser.add_argument('--memory', action='store_true', help='trace the memory allocated by every phase')
+    parser.add_argument('--synthetic', type=int, metavar='SEED', help='render from synthetic sessions of this seed')
+    args = parser.parse_args()
+
+    if args.manifest is None:
+        wall_of_plots(2024, "Monaco", "ALO", "LEC", "R")
+    else:
+        backend = None
+        if args.synthetic is not None:
+            import synthetic_session
+            backend = synthetic_session.session_backend(seed=args.synthetic)
+        set_instrumentation(True, args.memory)
+        jobs = load_manifest(args.manifest)
+        start = time.perf_counter()
+        outputs = run_manifest(jobs, args.workers, args.cache_dir, backend)
+        print(f"{sum(output is not None for output in outputs)} of {len(jobs)} charts from "
+              f"{len(group_jobs(jobs, backend))} sessions in {time.perf_counter() - start:.1f} s")
+        with pd.option_context('display.width', 160, 'display.max_columns', None):
+            print(timing_summary())
+        if args.timings:
+            dump_timings(args.timings)
@@ -0,0 +1,334 @@
+import argparse
+import json
+import time
+from collections import namedtuple
+
+import fastf1.plotting
+import numpy as np
+import pandas as pd
+from fastf1.utils import to_datetime
+from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
+
+import f1_telemetry_analysis as analysis
+
+# Live timing topics the replay reads, all other lines of a recording are skipped
+TOPICS = ('DriverList', 'TimingData', 'TimingAppData', 'LapCount')
+
+# Seconds of session time between two chart updates
+UPDATE_INTERVAL = 1.0
+
+# Line width of a tyre stint bar in points
+STINT_WIDTH = 9
+
+# Outcome of a replay: messages applied, chart updates and the wall time of an update in milliseconds
+ReplayStats = namedtuple('ReplayStats', ['messages', 'updates', 'mean_ms', 'p95_ms', 'max_ms'])
+
+
+# Function to parse one line of a live timing recording (as written by FastF1's live timing client) into
+# (date, topic, message), None for lines that can't be read
+def parse_recording_line(line):
+    # The client writes str() of Python lists, they are turned into JSON the same way FastF1 reads them
+    line = line.replace("'", '"').replace('True', 'true').replace('False', 'false')
+    try:
+        topic, message, timestamp = json.loads(line)
+    except (json.JSONDecodeError, ValueError):
+        return None
+    date = to_datetime(timestamp)
+    if date is None:
+        return None
+    return date, topic, message
+
+
+# Function to read a live timing recording line by line as (date, topic, message) of the wanted topics,
+# so a replay never holds more of the recording than the current line
+def read_recording(path, topics=TOPICS):
+    with open(path) as file:
+        for line in file:
+            # The topic is checked on the raw line first, most lines of a recording are car and position data
+            if not any(topic in line[:40] for topic in topics):
+                continue
+            parsed = parse_recording_line(line)
+            if parsed is not None and parsed[1] in topics:
+                yield parsed
+
+
+# Function to merge a live timing update into the state it changes. Lists are updated by index in later messages,
+# so they are kept as dicts keyed by the index as text
+def _merge(state, update):
+    if isinstance(update, list):
+        update = {str(index): value for index, value in enumerate(update)}
+    for key, value in update.items():
+        if isinstance(value, (dict, list)):
+            node = state.get(key)
+            if not isinstance(node, dict):
+                node = state[key] = {}
+            _merge(node, value)
+        else:
+            state[key] = value
+    return state
+
+
+# Function to read a gap to the leader in seconds, the leader has a gap of 0 and lapped cars have none
+def _parse_gap(gap):
+    if not isinstance(gap, str) or not gap:
+        return None
+    if gap.startswith('LAP'):
+        return 0.0
+    try:
+        return float(gap.lstrip('+'))
+    except ValueError:
+        return None
+
+
+# State of a session built from live timing messages, with the history of positions and gaps per lap
+class LiveTimingState:
+    def __init__(self):
+        self.drivers = {}
+        self.timing = {}
+        self.app_data = {}
+        self.lap_count = {}
+        self.positions = {}
+        self.gaps = {}
+        # Drivers whose history changed since the charts were last updated
+        self.changed = set()
+
+    # Function to apply one message of a topic
+    def apply(self, topic, message):
+        if topic == 'DriverList':
+            _merge(self.drivers, {number: entry for number, entry in message.items() if isinstance(entry, dict)})
+        elif topic == 'LapCount':
+            _merge(self.lap_count, message)
+        elif topic == 'TimingAppData':
+            _merge(self.app_data, message.get('Lines', {}))
+        elif topic == 'TimingData':
+            lines = message.get('Lines', {})
+            _merge(self.timing, lines)
+            for number, line in lines.items():
+                # A completed lap adds the position and the gap at the line to the history of the driver
+                if isinstance(line, dict) and 'NumberOfLaps' in line:
+                    timing = self.timing[number]
+                    position = timing.get('Position')
+                    if position is None:
+                        continue
+                    self.positions.setdefault(number, ([], []))
+                    self.positions[number][0].append(int(line['NumberOfLaps']))
+                    self.positions[number][1].append(int(position))
+                    gap = _parse_gap(timing.get('GapToLeader'))
+                    self.gaps.setdefault(number, ([], []))
+                    self.gaps[number][0].append(int(line['NumberOfLaps']))
+                    self.gaps[number][1].append(np.nan if gap is None else gap)
+                    self.changed.add(number)
+
+    # Function to get the stints of a driver as (first lap, laps, compound), the laps of the stints add up
+    def stints(self, number):
+        stints = self.app_data.get(number, {}).get('Stints', {})
+        rows = []
+        start = 0
+        for index in sorted(stints, key=int):
+            stint = stints[index]
+            laps = int(stint.get('TotalLaps', 0)) - int(stint.get('StartLaps', 0))
+            rows.append((start, laps, stint.get('Compound', 'UNKNOWN')))
+            start += laps
+        return rows
+
+
+# Charts of a live session updated in place: position changes, gap to the leader and tyre stints. Every trace is one
+# artist whose data is replaced on an update, only the artists are redrawn unless the axes change
+class LiveCharts:
+    def __init__(self, state, figsize=(16, 12)):
+        self.state = state
+        self.figure, (self.position_ax, self.gap_ax, self.tyre_ax) = plt.subplots(
+            3, figsize=figsize, gridspec_kw={'height_ratios': [4, 3, 4]})
+        self.position_lines = {}
+        self.gap_lines = {}
+        self.stint_bars = LineCollection([], linewidths=STINT_WIDTH, capstyle='butt', animated=True)
+        self.tyre_ax.add_collection(self.stint_bars)
+        self.rows = {}
+        self.gap_limit = 10.0
+        self.background = None
+        self.position_ax.set_ylabel('Position')
+        self.gap_ax.set_ylabel('Gap to leader (s)')
+        self.tyre_ax.set_xlabel('Lap')
+        self.tyre_ax.grid(False)
+
+    # Function to add the artists of drivers seen for the first time, returns whether any were added
+    def _add_drivers(self):
+        added = False
+        for number, driver in self.state.drivers.items():
+            if number in self.position_lines:
+                continue
+            color = f"#{driver.get('TeamColour', '808080')}"
+            label = driver.get('Tla', number)
+            self.position_lines[number], = self.position_ax.plot([], [], color=color, label=label, animated=True)
+            self.gap_lines[number], = self.gap_ax.plot([], [], color=color, label=label, animated=True)
+            added = True
+        if added:
+            # Rows of the tyre chart in the order of the driver list, that is the running order when it was sent
+            order = sorted(self.state.drivers, key=lambda number: int(self.state.drivers[number].get('Line', 99)))
+            self.rows = {number: row for row, number in enumerate(order)}
+            self.tyre_ax.set_yticks(range(len(order)))
+            self.tyre_ax.set_yticklabels([self.state.drivers[number].get('Tla', number) for number in order])
+            self.tyre_ax.set_ylim(len(order) - 0.5, -0.5)
+            self.position_ax.set_yticks(range(1, len(order) + 1))
+            self.position_ax.set_ylim(len(order) + 0.5, 0.5)
+            self.position_ax.legend(bbox_to_anchor=(1.0, 1.0), loc='upper left', fontsize='small')
+        return added
+
+    # Function to set the lap axis to the race distance, returns whether it changed
+    def _set_laps(self):
+        total_laps = int(self.state.lap_count.get('TotalLaps', 0))
+        if total_laps and self.position_ax.get_xlim() != (0, total_laps + 1):
+            for ax in (self.position_ax, self.gap_ax, self.tyre_ax):
+                ax.set_xlim(0, total_laps + 1)
+            return True
+        return False
+
+    # Function to replace the data of the changed traces and the stint bars, returns whether the axes have to grow
+    def _update_artists(self):
+        grow = False
+        for number in self.state.changed:
+            if number not in self.position_lines:
+                continue
+            self.position_lines[number].set_data(*self.state.positions[number])
+            laps, gaps = self.state.gaps[number]
+            self.gap_lines[number].set_data(laps, gaps)
+            largest = np.nanmax(gaps) if not np.all(np.isnan(gaps)) else 0
+            if largest > self.gap_limit:
+                self.gap_limit = largest * 1.5
+                grow = True
+        self.state.changed.clear()
+        segments = []
+        colors = []
+        for number, row in self.rows.items():
+            for start, laps, compound in self.state.stints(number):
+                segments.append([(start, row), (start + laps, row)])
+                colors.append(fastf1.plotting.COMPOUND_COLORS.get(compound, fastf1.plotting.COMPOUND_COLORS['UNKNOWN']))
+        self.stint_bars.set_segments(segments)
+        self.stint_bars.set_color(colors)
+        return grow
+
+    # Function to bring the charts up to date with the state. Only the traces are redrawn onto the saved background,
+    # the whole figure is drawn when drivers, the race distance or the gap range change
+    def update(self, full=False):
+        full = self._add_drivers() | self._set_laps() | self._update_artists() | full
+        canvas = self.figure.canvas
+        if full or self.background is None:
+            self.gap_ax.set_ylim(0, self.gap_limit)
+            canvas.draw()
+            self.background = canvas.copy_from_bbox(self.figure.bbox)
+        else:
+            canvas.restore_region(self.background)
+        for artist in [*self.position_lines.values(), *self.gap_lines.values(), self.stint_bars]:
+            self.figure.draw_artist(artist)
+        canvas.blit(self.figure.bbox)
+        canvas.flush_events()
+
+
+# Function to replay a recording into live charts. speed is the factor the recording is played faster than real
+# time, None plays it as fast as possible. The charts are updated every update_interval seconds of session time,
+# the last frame is saved to output when given
+def replay(path, speed=1.0, update_interval=UPDATE_INTERVAL, output=None, figsize=(16, 12)):
+    state = LiveTimingState()
+    charts = LiveCharts(state, figsize)
+    if not analysis.HEADLESS:
+        plt.show(block=False)
+    latencies = []
+    messages = 0
+    first_date = start = last_update = None
+    for date, topic, message in read_recording(path):
+        if first_date is None:
+            first_date = date
+            start = time.perf_counter()
+        elapsed = (date - first_date).total_seconds()
+        if speed:
+            delay = start + elapsed / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        state.apply(topic, message)
+        messages += 1
+        if last_update is None or elapsed - last_update >= update_interval:
+            with analysis.phase('live.update'):
+                update_start = time.perf_counter()
+                charts.update()
+                latencies.append(time.perf_counter() - update_start)
+            last_update = elapsed
+    charts.update(full=True)
+    if output is not None:
+        charts.figure.savefig(output)
+    if analysis.HEADLESS:
+        plt.close(charts.figure)
+    latencies = np.array(latencies or [0.0]) * 1000
+    return ReplayStats(messages, len(latencies), float(latencies.mean()), float(np.percentile(latencies, 95)),
+                       float(latencies.max()))
+
+
+# Function to format a session time as a live timing timestamp
+def _timestamp(date):
+    return date.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+# Function to get the colour of the team of a results row as in the driver list, hex digits without '#'
+def _team_colour(row):
+    if isinstance(row['TeamColor'], str) and row['TeamColor']:
+        return row['TeamColor']
+    return fastf1.plotting.team_color(row['TeamName']).lstrip('#')
+
+
+# Function to write the timing of a loaded race (real or synthetic) as a live timing recording: the driver list,
+# the lap count, positions and gaps at the end of every lap and the tyre stints, timed by the session clock
+def write_recording(session, path):
+    laps = session.laps.loc[session.laps['Time'].notna() & session.laps['LapNumber'].notna()]
+    leader_times = laps.groupby('LapNumber')['Time'].min()
+    results = session.results
+    messages = [(pd.Timedelta(0), 'SessionData',
+                 {'StatusSeries': [{'Utc': _timestamp(session.t0_date), 'SessionStatus': 'Started'}]}),
+                (pd.Timedelta(0), 'DriverList',
+                 {str(row['DriverNumber']): {'RacingNumber': str(row['DriverNumber']), 'Tla': row['Abbreviation'],
+                                             'TeamName': row['TeamName'], 'TeamColour': _team_colour(row),
+                                             'Line': int(row['GridPosition']) or int(position)}
+                  for position, (_, row) in enumerate(results.iterrows(), start=1)}),
+                (pd.Timedelta(0), 'LapCount', {'CurrentLap': 1, 'TotalLaps': int(laps['LapNumber'].max())})]
+    for lap_number, leader_time in leader_times.items():
+        messages.append((leader_time, 'LapCount', {'CurrentLap': int(lap_number) + 1}))
+    for number, driver_laps in laps.groupby('DriverNumber'):
+        number = str(number)
+        stint_index = -1
+        previous_stint = None
+        for _, lap in driver_laps.sort_values('LapNumber').iterrows():
+            lap_number = int(lap['LapNumber'])
+            tyre_life = int(lap['TyreLife']) if pd.notna(lap['TyreLife']) else lap_number
+            if lap['Stint'] != previous_stint:
+                previous_stint = lap['Stint']
+                stint_index += 1
+                messages.append((lap['LapStartTime'], 'TimingAppData', {'Lines': {number: {'Stints': {
+                    str(stint_index): {'Compound': lap['Compound'], 'New': str(bool(lap['FreshTyre'])).lower(),
+                                       'StartLaps': tyre_life - 1, 'TotalLaps': tyre_life - 1}}}}}))
+            gap = (lap['Time'] - leader_times[lap['LapNumber']]).total_seconds()
+            line = {'NumberOfLaps': lap_number, 'GapToLeader': f'LAP {lap_number}' if gap == 0 else f'+{gap:.3f}'}
+            if pd.notna(lap['Position']):
+                line['Position'] = str(int(lap['Position']))
+            messages.append((lap['Time'], 'TimingAppData',
+                             {'Lines': {number: {'Stints': {str(stint_index): {'TotalLaps': tyre_life}}}}}))
+            messages.append((lap['Time'], 'TimingData', {'Lines': {number: line}}))
+    messages.sort(key=lambda entry: entry[0])
+    with open(path, 'w') as file:
+        for session_time, topic, message in messages:
+            file.write(str([topic, message, _timestamp(session.t0_date + session_time)]) + '\n')
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay a live timing recording into live updating charts')
+    parser.add_argument('recording')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay speed factor, 0 for as fast as possible')
+    parser.add_argument('--interval', type=float, default=UPDATE_INTERVAL, help='seconds of session time per update')
+    parser.add_argument('--output', help='save the last frame to this file')
+    parser.add_argument('--headless', action='store_true')
+    args = parser.parse_args()
+
+    if args.headless:
+        analysis.set_headless(True)
+    stats = replay(args.recording, args.speed or None, args.interval, args.output)
+    print(f"{stats.messages} messages, {stats.updates} updates: mean {stats.mean_ms:.1f} ms, "
+          f"p95 {stats.p95_ms:.1f} ms, max {stats.max_ms:.1f} ms per update")
@@ -0,0 +1,593 @@
+import functools
+import json
+import os
+import zlib
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from fastf1.core import Laps, Session, SessionResults, Telemetry
+from fastf1.events import Event
+from fastf1.mvapi import CircuitInfo
+
+# Vehicle model of the synthetic cars: top speed in m/s, braking and traction in m/s², the lateral grip in m/s²
+# of a slow corner and the grip that downforce adds at top speed
+TOP_SPEED = 330 / 3.6
+BRAKING = 40.0
+TRACTION = 14.0
+MECHANICAL_GRIP = 20.0
+AERO_GRIP = 40.0
+
+# Speed in km/h at which each gear (1 to 8) is engaged and the RPM range covered within a gear
+GEAR_SPEEDS = np.array([0, 80, 115, 150, 185, 220, 255, 290, 350])
+RPM_RANGE = (9500, 11800)
+
+# Sample rates in Hz of the car data and the position data, close to those of the F1 live timing
+CAR_RATE = 3.7
+POS_RATE = 4.0
+
+# Pace offset and degradation per lap of every compound, as fractions of the lap time
+COMPOUNDS = {'SOFT': (0.0, 0.0009), 'MEDIUM': (0.004, 0.0005), 'HARD': (0.008, 0.0003)}
+
+# Lap time lost through the fuel load at the start of a race, as a fraction of the lap time
+FUEL_EFFECT = 0.03
+
+# Seconds lost on the in lap and on the out lap of a pit stop
+PIT_LOSS = (6.0, 16.0)
+
+# Seconds into the session data at which a session starts, as in the F1 live timing
+SESSION_START = 3600.0
+
+# Points for the top ten of a race
+POINTS = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+
+# Session identifiers accepted besides the full session names
+SESSION_NAMES = {'R': 'Race', 'Q': 'Qualifying', 'FP1': 'Practice 1', 'FP2': 'Practice 2', 'FP3': 'Practice 3'}
+
+# Drivers of the synthetic grid from the fastest to the slowest: number, abbreviation, first name, last name, team.
+# Bigger grids add made up drivers to the same teams
+GRID = (
+    ('1', 'VER', 'Max', 'Verstappen', 'Red Bull Racing'),
+    ('16', 'LEC', 'Charles', 'Leclerc', 'Ferrari'),
+    ('4', 'NOR', 'Lando', 'Norris', 'McLaren'),
+    ('55', 'SAI', 'Carlos', 'Sainz', 'Ferrari'),
+    ('11', 'PER', 'Sergio', 'Perez', 'Red Bull Racing'),
+    ('81', 'PIA', 'Oscar', 'Piastri', 'McLaren'),
+    ('63', 'RUS', 'George', 'Russell', 'Mercedes'),
+    ('44', 'HAM', 'Lewis', 'Hamilton', 'Mercedes'),
+    ('14', 'ALO', 'Fernando', 'Alonso', 'Aston Martin'),
+    ('22', 'TSU', 'Yuki', 'Tsunoda', 'RB'),
+    ('18', 'STR', 'Lance', 'Stroll', 'Aston Martin'),
+    ('27', 'HUL', 'Nico', 'Hulkenberg', 'Haas F1 Team'),
+    ('3', 'RIC', 'Daniel', 'Ricciardo', 'RB'),
+    ('23', 'ALB', 'Alexander', 'Albon', 'Williams'),
+    ('10', 'GAS', 'Pierre', 'Gasly', 'Alpine'),
+    ('31', 'OCO', 'Esteban', 'Ocon', 'Alpine'),
+    ('20', 'MAG', 'Kevin', 'Magnussen', 'Haas F1 Team'),
+    ('77', 'BOT', 'Valtteri', 'Bottas', 'Kick Sauber'),
+    ('24', 'ZHO', 'Guanyu', 'Zhou', 'Kick Sauber'),
+    ('2', 'SAR', 'Logan', 'Sargeant', 'Williams'),
+)
+
+# Events of a synthetic season in the order of their rounds, by the name of the event without 'Grand Prix'
+CALENDAR = ('bahrain', 'saudi arabian', 'australian', 'japanese', 'chinese', 'miami', 'emilia romagna', 'monaco',
+            'canadian', 'spanish', 'austrian', 'british', 'hungarian', 'belgian', 'dutch', 'italian', 'azerbaijan',
+            'singapore', 'united states', 'mexico city', 'são paulo', 'las vegas', 'qatar', 'abu dhabi')
+
+# Centre line of a synthetic circuit sampled every metre, with the speed, time, throttle and brake of a flying lap
+# and of a lap from a standing start at every metre
+Track = namedtuple('Track', ['length', 'x', 'y', 'speed', 'time', 'throttle', 'brake',
+                             'launch_speed', 'launch_time', 'launch_throttle', 'launch_brake'])
+
+
+# Function to get a seed that stays the same for the same inputs across processes
+def _seed(*parts):
+    return [zlib.crc32(str(part).encode()) for part in parts]
+
+
+# Function to get the fastest speed at every metre of a lap given the corner speeds, from a standing start or
+# as a flying lap. The flying lap is run twice so the speed at the finish line carries over to the start
+def _speed_profile(limit, standing_start=False):
+    laps = 1 if standing_start else 2
+    limit = np.tile(limit, laps)
+    speed = np.empty(len(limit))
+    speed[0] = 0.0 if standing_start else limit[0]
+    for i in range(1, len(limit)):
+        traction = TRACTION * (1 - speed[i - 1] / TOP_SPEED) + 1.0
+        speed[i] = min(limit[i], np.sqrt(speed[i - 1] ** 2 + 2 * traction))
+    for i in range(len(limit) - 2, -1, -1):
+        speed[i] = min(speed[i], np.sqrt(speed[i + 1] ** 2 + 2 * BRAKING))
+    return speed[-len(limit) // laps:]
+
+
+# Function to get the time at every metre, the throttle and the brake of a speed profile
+def _pedals(speed):
+    step = np.diff(speed, append=speed[-1])
+    time = np.concatenate([[0.0], np.cumsum(2 / (speed[1:] + speed[:-1]))])
+    accelerating = (step > 0.01) | (speed >= TOP_SPEED - 0.1)
+    braking = step < -0.01
+    # Between the pedals the car is held at the limit of a corner with part throttle
+    throttle = np.where(accelerating, 100.0, np.where(braking, 0.0, 40.0 + 50.0 * speed / TOP_SPEED))
+    return time, throttle, braking
+
+
+# Function to create a closed circuit with a few slow chicanes from a random generator
+def _track(rng):
+    length = rng.uniform(4300, 6000)
+    theta = np.linspace(0, 2 * np.pi, 20000, endpoint=False)
+    radius = np.ones_like(theta)
+    for harmonic in range(2, 10):
+        radius += rng.uniform(0.02, 0.35 / harmonic ** 0.8) * np.cos(harmonic * theta + rng.uniform(0, 2 * np.pi))
+    for centre in rng.uniform(0, 2 * np.pi, rng.integers(4, 8)):
+        radius -= rng.uniform(0.03, 0.10) * np.exp(-(np.angle(np.exp(1j * (theta - centre))) / 0.03) ** 2)
+    radius = np.maximum(radius, 0.3)
+    x = radius * np.cos(theta)
+    y = radius * np.sin(theta)
+
+    # Resample the outline to one point per metre of the wanted length
+    steps = np.hypot(np.diff(x, append=x[0]), np.diff(y, append=y[0]))
+    scale = length / steps.sum()
+    along = np.concatenate([[0], np.cumsum(steps)[:-1]]) * scale
+    distance = np.arange(0, length, 1.0)
+    x = np.interp(distance, along, x * scale, period=length)
+    y = np.interp(distance, along, y * scale, period=length)
+
+    # Corner speeds follow from the curvature, downforce adds grip with the square of the speed
+    dx, dy = (np.roll(x, -1) - np.roll(x, 1)) / 2, (np.roll(y, -1) - np.roll(y, 1)) / 2
+    ddx, ddy = np.roll(x, -1) - 2 * x + np.roll(x, 1), np.roll(y, -1) - 2 * y + np.roll(y, 1)
+    curvature = np.abs(dx * ddy - dy * ddx) / np.maximum((dx * dx + dy * dy) ** 1.5, 1e-9)
+    curvature = np.convolve(np.concatenate([curvature[-10:], curvature, curvature[:10]]), np.ones(21) / 21, 'valid')
+    aero = AERO_GRIP / TOP_SPEED ** 2
+    limit = np.minimum(np.sqrt(MECHANICAL_GRIP / np.maximum(curvature - aero, 1e-9)), TOP_SPEED)
+
+    speed = _speed_profile(limit)
+    launch_speed = _speed_profile(limit, standing_start=True)
+    return Track(len(distance), x, y, speed, *_pedals(speed), launch_speed, *_pedals(launch_speed))
+
+
+# Function to create the corners, marshal lights and marshal sectors of a track in the format of FastF1
+def _circuit_info(track, rng):
+    speed = track.speed
+    slowest = np.flatnonzero((speed <= np.roll(speed, 1)) & (speed < np.roll(speed, -1)) & (speed < 0.85 * TOP_SPEED))
+    # Minima closer than 150 m belong to the same corner
+    corners = []
+    for index in slowest:
+        if corners and index - corners[-1] < 150:
+            if speed[index] < speed[corners[-1]]:
+                corners[-1] = index
+        else:
+            corners.append(index)
+    heading = np.arctan2(np.roll(track.y, -1) - track.y, np.roll(track.x, -1) - track.x)
+
+    def markers(indices):
+        indices = np.asarray(indices, dtype=int)
+        return pd.DataFrame({'X': track.x[indices] * 10, 'Y': track.y[indices] * 10,
+                             'Number': np.arange(1, len(indices) + 1), 'Letter': '',
+                             'Angle': np.degrees(heading[indices] + np.pi / 2) % 360,
+                             'Distance': indices.astype(float)})
+
+    return CircuitInfo(corners=markers(corners),
+                       marshal_lights=markers(np.linspace(0, track.length, 25, endpoint=False)),
+                       marshal_sectors=markers(np.linspace(0, track.length, 20, endpoint=False)),
+                       rotation=float(rng.integers(0, 360)))
+
+
+# Function to create the event of a synthetic race weekend, shaped like the events of the FastF1 schedule
+def _event(year, event_name):
+    name = str(event_name)
+    if not name.endswith('Grand Prix'):
+        name = f'{name} Grand Prix'
+    location = name[:-len(' Grand Prix')]
+    if location.lower() in CALENDAR:
+        round_number = CALENDAR.index(location.lower()) + 1
+    else:
+        # Other events come after the calendar, the full checksum of the name keeps their rounds apart
+        round_number = len(CALENDAR) + 1 + zlib.crc32(name.encode())
+    race_day = pd.Timestamp(year, 3, 3) + pd.Timedelta(weeks=(round_number - 1) % 40)
+    sessions = (('Practice 1', -2, 11.5), ('Practice 2', -2, 15), ('Practice 3', -1, 11.5), ('Qualifying', -1, 15),
+                ('Race', 0, 15))
+    data = {'RoundNumber': round_number, 'Country': 'Synthetic', 'Location': location,
+            'OfficialEventName': f'Synthetic {name}', 'EventDate': race_day, 'EventName': f'Synthetic {name}',
+            'EventFormat': 'conventional', 'F1ApiSupport': False}
+    for number, (session_name, day, hour) in enumerate(sessions, start=1):
+        date = race_day + pd.Timedelta(days=day, hours=hour)
+        data[f'Session{number}'] = session_name
+        data[f'Session{number}Date'] = date.tz_localize('UTC')
+        data[f'Session{number}DateUtc'] = date
+    return Event(data, year=year)
+
+
+# Function to get the drivers of a grid of any size, each row is number, abbreviation, first name, last name, team
+def _drivers(count):
+    drivers = list(GRID[:count])
+    for extra in range(len(GRID), count):
+        drivers.append((str(100 + extra), f'S{extra:02d}', 'Synthetic', f'Driver {extra}', GRID[extra % len(GRID)][4]))
+    return drivers
+
+
+# Synthetic stand-in for a FastF1 session. It is created unloaded like fastf1.get_session() and load() generates
+# results, laps, car and position data, weather, messages and circuit info that only depend on the seed
+class SyntheticSession(Session):
+
+    def __init__(self, year, event_name, ses, seed=0, drivers=20, laps=None, car_rate=CAR_RATE, pos_rate=POS_RATE):
+        super().__init__(_event(year, event_name), SESSION_NAMES.get(str(ses), str(ses)))
+        if self.name not in ('Race', 'Qualifying', 'Practice 1', 'Practice 2', 'Practice 3'):
+            raise ValueError(f"Synthetic sessions can not be of type '{ses}'")
+        self.seed = seed
+        self.num_drivers = drivers
+        self.car_rate = car_rate
+        self.pos_rate = pos_rate
+        event_seed = _seed(seed, year, self.event['EventName'])
+        self._track_data = _track(np.random.default_rng(event_seed + [0]))
+        # Duration in seconds of a flying lap at full pace, handy to pick sample rates for a number of samples per lap
+        self.flying_lap_time = float(self._track_data.time[-1])
+        self._synthetic_circuit_info = _circuit_info(self._track_data, np.random.default_rng(event_seed + [1]))
+        # The pace of the cars belongs to the weekend, so all sessions of an event agree on it
+        self._pace = (1 + np.linspace(0, 0.02, drivers)
+                      + np.random.default_rng(event_seed + [2]).normal(0, 0.002, drivers))
+        self._session_seed = event_seed + _seed(self.name)
+        if laps is None:
+            laps = int(np.ceil(305000 / self._track_data.length))
+        self.num_laps = laps
+
+    # Function to generate the data of the session, with the same flags as Session.load()
+    def load(self, *, laps=True, telemetry=True, weather=True, messages=True, livedata=None):
+        rng = np.random.default_rng(self._session_seed + [0])
+        drivers = _drivers(self.num_drivers)
+        if self.name == 'Race':
+            timeline, grid = self._race_timeline(rng)
+        else:
+            timeline, grid = self._runs_timeline(rng), None
+        timeline['Time'] = timeline['LapStartTime'] + timeline['Duration']
+        end = timeline['Time'].max()
+
+        self._t0_date = self.date - pd.Timedelta(seconds=SESSION_START)
+        self._session_start_time = pd.Timedelta(seconds=SESSION_START)
+        self._total_laps = self.num_laps if self.name == 'Race' else None
+        self._session_info = self._info()
+        self._session_status = self._status(timeline, end)
+        self._track_status = pd.DataFrame({'Time': [pd.Timedelta(0)], 'Status': ['1'], 'Message': ['AllClear']})
+        lap_table = self._laps_table(timeline, drivers)
+        self._results = self._results_table(lap_table, drivers, grid)
+        if laps:
+            self._laps = Laps(lap_table[list(Laps._COL_TYPES)], session=self)
+        if telemetry:
+            # As in the live timing, the samples of all cars share the same timestamps
+            clock_rng = np.random.default_rng(self._session_seed + [1])
+            clocks = []
+            for rate in (self.car_rate, self.pos_rate):
+                clock = np.arange(timeline['LapStartTime'].min() - 60, end + 60, 1 / rate)
+                clocks.append(clock + clock_rng.uniform(0, 0.2 / rate, len(clock)))
+            self._car_data, self._pos_data = {}, {}
+            for index, (number, *_) in enumerate(drivers):
+                driver_laps = timeline.loc[timeline['Driver'] == index]
+                self._car_data[number], self._pos_data[number] = self._telemetry(driver_laps, number, index, *clocks)
+        if weather:
+            minutes = np.arange(0, end / 60 + 1)
+            self._weather_data = pd.DataFrame({
+                'Time': pd.to_timedelta(minutes, unit='min'), 'AirTemp': 25 + 0.01 * minutes,
+                'Humidity': 45.0, 'Pressure': 1010.0, 'Rainfall': False, 'TrackTemp': 38 + 0.02 * minutes,
+                'WindDirection': 180, 'WindSpeed': 1.5})
+        if messages:
+            self._race_control_messages = pd.DataFrame({
+                'Time': [self._t0_date + pd.Timedelta(seconds=SESSION_START - 600), self._t0_date + pd.Timedelta(
+                    seconds=end)], 'Category': ['Flag', 'Flag'], 'Message': ['GREEN LIGHT - PIT EXIT OPEN',
+                                                                             'CHEQUERED FLAG'],
+                'Status': None, 'Flag': ['GREEN', 'CHEQUERED'], 'Scope': ['Track', 'Track'], 'Sector': np.nan,
+                'RacingNumber': None, 'Lap': [1, self.num_laps if self.name == 'Race' else 1]})
+
+    # Function to get the circuit info, the corner distances are already known from the track
+    def get_circuit_info(self):
+        # FastF1 measures the marker distances along the position data of the fastest lap, which fails the same
+        # way when the session was loaded without telemetry
+        self.laps.pick_fastest().get_pos_data()
+        return self._synthetic_circuit_info
+
+    # Function to plan every lap of a race: one or two pit stops, compounds, tyre wear and the fuel load
+    def _race_timeline(self, rng):
+        count, laps = self.num_drivers, self.num_laps
+        grid = np.argsort(np.argsort(self._pace + rng.normal(0, 0.002, count))) + 1
+        if rng.random() < 0.3:
+            # Now and then the last car starts from the pit lane
+            grid[np.argmax(grid)] = 0
+        lap_number = np.arange(1, laps + 1)
+        rows = []
+        for driver in range(count):
+            candidates = np.arange(max(laps // 4, 1), min(3 * laps // 4, laps - 1) + 1)
+            stops = np.sort(rng.choice(candidates, min(rng.integers(1, 3), len(candidates)), replace=False))
+            stint = 1 + np.searchsorted(stops, lap_number, side='left')
+            compounds = [rng.choice(['SOFT', 'MEDIUM'])]
+            for _ in stops:
+                compounds.append(rng.choice([compound for compound in ('MEDIUM', 'HARD') if compound != compounds[-1]]))
+            compound = np.array(compounds)[stint - 1]
+            stint_start = np.concatenate([[1], stops + 1])[stint - 1]
+            tyre_life = lap_number - stint_start + np.where(stint == 1, 3, 1)
+            offset = np.array([COMPOUNDS[name][0] for name in compound])
+            wear = np.array([COMPOUNDS[name][1] for name in compound])
+            factor = self._pace[driver] * (1 + offset + wear * tyre_life + FUEL_EFFECT * (1 - lap_number / laps)
+                                           + rng.normal(0, 0.0015, laps))
+            duration = factor * self._track_data.time[-1]
+            duration[0] = factor[0] * self._track_data.launch_time[-1] + 0.25 * max(grid[driver] - 1, 0)
+            pit_in = np.isin(lap_number, stops)
+            pit_out = np.isin(lap_number, stops + 1)
+            duration += pit_in * PIT_LOSS[0] + pit_out * PIT_LOSS[1] + (grid[driver] == 0) * PIT_LOSS[1] * (
+                lap_number == 1)
+            start = SESSION_START + np.concatenate([[0], np.cumsum(duration)[:-1]])
+            rows.append(pd.DataFrame({'Driver': driver, 'LapNumber': lap_number, 'LapStartTime': start,
+                                      'Duration': duration, 'Launch': lap_number == 1, 'Stint': stint,
+                                      'Compound': compound, 'TyreLife': tyre_life, 'FreshTyre': stint > 1,
+                                      'PitIn': pit_in, 'PitOut': pit_out, 'Timed': ~(pit_in | pit_out),
+                                      'DRS': lap_number >= 3}))
+        return pd.concat(rows, ignore_index=True), grid
+
+    # Function to plan the runs of a qualifying or practice session. Every run is an out lap, one or more timed
+    # laps and an in lap. In qualifying the slowest cars drop out after Q1 and Q2
+    def _runs_timeline(self, rng):
+        count = self.num_drivers
+        if self.name == 'Qualifying':
+            segments = ((0, 18 * 60, count), (25 * 60, 15 * 60, max(min(count, 10), count - 5)),
+                        (48 * 60, 12 * 60, min(count, 10)))
+            runs, timed_laps = 2, 1
+        else:
+            segments = ((0, 60 * 60, count),)
+            runs, timed_laps = 3, 3
+        flying = self._track_data.time[-1]
+        rows = []
+        next_lap = np.ones(count, dtype=int)
+        running = np.arange(count)
+        for segment, (start, length, participants) in enumerate(segments):
+            start += SESSION_START
+            if participants < len(running):
+                # Rank the cars that are still running by their best timed lap so far
+                timed = pd.concat(rows, ignore_index=True)
+                timed = timed.loc[timed['Timed'] & timed['Driver'].isin(running)]
+                best = timed.assign(LapTime=timed['Duration']).groupby('Driver')['LapTime'].min()
+                running = best.sort_values().index[:participants].to_numpy()
+            for driver in running:
+                for run in range(runs):
+                    window = length / runs
+                    run_start = start + run * window + rng.uniform(0, max(window - (timed_laps + 2) * flying * 1.5,
+                                                                          1))
+                    factor = np.concatenate([[1.4], self._pace[driver] * (1 - 0.002 * run + rng.normal(0, 0.002,
+                                                                                                       timed_laps)),
+                                             [1.5]])
+                    duration = factor * flying
+                    laps = len(factor)
+                    rows.append(pd.DataFrame({
+                        'Driver': driver, 'LapNumber': next_lap[driver] + np.arange(laps),
+                        'LapStartTime': run_start + np.concatenate([[0], np.cumsum(duration)[:-1]]),
+                        'Duration': duration, 'Launch': False, 'Stint': segment * runs + run + 1,
+                        'Compound': 'SOFT' if self.name == 'Qualifying' else rng.choice(list(COMPOUNDS)),
+                        'TyreLife': np.arange(1, laps + 1), 'FreshTyre': True,
+                        'PitIn': np.arange(laps) == laps - 1, 'PitOut': np.arange(laps) == 0,
+                        'Timed': (np.arange(laps) > 0) & (np.arange(laps) < laps - 1), 'DRS': True}))
+                    next_lap[driver] += laps
+        return pd.concat(rows, ignore_index=True)
+
+    # Function to turn the planned laps into a lap table with the columns of FastF1
+    def _laps_table(self, timeline, drivers):
+        track = self._track_data
+        launch = timeline['Launch'].to_numpy()
+        time = np.where(launch[:, None], track.launch_time[None, [track.length // 3, 2 * track.length // 3, -1]],
+                        track.time[None, [track.length // 3, 2 * track.length // 3, -1]])
+        speed = np.where(launch[:, None], track.launch_speed[None, [int(track.length * 0.3), int(track.length * 0.65),
+                                                                    -1]],
+                         track.speed[None, [int(track.length * 0.3), int(track.length * 0.65), -1]])
+        factor = (timeline['Duration'] / time[:, 2]).to_numpy()
+        start = timeline['LapStartTime'].to_numpy()
+        end = timeline['Time'].to_numpy()
+        sector_end = np.column_stack([start + time[:, 0] * factor, start + time[:, 1] * factor, end])
+        lap_time = pd.to_timedelta(timeline['Duration'], unit='s')
+        if self.name != 'Race':
+            # Out laps start in the pit lane and are not timed
+            lap_time = lap_time.where(~timeline['PitOut'])
+        info = pd.DataFrame(drivers, columns=['DriverNumber', 'Abbreviation', 'FirstName', 'LastName', 'TeamName'])
+        driver = info.loc[timeline['Driver']].reset_index(drop=True)
+
+        table = pd.DataFrame({
+            'Time': pd.to_timedelta(end, unit='s'), 'Driver': driver['Abbreviation'],
+            'DriverNumber': driver['DriverNumber'], 'LapTime': lap_time,
+            'LapNumber': timeline['LapNumber'].astype(float), 'Stint': timeline['Stint'].astype(float),
+            'PitOutTime': pd.to_timedelta(np.where(timeline['PitOut'], start, np.nan), unit='s'),
+            'PitInTime': pd.to_timedelta(np.where(timeline['PitIn'], end, np.nan), unit='s'),
+            'Sector1Time': pd.to_timedelta(sector_end[:, 0] - start, unit='s'),
+            'Sector2Time': pd.to_timedelta(sector_end[:, 1] - sector_end[:, 0], unit='s'),
+            'Sector3Time': pd.to_timedelta(sector_end[:, 2] - sector_end[:, 1], unit='s'),
+            'Sector1SessionTime': pd.to_timedelta(sector_end[:, 0], unit='s'),
+            'Sector2SessionTime': pd.to_timedelta(sector_end[:, 1], unit='s'),
+            'Sector3SessionTime': pd.to_timedelta(sector_end[:, 2], unit='s'),
+            'SpeedI1': speed[:, 0] * 3.6 / factor, 'SpeedI2': speed[:, 1] * 3.6 / factor,
+            'SpeedFL': speed[:, 2] * 3.6 / factor, 'SpeedST': track.speed.max() * 3.6 / factor,
+            'Compound': timeline['Compound'], 'TyreLife': timeline['TyreLife'].astype(float),
+            'FreshTyre': timeline['FreshTyre'], 'Team': driver['TeamName'],
+            'LapStartTime': pd.to_timedelta(start, unit='s'), 'TrackStatus': '1', 'Deleted': False,
+            'DeletedReason': '', 'FastF1Generated': False, 'IsAccurate': timeline['Timed'] & ~launch})
+        table['LapStartDate'] = self._t0_date + table['LapStartTime']
+
+        # A lap is a personal best when it beats every earlier timed lap of the driver
+        timed_time = table['LapTime'].where(timeline['Timed'])
+        best_before = timed_time.groupby(table['DriverNumber']).transform(lambda times: times.cummin().shift())
+        table['IsPersonalBest'] = timed_time.notna() & ~(timed_time >= best_before)
+        if self.name == 'Race':
+            table['Position'] = table.groupby('LapNumber')['Time'].rank(method='first')
+        else:
+            table['Position'] = np.nan
+        return table.sort_values(['DriverNumber', 'LapNumber'], key=None).reset_index(drop=True)
+
+    # Function to create the classification of the session with the columns of FastF1
+    def _results_table(self, lap_table, drivers, grid):
+        info = pd.DataFrame(drivers, columns=['DriverNumber', 'Abbreviation', 'FirstName', 'LastName', 'TeamName'])
+        results = info.assign(BroadcastName=info['FirstName'].str[0] + ' ' + info['LastName'].str.upper(),
+                              DriverId=info['LastName'].str.lower().str.replace(' ', '_'),
+                              TeamColor='', TeamId=info['TeamName'].str.lower().str.replace(' ', '_'),
+                              FullName=info['FirstName'] + ' ' + info['LastName'], HeadshotUrl='', CountryCode='')
+        results = results.set_index(info['DriverNumber'].rename(None))
+        results[['Q1', 'Q2', 'Q3']] = pd.NaT
+        if self.name == 'Race':
+            last_laps = lap_table.loc[lap_table['LapNumber'] == lap_table['LapNumber'].max()]
+            last_laps = last_laps.set_index('DriverNumber')
+            results['Position'] = last_laps['Position']
+            results['GridPosition'] = pd.Series(grid.astype(float), index=results.index)
+            finish = last_laps['Time']
+            results['Time'] = (finish - finish.min()).where(finish > finish.min(), finish - self._session_start_time)
+            results['Status'] = 'Finished'
+            results['Points'] = [POINTS[int(position) - 1] if position <= len(POINTS) else 0
+                                 for position in results['Position']]
+        else:
+            timed = lap_table.dropna(subset=['LapTime'])
+            if self.name == 'Qualifying':
+                # Segments follow from the session time, cars are classified by the last segment they reached
+                boundaries = SESSION_START + np.array([20 * 60, 44 * 60])
+                segment = np.searchsorted(boundaries, timed['LapStartTime'].dt.total_seconds())
+                for number, column in enumerate(('Q1', 'Q2', 'Q3')):
+                    results[column] = timed.loc[segment == number].groupby('DriverNumber')['LapTime'].min()
+                order = results.sort_values(['Q3', 'Q2', 'Q1'], na_position='last').index
+            else:
+                order = timed.groupby('DriverNumber')['LapTime'].min().sort_values().index
+            results['Position'] = pd.Series(np.arange(1, len(order) + 1, dtype=float), index=order)
+            results['GridPosition'] = np.nan
+            results['Time'] = pd.NaT
+            results['Status'] = ''
+            results['Points'] = np.nan
+        results['ClassifiedPosition'] = results['Position'].astype(int).astype(str)
+        return SessionResults(results.sort_values('Position')[list(SessionResults._COL_TYPES)])
+
+    # Function to create the car data and the position data of one driver over the whole session
+    def _telemetry(self, driver_laps, number, index, car_clock, pos_clock):
+        rng = np.random.default_rng(self._session_seed + [2, index])
+        track = self._track_data
+        starts = driver_laps['LapStartTime'].to_numpy()
+        ends = driver_laps['Time'].to_numpy()
+        launch = driver_laps['Launch'].to_numpy()
+        factor = driver_laps['Duration'].to_numpy() / np.where(launch, track.launch_time[-1], track.time[-1])
+        drs_lap = driver_laps['DRS'].to_numpy()
+
+        def sample(session_time):
+            lap = np.clip(np.searchsorted(starts, session_time, side='right') - 1, 0, None)
+            on_lap = (session_time >= starts[lap]) & (session_time < ends[lap])
+            base_time = (session_time - starts[lap]) / factor[lap]
+            on_launch = on_lap & launch[lap]
+            metre = np.where(on_launch, np.searchsorted(track.launch_time, base_time),
+                             np.searchsorted(track.time, base_time))
+            metre = np.where(on_lap, np.clip(metre, 0, track.length - 1), 0)
+            return session_time, lap, on_lap, on_launch, metre
+
+        session_time, lap, on_lap, on_launch, metre = sample(car_clock)
+        speed = np.where(on_launch, track.launch_speed[metre], track.speed[metre]) * 3.6 / factor[lap]
+        speed = np.where(on_lap, np.maximum(speed + rng.normal(0, 0.5, len(speed)), 0), 0.0)
+        throttle = np.where(on_launch, track.launch_throttle[metre], track.throttle[metre]) * on_lap
+        brake = np.where(on_launch, track.launch_brake[metre], track.brake[metre]) & on_lap
+        gear = np.clip(np.searchsorted(GEAR_SPEEDS, speed, side='right'), 1, 8)
+        low, high = GEAR_SPEEDS[gear - 1], GEAR_SPEEDS[gear]
+        rpm = (RPM_RANGE[0] + (RPM_RANGE[1] - RPM_RANGE[0]) * (speed - low) / (high - low)) * on_lap
+        gear = gear * on_lap
+        drs = np.where(on_lap & drs_lap[lap] & (speed > 285) & (throttle == 100), 12, 0)
+        car_data = Telemetry({
+            'Date': self._t0_date + pd.to_timedelta(session_time, unit='s'), 'RPM': rpm.round(), 'Speed': speed.round(),
+            'nGear': gear, 'Throttle': throttle.round(), 'Brake': brake, 'DRS': drs, 'Source': 'car',
+            'Time': pd.to_timedelta(session_time - session_time[0], unit='s'),
+            'SessionTime': pd.to_timedelta(session_time, unit='s')}, session=self, driver=number)
+
+        session_time, lap, on_lap, on_launch, metre = sample(pos_clock)
+        pos_data = Telemetry({
+            'Date': self._t0_date + pd.to_timedelta(session_time, unit='s'), 'Status': np.where(
+                on_lap, 'OnTrack', 'OffTrack'), 'X': (track.x[metre] * 10).round(), 'Y': (track.y[metre] * 10).round(),
+            'Z': 0.0, 'Source': 'pos', 'Time': pd.to_timedelta(session_time - session_time[0], unit='s'),
+            'SessionTime': pd.to_timedelta(session_time, unit='s')}, session=self, driver=number)
+        return car_data, pos_data
+
+    # Function to create the session info of the live timing
+    def _info(self):
+        name = self.event['EventName']
+        return {'Meeting': {'Key': self.event['RoundNumber'], 'Name': name, 'OfficialName': name,
+                            'Location': self.event['Location'],
+                            'Country': {'Key': 0, 'Code': 'SYN', 'Name': 'Synthetic'},
+                            'Circuit': {'Key': 1000 + _seed(name, self.seed)[0] % 1000,
+                                        'ShortName': f'{name} {self.seed}'}},
+                'ArchiveStatus': {'Status': 'Generated'}, 'Key': 0, 'Type': self.name.split()[0],
+                'Name': self.name, 'StartDate': self.date, 'EndDate': self.date + pd.Timedelta(hours=2),
+                'GmtOffset': pd.Timedelta(0), 'Path': self.api_path}
+
+    # Function to create the session status, in qualifying every segment is started and finished
+    def _status(self, timeline, end):
+        if self.name == 'Qualifying':
+            times = SESSION_START + np.array([0, 18, 25, 40, 48, 60]) * 60
+            statuses = ['Started', 'Finished'] * 3
+        else:
+            times = [SESSION_START, end]
+            statuses = ['Started', 'Finished']
+        times = list(times) + [max(end, times[-1]) + 300, max(end, times[-1]) + 600]
+        return pd.DataFrame({'Time': pd.to_timedelta(times, unit='s'), 'Status': statuses + ['Finalised', 'Ends']})
+
+
+# Function to create an unloaded synthetic session, same arguments as fastf1.get_session() plus the knobs
+def get_session(year, event_name, ses, seed=0, drivers=20, laps=None, car_rate=CAR_RATE, pos_rate=POS_RATE):
+    return SyntheticSession(year, event_name, ses, seed, drivers, laps, car_rate, pos_rate)
+
+
+# Function to create a session backend with fixed knobs for f1_telemetry_analysis.set_session_backend(). Its cache key
+# gives the sessions of every combination of knobs their own directory in the telemetry store
+def session_backend(seed=0, drivers=20, laps=None, car_rate=CAR_RATE, pos_rate=POS_RATE):
+    backend = functools.partial(get_session, seed=seed, drivers=drivers, laps=laps, car_rate=car_rate,
+                                pos_rate=pos_rate)
+    backend.cache_key = f"synthetic_seed{seed}_{drivers}drivers_{laps or 'auto'}laps_{car_rate}_{pos_rate}hz"
+    return backend
+
+
+# Function to write the Ergast history of synthetic seasons as fixtures for f1_telemetry_analysis.set_ergast_fixtures():
+# race results with the grid and qualifying of every round, shaped like the raw JSON Ergast returns
+def write_ergast_fixtures(directory, seasons, seed=0, rounds=24, drivers=20):
+    os.makedirs(directory, exist_ok=True)
+    grid = _drivers(drivers)
+    entries = [({'driverId': last_name.lower().replace(' ', '_'), 'permanentNumber': number, 'code': abbreviation,
+                 'givenName': first_name, 'familyName': last_name},
+                {'constructorId': team.lower().replace(' ', '_'), 'name': team})
+               for number, abbreviation, first_name, last_name, team in grid]
+    for season in seasons:
+        results = []
+        qualifying = []
+        for round_number in range(1, rounds + 1):
+            rng = np.random.default_rng(_seed(seed, season, round_number, 'ergast'))
+            race = {'season': str(season), 'round': str(round_number),
+                    'raceName': f'Synthetic Round {round_number} Grand Prix',
+                    'Circuit': {'circuitId': f'synthetic_{round_number}',
+                                'circuitName': f'Synthetic Circuit {round_number}'},
+                    'date': str((pd.Timestamp(season, 3, 3) + pd.Timedelta(weeks=round_number - 1)).date())}
+            # Qualifying follows the order of the grid with some noise, the race mixes the field up again
+            # and some cars retire or start from the pit lane
+            pace = np.arange(len(grid)) + rng.normal(0, 2.5, len(grid))
+            quali_order = np.argsort(pace, kind='stable')
+            lap_times = 90 + pace[quali_order] * 0.08 + rng.normal(0, 0.05, len(grid))
+            retired = rng.random(len(grid)) < 0.08
+            pit_lane = rng.random(len(grid)) < 0.02
+            finish_order = np.lexsort((pace + rng.normal(0, 3, len(grid)), retired))
+            grid_position = np.empty(len(grid), dtype=int)
+            grid_position[quali_order] = np.arange(1, len(grid) + 1)
+
+            quali_entries = []
+            for position, (index, lap_time) in enumerate(zip(quali_order, lap_times), start=1):
+                driver, constructor = entries[index]
+                entry = {'number': grid[index][0], 'position': str(position), 'Driver': driver,
+                         'Constructor': constructor}
+                for segment, cutoff in (('Q1', len(grid)), ('Q2', 15), ('Q3', 10)):
+                    if position <= cutoff:
+                        entry[segment] = f'{int(lap_time // 60)}:{lap_time % 60:06.3f}'
+                quali_entries.append(entry)
+            qualifying.append({**race, 'QualifyingResults': quali_entries})
+
+            race_entries = []
+            for position, index in enumerate(finish_order, start=1):
+                driver, constructor = entries[index]
+                race_entries.append({
+                    'number': grid[index][0], 'position': str(position),
+                    'positionText': 'R' if retired[index] else str(position),
+                    'points': str(POINTS[position - 1] if position <= len(POINTS) and not retired[index] else 0),
+                    'Driver': driver, 'Constructor': constructor,
+                    'grid': '0' if pit_lane[index] else str(grid_position[index]),
+                    'laps': str(int(rng.integers(1, 57)) if retired[index] else 57),
+                    'status': 'Retired' if retired[index] else 'Finished'})
+            results.append({**race, 'Results': race_entries})
+        for kind, races in (('results', results), ('qualifying', qualifying)):
+            with open(os.path.join(directory, f'{kind}_{season}.json'), 'w') as file:
+                json.dump(races, file)
+    return directory
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import matplotlib
+import pytest
+
+matplotlib.use('Agg')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import f1_telemetry_analysis as analysis  # noqa: E402
+import synthetic_session  # noqa: E402
+
+
+# Short synthetic sessions behind the session registry, with every cache in a fresh directory
+@pytest.fixture
+def synthetic(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis, 'CACHE_DIR', str(tmp_path))
+    analysis.set_headless(True)
+    analysis.set_session_backend(synthetic_session.session_backend(seed=0, laps=8))
+    analysis.clear_telemetry_cache()
+    yield analysis
+    analysis.set_session_backend()
+    analysis.clear_telemetry_cache()
+    analysis._circuit_geometries.clear()
+    analysis._circuit_metadata.clear()
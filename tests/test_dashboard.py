@@ -0,0 +1,10 @@
+import os
+
+
+def test_tiles_and_pdf_get_a_default_output(synthetic, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tiles = synthetic.compose_dashboard(2024, 'Bahrain', 'R', ['team_pace', 'position_changes'])
+    assert [os.path.basename(path) for path in tiles] == ['team_pace.png', 'position_changes.png']
+    assert os.path.dirname(tiles[0]) == 'dashboard_2024_Bahrain_R'
+    pdf = synthetic.compose_dashboard(2024, 'Bahrain', 'R', ['team_pace'], layout='pdf')
+    assert pdf == 'dashboard_2024_Bahrain_R.pdf' and os.path.getsize(pdf) > 0
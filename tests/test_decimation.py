@@ -0,0 +1,31 @@
+import numpy as np
+
+import f1_telemetry_analysis as analysis
+
+
+def test_every_column_keeps_its_extrema():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(0.5, 1.5, 20000))
+    y = np.sin(x / 300) * 100 + rng.normal(0, 5, len(x))
+    columns = 500
+    keep = analysis.decimate_trace(x, y, columns)
+    assert len(keep) <= 4 * columns
+    column = np.minimum(((x - x[0]) / (x[-1] - x[0]) * columns).astype(int), columns - 1)
+    for number in range(columns):
+        samples = np.flatnonzero(column == number)
+        kept = np.intersect1d(samples, keep)
+        assert y[kept].min() == y[samples].min() and y[kept].max() == y[samples].max()
+        assert samples[0] in kept and samples[-1] in kept
+
+
+def test_step_channels_keep_every_change():
+    x = np.arange(20000, dtype=float)
+    gear = np.repeat([3, 4, 5, 6, 5, 4, 3, 4], 2500)
+    keep = analysis.decimate_trace(x, gear, 100, step=True)
+    changes = np.flatnonzero(np.diff(gear))
+    assert np.isin(changes, keep).all() and np.isin(changes + 1, keep).all()
+
+
+def test_short_traces_are_not_decimated():
+    x = np.arange(100, dtype=float)
+    np.testing.assert_array_equal(analysis.decimate_trace(x, x, 100), np.arange(100))
@@ -0,0 +1,21 @@
+import matplotlib.pyplot as plt
+
+
+def test_headless_quali_results_keep_no_figures_open(synthetic, tmp_path):
+    plt.close('all')
+    assert synthetic.quali_results(2024, ['Bahrain', 'Monaco']) == [None, None]
+    assert plt.get_fignums() == []
+    outputs = synthetic.quali_results(2024, ['Bahrain'], output_dir=str(tmp_path))
+    assert outputs == [str(tmp_path / '2024_bahrain_quali.png')] and (tmp_path / '2024_bahrain_quali.png').exists()
+    assert plt.get_fignums() == []
+
+
+def test_minisector_map_finishes_its_own_figure(synthetic, tmp_path):
+    session = synthetic.get_session(2024, 'Bahrain', 'Q')
+    plt.close('all')
+    output = synthetic.compare_laps_visualization_on_map(session, ['VER', 'LEC'], output=str(tmp_path / 'map.png'))
+    assert output == str(tmp_path / 'map.png') and (tmp_path / 'map.png').exists()
+    assert plt.get_fignums() == []
+    fig, ax = plt.subplots()
+    assert synthetic.compare_laps_visualization_on_map(session, ['VER', 'LEC'], ax=ax) is ax
+    plt.close(fig)
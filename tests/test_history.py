@@ -0,0 +1,22 @@
+import synthetic_session
+
+
+def test_history_is_built_from_fixtures_and_cached_on_disk(synthetic, tmp_path):
+    fixtures = tmp_path / 'fixtures'
+    synthetic_session.write_ergast_fixtures(str(fixtures), [2019, 2020], rounds=6)
+    synthetic.set_ergast_fixtures(str(fixtures))
+    try:
+        results = synthetic.get_history([2019, 2020])
+        assert len(results) == 2 * 6 * 20
+        assert sorted(results.groupby('Season')['Round'].nunique().items()) == [(2019, 6), (2020, 6)]
+        qualifying = synthetic.get_history(2019, 'qualifying')
+        assert len(qualifying) == 6 * 20 and qualifying['Q1'].notna().all()
+
+        # Finished seasons are read back from the cache once the fixtures are gone
+        synthetic.set_ergast_fixtures(str(tmp_path / 'missing'))
+        cached = synthetic.get_history([2019, 2020])
+        assert cached.equals(results)
+        table = synthetic.average_positions_gained([2019, 2020], by='team')
+        assert table['Races'].sum() == results['GridPosition'].gt(0).sum()
+    finally:
+        synthetic.set_ergast_fixtures()
@@ -0,0 +1,23 @@
+import synthetic_session
+
+
+def _jobs(tmp_path):
+    return [
+        {'function': 'tyre_strategies', 'year': 2024, 'event': 'Monaco', 'output': str(tmp_path / 'tyres.png')},
+        {'function': 'team_pace_comparison', 'year': 2024, 'event': 'Monaco Grand Prix', 'session': 'Race',
+         'output': str(tmp_path / 'pace.png')},
+        {'function': 'compare_drivers', 'year': 2024, 'event': 'Monaco', 'session': 'Q', 'drivers': ['VER', 'LEC'],
+         'output': str(tmp_path / 'quali.png')},
+    ]
+
+
+def test_spellings_of_one_session_share_a_group(synthetic, tmp_path):
+    groups = synthetic.group_jobs(_jobs(tmp_path))
+    assert sorted(groups) == [(2024, 8, 'Qualifying'), (2024, 8, 'Race')]
+    assert [job['function'] for job in groups[(2024, 8, 'Race')]] == ['tyre_strategies', 'team_pace_comparison']
+
+
+def test_manifest_renders_every_job(synthetic, tmp_path):
+    backend = synthetic_session.session_backend(seed=0, laps=8)
+    outputs = synthetic.run_manifest(_jobs(tmp_path), max_workers=2, backend=backend)
+    assert outputs == [job['output'] for job in _jobs(tmp_path)]
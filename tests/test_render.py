@@ -0,0 +1,28 @@
+import synthetic_session
+
+
+def test_render_charts_loads_sessions_from_the_given_backend(synthetic, tmp_path):
+    backend = synthetic_session.session_backend(seed=0, laps=8)
+    # Workers only know the backend from the argument, the parent is back on FastF1
+    synthetic.set_session_backend()
+    outputs = synthetic.render_charts([
+        ('team_pace_comparison', {'year': 2024, 'event_name': 'Bahrain', 'output': str(tmp_path / 'pace.png')}),
+        ('race_speed_trap_distribution', {'year': 2024, 'event_name': 'Bahrain',
+                                          'output': str(tmp_path / 'traps.png')}),
+    ], max_workers=2, backend=backend)
+    assert outputs == [str(tmp_path / 'pace.png'), str(tmp_path / 'traps.png')]
+    assert all(path.exists() for path in (tmp_path / 'pace.png', tmp_path / 'traps.png'))
+
+
+def test_quali_results_batch_loads_sessions_from_the_given_backend(synthetic, tmp_path):
+    backend = synthetic_session.session_backend(seed=0, laps=8)
+    synthetic.set_session_backend()
+    outputs = synthetic.quali_results_batch(2024, ['Bahrain', 'Monaco'], output_dir=str(tmp_path), max_workers=2,
+                                            backend=backend)
+    assert outputs == {'Bahrain': str(tmp_path / '2024_bahrain_quali.png'),
+                       'Monaco': str(tmp_path / '2024_monaco_quali.png')}
+    mtime = (tmp_path / '2024_bahrain_quali.png').stat().st_mtime_ns
+    # A second run finds both charts up to date in the manifest and renders nothing
+    assert synthetic.quali_results_batch(2024, ['Bahrain', 'Monaco'], output_dir=str(tmp_path), max_workers=2,
+                                         backend=backend) == outputs
+    assert (tmp_path / '2024_bahrain_quali.png').stat().st_mtime_ns == mtime
@@ -0,0 +1,17 @@
+import pytest
+
+import synthetic_session
+
+
+def test_rounds_are_counted_once_whatever_the_event_is_called(synthetic):
+    backend = synthetic_session.session_backend(seed=0, laps=8)
+    first = synthetic.update_season_positions_gained(2024, ['Bahrain', 'Monaco'], max_workers=2, backend=backend)
+    assert sorted(first.rounds, key=int) == ['1', '8']
+    updated = synthetic.update_season_positions_gained(2024, ['Monaco Grand Prix', 'Italian'], max_workers=2,
+                                                       backend=backend)
+    assert sorted(updated.rounds, key=int) == ['1', '8', '16']
+    assert updated.drivers['VER']['GainedRace'][1] == 3
+    assert synthetic.load_season_positions_gained(2024) == updated
+
+    with pytest.raises(ValueError):
+        synthetic.merge_positions_gained(updated, first)
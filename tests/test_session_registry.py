@@ -0,0 +1,27 @@
+def test_session_is_loaded_once_and_reused_for_less_data(synthetic):
+    full = synthetic.get_session(2024, 'Bahrain', 'R')
+    assert synthetic.get_session(2024, 'Bahrain', 'R') is full
+    assert synthetic.get_session(2024, 'Bahrain', 'R', telemetry=False, weather=False) is full
+    assert len(synthetic._session_registry) == 1
+
+
+def test_wider_request_replaces_the_narrower_session(synthetic):
+    laps_only = synthetic.get_session(2024, 'Bahrain', 'R', telemetry=False)
+    full = synthetic.get_session(2024, 'Bahrain', 'R', telemetry=True)
+    assert full is not laps_only
+    assert list(synthetic._session_registry.values()) == [full]
+
+
+def test_least_recently_used_session_is_evicted(synthetic):
+    size = synthetic.SESSION_REGISTRY_SIZE
+    synthetic.set_session_registry_size(2)
+    try:
+        bahrain = synthetic.get_session(2024, 'Bahrain', 'R', telemetry=False)
+        synthetic.get_session(2024, 'Monaco', 'R', telemetry=False)
+        assert synthetic.get_session(2024, 'Bahrain', 'R', telemetry=False) is bahrain
+        synthetic.get_session(2024, 'Monza', 'R', telemetry=False)
+        assert [key[1] for key in synthetic._session_registry] == ['Bahrain', 'Monza']
+        synthetic.evict_session(2024, 'Bahrain')
+        assert [key[1] for key in synthetic._session_registry] == ['Monza']
+    finally:
+        synthetic.set_session_registry_size(size)
@@ -0,0 +1,17 @@
+import matplotlib.pyplot as plt
+
+import synthetic_session
+
+
+def test_thirty_driver_grid_draws_the_driver_charts(synthetic, tmp_path):
+    synthetic.set_session_backend(synthetic_session.session_backend(seed=0, drivers=30, laps=4))
+    session = synthetic.get_session(2024, 'Bahrain', 'R')
+    assert len(session.drivers) == 30
+    synthetic.visualization_of_position_changes_during_the_race(2024, 'Bahrain', session=session,
+                                                                output=str(tmp_path / 'positions.png'))
+    synthetic.race_speed_trap_distribution(2024, 'Bahrain', session=session, output=str(tmp_path / 'traps.png'))
+    # S20 drives for the team of VER, so it takes the fallback for a teammate colour
+    fig = synthetic.compare_laps_visualization_on_map(session, ['VER', 'S20'])
+    assert len(fig.axes[0].collections[0].cmap.colors) == 2
+    plt.close(fig)
+    assert (tmp_path / 'positions.png').exists() and (tmp_path / 'traps.png').exists()
@@ -0,0 +1,24 @@
+import gc
+import weakref
+
+
+def test_repeated_lap_is_a_hit(synthetic):
+    session = synthetic.get_session(2024, 'Bahrain', 'R')
+    lap = session.laps.pick_driver('VER').pick_fastest()
+    first = synthetic.lap_telemetry(lap, ('Speed',))
+    second = synthetic.lap_telemetry(lap, ('Speed', 'Distance'))
+    assert first is second
+    info = synthetic.telemetry_cache_info()
+    assert (info['hits'], info['misses'], info['laps']) == (1, 1, 1)
+
+
+def test_evicted_session_is_collected_after_memoizing_telemetry(synthetic):
+    session = synthetic.get_session(2024, 'Bahrain', 'R')
+    synthetic.lap_telemetry(session.laps.pick_fastest(), ('Speed',))
+    synthetic.lap_telemetry(session.laps.pick_fastest(), ('X', 'Y'))
+    reference = weakref.ref(session)
+    del session
+    synthetic.evict_session()
+    gc.collect()
+    assert reference() is None
+    assert synthetic.telemetry_cache_info()['sessions'] == 0
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def _stored_laps(analysis, session, kind='car'):
+    index = analysis._read_store_index(analysis.store_directory(session))
+    return {(driver, int(lap)) for driver, kinds in index['laps'].items() for lap in kinds.get(kind, {})}
+
+
+def test_store_round_trip(synthetic):
+    session = synthetic.get_session(2024, 'Bahrain', 'R')
+    synthetic.write_session_to_store(session, drivers=['1', '16'], kinds=('car',))
+    lap = session.laps.pick_driver('LEC').pick_laps(3).iloc[0]
+    stored = synthetic.read_lap_from_store(2024, session.event['EventName'], session.name, '16', 3, 'car',
+                                           ['SessionTime', 'Speed', 'Distance'])
+    fetched = synthetic._fetch_lap_telemetry(lap, 'car')
+    for channel in ('SessionTime', 'Speed', 'Distance'):
+        np.testing.assert_array_equal(stored[channel].to_numpy(), fetched[channel].to_numpy())
+    assert len(_stored_laps(synthetic, session)) == 2 * 8
+
+
+def test_concurrent_appends_keep_every_lap(synthetic):
+    session = synthetic.get_session(2024, 'Bahrain', 'R')
+    laps = [lap for _, lap in session.laps.iterlaps()]
+    # Every lap is requested twice, from threads that miss it at the same time
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda lap: synthetic.get_lap_telemetry(lap, 'car'), laps + laps[::-1]))
+    assert len(_stored_laps(synthetic, session)) == len(laps)
+    for lap in laps[::17]:
+        stored = synthetic.read_lap_from_store(2024, session.event['EventName'], session.name,
+                                               lap['DriverNumber'], lap['LapNumber'], 'car', ['SessionTime'])
+        np.testing.assert_array_equal(stored['SessionTime'].to_numpy(),
+                                      synthetic._fetch_lap_telemetry(lap, 'car')['SessionTime'].to_numpy())
+
+
+def test_store_defers_telemetry_and_circuit_info_loads_it(synthetic, tmp_path):
+    session = synthetic.get_session(2024, 'Bahrain', 'Q')
+    synthetic.write_session_to_store(session, drivers=['1', '16'], fastest_only=True)
+    synthetic.evict_session()
+    synthetic.clear_telemetry_cache()
+
+    session = synthetic.get_session(2024, 'Bahrain', 'Q')
+    assert session in synthetic._deferred_telemetry
+    output = synthetic.overlaying_speed_traces_of_two_drivers(2024, 'Bahrain', 'VER', 'LEC', 'Q', session=session,
+                                                              output=str(tmp_path / 'speed.png'))
+    assert (tmp_path / 'speed.png').exists() and output == str(tmp_path / 'speed.png')
+    assert session not in synthetic._deferred_telemetry